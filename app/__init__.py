@@ -1,15 +1,21 @@
 import logging
 import os
 from logging.handlers import RotatingFileHandler
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from sqlalchemy import text
+from werkzeug.exceptions import HTTPException
 from .config import Config
-from .extensions import db, migrate, cors, limiter
+from .extensions import db, migrate, cors, limiter, cache
+from .json_provider import OrjsonProvider
 from .security_headers import setup_security_headers
 
 def create_app(config_class=Config):
+    _patch_psycopg_for_gevent()
     app = Flask(__name__)
     
+    # Parser JSON basado en orjson para los cuerpos de las peticiones
+    app.json = OrjsonProvider(app)
+    
     # Disable strict slashes to avoid 308 redirects
     app.url_map.strict_slashes = False
     
@@ -18,6 +24,7 @@ def create_app(config_class=Config):
         _validate_config(app.config)
         _init_extensions(app)
         _configure_logging(app)
+        _check_user_cache(app)
         _register_blueprints(app)
         _register_error_handlers(app)
         _init_database(app)
@@ -30,6 +37,29 @@ def create_app(config_class=Config):
             app.logger.error(f'App factory failed: {str(e)}')
         raise RuntimeError(f'Failed to create application: {str(e)}')
     
+def _patch_psycopg_for_gevent():
+    """
+    Hacer cooperativo a psycopg2 cuando la app corre bajo workers gevent.
+    
+    Solo actúa si gevent ya parchó la biblioteca estándar (gunicorn -k
+    gevent lo hace antes de cargar la app) y psycogreen está instalado;
+    con workers sync no cambia nada.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return
+    if not monkey.is_module_patched('socket'):
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        logging.getLogger(__name__).warning(
+            'gevent activo sin psycogreen: las consultas bloquearán el worker'
+        )
+        return
+    patch_psycopg()
+
 def _validate_config(config):
     required_keys = [
         'SECRET_KEY',
@@ -46,6 +76,7 @@ def _init_extensions(app):
         db.init_app(app)
         migrate.init_app(app, db)
         limiter.init_app(app)
+        cache.init_app(app)
         
         # CORS configuration - allow all origins for development
         app.logger.info('CORS configured to allow all origins (development mode)')
@@ -60,10 +91,38 @@ def _init_extensions(app):
                 "max_age": 3600
             }
         })
+        
+        # Handler OPTIONS global: las rutas se registran con
+        # provide_automatic_options=False y Flask-CORS completa los headers
+        @app.before_request
+        def handle_preflight():
+            if request.method == 'OPTIONS':
+                return app.response_class(status=204)
     
     except Exception as e:
         raise RuntimeError(f'Extension initialization failed: {str(e)}')
 
+# TTL máximo del usuario en caché cuando la caché no es compartida
+_PER_PROCESS_USER_CACHE_TIMEOUT = 30
+
+def _check_user_cache(app):
+    """
+    Advertir si los permisos pueden quedar obsoletos entre workers.
+    
+    El usuario en caché se descarta al modificarlo, pero con una caché por
+    proceso solo en el worker que hizo el cambio; en los demás un usuario
+    degradado o eliminado conserva sus permisos hasta USER_CACHE_TIMEOUT.
+    """
+    cache_type = app.config.get('CACHE_TYPE', 'SimpleCache').lower()
+    timeout = app.config.get('USER_CACHE_TIMEOUT', _PER_PROCESS_USER_CACHE_TIMEOUT)
+    if 'redis' not in cache_type and timeout > _PER_PROCESS_USER_CACHE_TIMEOUT:
+        app.logger.warning(
+            f'USER_CACHE_TIMEOUT={timeout} con CACHE_TYPE={app.config.get("CACHE_TYPE")}: '
+            'con varios workers los cambios de permisos tardan hasta ese TTL en '
+            'aplicarse; usar CACHE_TYPE=RedisCache o un TTL de '
+            f'{_PER_PROCESS_USER_CACHE_TIMEOUT} segundos o menos'
+        )
+
 def _configure_logging(app):
     if not app.debug and not app.testing:
         if not os.path.exists('logs'):
@@ -150,6 +209,13 @@ def _register_error_handlers(app):
             'message': 'The requested resource was not found'
         }), 404
     
+    @app.errorhandler(413)
+    def payload_too_large(error):
+        return jsonify({
+            'error': 'Payload too large',
+            'message': f'Request body exceeds {app.config["MAX_CONTENT_LENGTH"]} bytes'
+        }), 413
+    
     @app.errorhandler(429)
     def ratelimit_handler(e):
         app.logger.warning(f'Rate limit exceeded: {e}')
@@ -167,6 +233,22 @@ def _register_error_handlers(app):
             'message': 'An unexpected error occurred'
         }), 500
 
+    @app.errorhandler(Exception)
+    def unhandled_exception(error):
+        # Los errores HTTP conservan su código y sus manejadores propios
+        if isinstance(error, HTTPException):
+            return error
+        db.session.rollback()
+        # El traceback solo se formatea en modo debug
+        app.logger.error(
+            f'Unhandled exception: {type(error).__name__}: {error}',
+            exc_info=error if app.debug else None
+        )
+        return jsonify({
+            'error': 'Internal server error',
+            'message': 'An unexpected error occurred'
+        }), 500
+
 def _init_database(app):
     if app.config.get('ENVIRONMENT') == 'development':
         with app.app_context():
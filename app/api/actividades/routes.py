@@ -9,7 +9,7 @@ from app.auth_utils import apoyo_required, can_update_records, can_delete_vital_
 from app.api.utils import (
     success_response, error_response, created_response,
     handle_validation_error, handle_business_logic_error, handle_db_error,
-    get_request_args, ValidationError, BusinessLogicError
+    get_request_args, get_json_body, ValidationError, BusinessLogicError
 )
 from .services import ActividadService, TallerService
 
@@ -24,8 +24,10 @@ def get_actividades(current_user):
     Get paginated list of activities with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
+        with_total (int): 1 to include the number of matches in keyset mode
         nombre (str): Filter by activity name
         centro (int): Filter by center ID
         fecha_inicio (str): Filter activities after this date (YYYY-MM-DD)
@@ -38,7 +40,9 @@ def get_actividades(current_user):
         args = get_request_args(request)
         
         result = ActividadService.get_actividades(
-            page=args.get('page', 1),
+            page=args.get('page'),
+            cursor=args.get('cursor'),
+            with_total=bool(args.get('with_total')),
             per_page=min(args.get('per_page', 10), 100),
             nombre_filter=args.get('nombre'),
             centro_filter=args.get('centro'),
@@ -92,7 +96,7 @@ def create_actividad(current_user):
         JSON: Created activity data
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         actividad = ActividadService.create_actividad(data)
         
         return created_response(
@@ -129,7 +133,7 @@ def update_actividad(current_user, actividad_id):
         JSON: Updated activity data
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         actividad = ActividadService.update_actividad(actividad_id, data)
         
         return success_response(
@@ -178,8 +182,10 @@ def get_talleres(current_user):
     Get paginated list of workshops with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
+        with_total (int): 1 to include the number of matches in keyset mode
         nombre (str): Filter by workshop name
         actividad (int): Filter by activity ID
         
@@ -190,7 +196,9 @@ def get_talleres(current_user):
         args = get_request_args(request)
         
         result = TallerService.get_talleres(
-            page=args.get('page', 1),
+            page=args.get('page'),
+            cursor=args.get('cursor'),
+            with_total=bool(args.get('with_total')),
             per_page=min(args.get('per_page', 10), 100),
             nombre_filter=args.get('nombre'),
             actividad_filter=args.get('actividad')
@@ -240,7 +248,7 @@ def create_taller(current_user):
         JSON: Created workshop data
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         taller = TallerService.create_taller(data)
         
         return created_response(
@@ -275,7 +283,7 @@ def update_taller(current_user, taller_id):
         JSON: Updated workshop data
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         taller = TallerService.update_taller(taller_id, data)
         
         return success_response(
@@ -7,8 +7,9 @@ Business logic layer for activity and workshop management operations.
 from datetime import datetime
 from app.extensions import db
 from app.models import Actividades, Talleres, CentrosComunitarios, PersonasACargo
-from app.api.utils import paginate_query, BaseCRUDService
+from app.api.utils import paginate_query, paginate_keyset, BaseCRUDService, reference_exists
 from app.api.utils.errors import ValidationError, BusinessLogicError
+from app.api.utils.uow import transactional
 
 
 class ActividadService(BaseCRUDService):
@@ -16,6 +17,9 @@ class ActividadService(BaseCRUDService):
     Service class for activity management operations.
     """
     
+    # Unique sort key of the list (newest first), used for keyset pagination
+    LIST_ORDER = (Actividades.fecha_inicio, Actividades.id)
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -59,14 +63,12 @@ class ActividadService(BaseCRUDService):
         
         # Validate center exists
         if 'id_centro' in data and data['id_centro']:
-            centro = CentrosComunitarios.query.get(data['id_centro'])
-            if not centro:
+            if not reference_exists(CentrosComunitarios, data['id_centro']):
                 raise ValidationError('Centro comunitario no encontrado')
         
         # Validate responsible person if provided
         if 'id_persona_a_cargo' in data and data['id_persona_a_cargo']:
-            persona = PersonasACargo.query.get(data['id_persona_a_cargo'])
-            if not persona:
+            if not reference_exists(PersonasACargo, data['id_persona_a_cargo']):
                 raise ValidationError('Persona a cargo no encontrada')
         
         # Validate dates if provided
@@ -90,18 +92,24 @@ class ActividadService(BaseCRUDService):
                 raise ValidationError('Formato de fecha de fin inválido (YYYY-MM-DD)')
     
     @staticmethod
-    def get_actividades(page, per_page, nombre_filter=None, centro_filter=None, 
-                       fecha_inicio=None, fecha_fin=None):
+    def get_actividades(page=None, per_page=10, nombre_filter=None, centro_filter=None,
+                        fecha_inicio=None, fecha_fin=None, cursor=None, with_total=False):
         """
         Get paginated list of activities with optional filters.
         
+        Uses keyset pagination on (fecha_inicio, id) descending, served by
+        ix_actividades_fecha_inicio_id, unless a page number is given, in
+        which case offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             nombre_filter: Filter by activity name
             centro_filter: Filter by center ID
             fecha_inicio: Filter activities after this date
             fecha_fin: Filter activities before this date
+            cursor: Keyset cursor from the previous page (optional)
+            with_total: Include the (cached) number of matches in keyset mode
             
         Returns:
             dict: Paginated activity data
@@ -126,6 +134,10 @@ class ActividadService(BaseCRUDService):
             except ValueError:
                 pass  # Invalid date format, ignore filter
         
+        if page is None:
+            return paginate_keyset(query, ActividadService.LIST_ORDER, cursor, per_page,
+                                   descending=True, with_total=with_total)
+        
         # Order by start date descending
         query = query.order_by(Actividades.fecha_inicio.desc())
         
@@ -145,7 +157,7 @@ class ActividadService(BaseCRUDService):
         Raises:
             BusinessLogicError: If activity not found
         """
-        actividad = Actividades.query.get(actividad_id)
+        actividad = db.session.get(Actividades, actividad_id)
         if not actividad:
             raise BusinessLogicError('Actividad no encontrada')
         return actividad
@@ -187,8 +199,8 @@ class ActividadService(BaseCRUDService):
             observaciones=data.get('observaciones')
         )
         
-        db.session.add(actividad)
-        db.session.commit()
+        with transactional():
+            db.session.add(actividad)
         
         return actividad
     
@@ -213,34 +225,34 @@ class ActividadService(BaseCRUDService):
         # Validate data
         ActividadService.validate_actividad_data(data, is_update=True)
         
-        # Update fields
-        if 'nombre_actividad' in data:
-            actividad.nombre_actividad = data['nombre_actividad']
-        if 'descripcion_actividad' in data:
-            actividad.descripcion_actividad = data['descripcion_actividad']
-        if 'id_centro' in data:
-            actividad.id_centro = data['id_centro']
-        if 'id_persona_a_cargo' in data:
-            actividad.id_persona_a_cargo = data['id_persona_a_cargo']
-        
-        # Update dates
-        if 'fecha_inicio_actividad' in data:
-            if data['fecha_inicio_actividad']:
-                actividad.fecha_inicio_actividad = datetime.strptime(
-                    data['fecha_inicio_actividad'], '%Y-%m-%d'
-                ).date()
-            else:
-                actividad.fecha_inicio_actividad = None
-        
-        if 'fecha_fin_actividad' in data:
-            if data['fecha_fin_actividad']:
-                actividad.fecha_fin_actividad = datetime.strptime(
-                    data['fecha_fin_actividad'], '%Y-%m-%d'
-                ).date()
-            else:
-                actividad.fecha_fin_actividad = None
-        
-        db.session.commit()
+        with transactional():
+            # Update fields
+            if 'nombre_actividad' in data:
+                actividad.nombre_actividad = data['nombre_actividad']
+            if 'descripcion_actividad' in data:
+                actividad.descripcion_actividad = data['descripcion_actividad']
+            if 'id_centro' in data:
+                actividad.id_centro = data['id_centro']
+            if 'id_persona_a_cargo' in data:
+                actividad.id_persona_a_cargo = data['id_persona_a_cargo']
+            
+            # Update dates
+            if 'fecha_inicio_actividad' in data:
+                if data['fecha_inicio_actividad']:
+                    actividad.fecha_inicio_actividad = datetime.strptime(
+                        data['fecha_inicio_actividad'], '%Y-%m-%d'
+                    ).date()
+                else:
+                    actividad.fecha_inicio_actividad = None
+            
+            if 'fecha_fin_actividad' in data:
+                if data['fecha_fin_actividad']:
+                    actividad.fecha_fin_actividad = datetime.strptime(
+                        data['fecha_fin_actividad'], '%Y-%m-%d'
+                    ).date()
+                else:
+                    actividad.fecha_fin_actividad = None
+        
         return actividad
     
     @staticmethod
@@ -263,8 +275,8 @@ class ActividadService(BaseCRUDService):
                 f'No se puede eliminar la actividad porque tiene {talleres_count} taller(es) asociado(s)'
             )
         
-        db.session.delete(actividad)
-        db.session.commit()
+        with transactional():
+            db.session.delete(actividad)
     
     @staticmethod
     def get_actividades_by_centro(centro_id):
@@ -287,6 +299,9 @@ class TallerService(BaseCRUDService):
     Service class for workshop management operations.
     """
     
+    # Unique sort key of the list, used for keyset pagination
+    LIST_ORDER = (Talleres.nombre, Talleres.id)
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -325,21 +340,26 @@ class TallerService(BaseCRUDService):
         
         # Validate responsible person if provided
         if 'persona_a_cargo' in data and data['persona_a_cargo']:
-            from app.models import PersonasACargo
-            persona = PersonasACargo.query.get(data['persona_a_cargo'])
-            if not persona:
+            if not reference_exists(PersonasACargo, data['persona_a_cargo']):
                 raise ValidationError('Persona a cargo no encontrada')
     
     @staticmethod
-    def get_talleres(page, per_page, nombre_filter=None, actividad_filter=None):
+    def get_talleres(page=None, per_page=10, nombre_filter=None, actividad_filter=None,
+                     cursor=None, with_total=False):
         """
         Get paginated list of workshops with optional filters.
         
+        Uses keyset pagination on (nombre, id), served by
+        ix_talleres_nombre_id, unless a page number is given, in which case
+        offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             nombre_filter: Filter by workshop name
             actividad_filter: Filter by activity ID
+            cursor: Keyset cursor from the previous page (optional)
+            with_total: Include the (cached) number of matches in keyset mode
             
         Returns:
             dict: Paginated workshop data
@@ -350,6 +370,10 @@ class TallerService(BaseCRUDService):
         if nombre_filter:
             query = query.filter(Talleres.nombre.ilike(f'%{nombre_filter}%'))
         
+        if page is None:
+            return paginate_keyset(query, TallerService.LIST_ORDER, cursor, per_page,
+                                   with_total=with_total)
+        
         # Order by name
         query = query.order_by(Talleres.nombre)
         
@@ -10,9 +10,10 @@ from app.extensions import limiter
 from app.api.utils import (
     success_response, error_response, created_response,
     handle_validation_error, handle_business_logic_error, handle_db_error,
-    ValidationError, BusinessLogicError
+    get_json_body, ValidationError, BusinessLogicError
 )
 from app.api.utils.decorators import validate_rut_parameter
+from app.api.utils.rate_limiting import concurrency_limit
 from .services import AuthService
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -20,6 +21,7 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @auth_bp.route('/login', methods=['POST'])
 @limiter.limit("5 per minute")
+@concurrency_limit()
 @validate_rut_parameter
 def login():
     """
@@ -38,7 +40,7 @@ def login():
         401: Authentication failed
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         response_data = AuthService.authenticate_user(
             data.get('rut_usuario'),
             data.get('password')
@@ -80,6 +82,7 @@ def logout(current_user):
 @auth_bp.route('/register', methods=['POST'])
 @limiter.limit("3 per minute")
 @can_create_users
+@concurrency_limit()
 def register(current_user):
     """
     Register a new user (admin only).
@@ -99,7 +102,7 @@ def register(current_user):
         409: User already exists
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         usuario = AuthService.register_user(data, current_user)
         
         return created_response(
@@ -149,7 +152,7 @@ def update_profile(current_user):
         JSON: Updated user data
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         usuario = AuthService.update_profile(current_user, data)
         
         return success_response(
@@ -164,6 +167,7 @@ def update_profile(current_user):
 @auth_bp.route('/change-password', methods=['POST'])
 @limiter.limit("3 per minute")
 @token_required
+@concurrency_limit()
 def change_password(current_user):
     """
     Change current user's password.
@@ -176,7 +180,7 @@ def change_password(current_user):
         JSON: Success confirmation
     """
     try:
-        data = request.get_json() or {}
+        data = get_json_body(request)
         
         AuthService.change_password(
             current_user,
@@ -7,6 +7,7 @@ Business logic layer for authentication operations.
 from app.extensions import db
 from app.models import Usuario
 from app.api.utils.errors import ValidationError, BusinessLogicError
+from app.api.utils.uow import transactional, release_connection
 from app.auth_utils import (
     validate_rut_format, normalize_rut, validate_password_strength,
     login_user as auth_login_user, logout_user as auth_logout_user
@@ -47,7 +48,8 @@ class AuthService:
         if not usuario:
             raise BusinessLogicError('Credenciales incorrectas')
         
-        # Verify password
+        # Verify password (bcrypt) without holding a connection
+        release_connection()
         if not usuario.check_password(password):
             raise BusinessLogicError('Credenciales incorrectas')
         
@@ -82,7 +84,9 @@ class AuthService:
             raise ValidationError('Formato de RUT inválido. Use formato XXXXXXX-X o XXXXXXXX-X')
         
         # Check if user already exists
-        if Usuario.query.filter_by(rut_usuario=normalized_rut).first():
+        if db.session.query(
+            Usuario.query.filter_by(rut_usuario=normalized_rut).exists()
+        ).scalar():
             raise BusinessLogicError('Ya existe un usuario con este RUT')
         
         # Validate password strength
@@ -91,7 +95,7 @@ class AuthService:
             raise ValidationError(message)
         
         # Validate user level
-        if data['nivel_usuario'] not in [1, 2, 3]:
+        if not Usuario.is_valid_nivel(data['nivel_usuario']):
             raise ValidationError('Nivel de usuario debe ser 1 (apoyo), 2 (encargado) o 3 (admin)')
         
         # Create new user
@@ -100,10 +104,11 @@ class AuthService:
             user_usuario=data['user_usuario'],
             nivel_usuario=data['nivel_usuario']
         )
+        release_connection()
         usuario.set_password(data['password'])
         
-        db.session.add(usuario)
-        db.session.commit()
+        with transactional():
+            db.session.add(usuario)
         
         return usuario
     
@@ -119,10 +124,10 @@ class AuthService:
         Returns:
             Usuario: Updated user instance
         """
-        if 'user_usuario' in data:
-            usuario.user_usuario = data['user_usuario']
+        with transactional():
+            if 'user_usuario' in data:
+                usuario.user_usuario = data['user_usuario']
         
-        db.session.commit()
         return usuario
     
     @staticmethod
@@ -142,18 +147,21 @@ class AuthService:
         if not current_password or not new_password:
             raise ValidationError('Contraseña actual y nueva son requeridas')
         
-        # Verify current password
-        if not usuario.check_password(current_password):
-            raise BusinessLogicError('Contraseña actual incorrecta')
-        
         # Validate new password
         is_valid, message = validate_password_strength(new_password)
         if not is_valid:
             raise ValidationError(message)
         
+        # Verify the current password and hash the new one (bcrypt)
+        # without holding a connection
+        release_connection()
+        if not usuario.check_password(current_password):
+            raise BusinessLogicError('Contraseña actual incorrecta')
+        password_hash = Usuario.hash_password(new_password)
+        
         # Update password
-        usuario.set_password(new_password)
-        db.session.commit()
+        with transactional():
+            usuario.passwd_usuario = password_hash
     
     @staticmethod
     def logout_user():
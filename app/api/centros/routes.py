@@ -28,8 +28,10 @@ def get_centros(current_user):
     Get paginated list of community centers with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
+        with_total (int): 1 to include the number of matches in keyset mode
         nombre (str): Filter by center name
         sector (str): Filter by sector
         direccion (str): Filter by address
@@ -40,7 +42,9 @@ def get_centros(current_user):
     args = get_request_args(request)
     
     result = CentroService.get_centros(
-        page=args.get('page', 1),
+        page=args.get('page'),
+        cursor=args.get('cursor'),
+        with_total=bool(args.get('with_total')),
         per_page=min(args.get('per_page', 10), 100),
         nombre_filter=args.get('nombre'),
         sector_filter=args.get('sector'),
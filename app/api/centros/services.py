@@ -6,16 +6,25 @@ Business logic layer for community center management operations.
 
 from app.extensions import db
 from app.models import CentrosComunitarios
-from app.api.utils import paginate_query, BaseCRUDService
+from app.api.utils import paginate_query, paginate_keyset, BaseCRUDService, forget_reference
 from app.api.utils.errors import ValidationError, BusinessLogicError
+from app.api.mantenciones.services import MantencionService
+from app.api.trabajadores.services import TrabajadorApoyoService
 import re
 
 
+_PHONE_RE = re.compile(r'^[\d\s\-\+\(\)]+$')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
 class CentroService(BaseCRUDService):
     """
     Service class for community center management operations.
     """
     
+    # Unique sort key of the list, used for keyset pagination
+    LIST_ORDER = (CentrosComunitarios.nombre, CentrosComunitarios.id)
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -65,7 +74,7 @@ class CentroService(BaseCRUDService):
         # Validate phone if provided
         if 'telefono_centro' in data and data['telefono_centro']:
             phone = data['telefono_centro'].strip()
-            if phone and not re.match(r'^[\d\s\-\+\(\)]+$', phone):
+            if phone and not _PHONE_RE.match(phone):
                 raise ValidationError('Formato de teléfono inválido')
             if len(phone) > 20:
                 raise ValidationError('Teléfono no puede exceder 20 caracteres')
@@ -73,8 +82,7 @@ class CentroService(BaseCRUDService):
         # Validate email if provided
         if 'email_centro' in data and data['email_centro']:
             email = data['email_centro'].strip().lower()
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if email and not re.match(email_pattern, email):
+            if email and not _EMAIL_RE.match(email):
                 raise ValidationError('Formato de email inválido')
             if len(email) > 100:
                 raise ValidationError('Email no puede exceder 100 caracteres')
@@ -91,16 +99,23 @@ class CentroService(BaseCRUDService):
                 raise ValidationError('Capacidad debe ser un número válido')
     
     @staticmethod
-    def get_centros(page, per_page, nombre_filter=None, sector_filter=None, direccion_filter=None):
+    def get_centros(page=None, per_page=10, nombre_filter=None, sector_filter=None,
+                    direccion_filter=None, cursor=None, with_total=False):
         """
         Get paginated list of community centers with optional filters.
         
+        Uses keyset pagination on (nombre, id), served by
+        ix_centros_comunitarios_nombre_id, unless a page number is given,
+        in which case offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             nombre_filter: Filter by center name
             sector_filter: Filter by sector
             direccion_filter: Filter by address
+            cursor: Keyset cursor from the previous page (optional)
+            with_total: Include the (cached) number of matches in keyset mode
             
         Returns:
             dict: Paginated center data
@@ -117,6 +132,10 @@ class CentroService(BaseCRUDService):
         if direccion_filter:
             query = query.filter(CentrosComunitarios.direccion.ilike(f'%{direccion_filter}%'))
         
+        if page is None:
+            return paginate_keyset(query, CentroService.LIST_ORDER, cursor, per_page,
+                                   with_total=with_total)
+        
         # Order by name for consistent pagination
         query = query.order_by(CentrosComunitarios.nombre)
         
@@ -204,7 +223,7 @@ class CentroService(BaseCRUDService):
         
         # Check name uniqueness if changing
         if 'nombre' in data and data['nombre'] != entity.nombre:
-            if not self.check_unique_field('nombre', data['nombre'], exclude_id=entity.id_centro):
+            if not self.check_unique_field('nombre', data['nombre'], exclude_id=entity.id):
                 raise BusinessLogicError('Ya existe un centro con este nombre')
     
     def update_entity_fields(self, entity, data):
@@ -229,7 +248,14 @@ class CentroService(BaseCRUDService):
             BusinessLogicError: If business rules are violated
         """
         service = CentroService()
-        return service.delete(centro_id)
+        result = service.delete(centro_id)
+        forget_reference(CentrosComunitarios, centro_id)
+        
+        # The foreign keys delete the center's maintenance records and
+        # unassign its workers, so their cached lists are stale
+        MantencionService.invalidate_centro_cache(centro_id)
+        TrabajadorApoyoService.invalidate_list_cache()
+        return result
     
     def validate_delete(self, entity):
         """Validate if center can be deleted."""
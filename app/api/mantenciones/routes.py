@@ -7,8 +7,8 @@ RESTful endpoints for maintenance management.
 from flask import Blueprint, request
 from app.auth_utils import apoyo_required, can_update_records, can_delete_vital_records
 from app.api.utils import (
-    success_response, created_response,
-    get_request_args,
+    success_response, created_response, cached_json_response,
+    get_request_args, ValidationError,
     # Decorators
     handle_crud_errors, require_json, validate_request_data,
     validate_pagination_params, log_api_call
@@ -18,7 +18,7 @@ from .services import MantencionService
 mantenciones_bp = Blueprint('mantenciones', __name__, url_prefix='/api/mantenciones')
 
 
-@mantenciones_bp.route('/', methods=['GET'])
+@mantenciones_bp.route('/', methods=['GET'], provide_automatic_options=False)
 @apoyo_required
 @handle_crud_errors("mantención", "listar")
 @validate_pagination_params
@@ -28,7 +28,8 @@ def get_mantenciones(current_user):
     Get paginated list of maintenance records with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
         centro (int): Filter by center ID
         fecha_desde (str): Filter maintenance from this date (YYYY-MM-DD)
@@ -40,7 +41,8 @@ def get_mantenciones(current_user):
     args = get_request_args(request)
     
     result = MantencionService.get_mantenciones(
-        page=args.get('page', 1),
+        page=args.get('page'),
+        cursor=args.get('cursor'),
         per_page=min(args.get('per_page', 10), 100),
         centro_filter=args.get('centro'),
         fecha_desde=args.get('fecha_desde'),
@@ -50,7 +52,7 @@ def get_mantenciones(current_user):
     return success_response(data=result)
 
 
-@mantenciones_bp.route('/<int:mantencion_id>', methods=['GET'])
+@mantenciones_bp.route('/<int:mantencion_id>', methods=['GET'], provide_automatic_options=False)
 @apoyo_required
 @handle_crud_errors("mantención", "obtener")
 @log_api_call
@@ -72,7 +74,7 @@ def get_mantencion(current_user, mantencion_id):
     )
 
 
-@mantenciones_bp.route('/', methods=['POST'])
+@mantenciones_bp.route('/', methods=['POST'], provide_automatic_options=False)
 @can_update_records
 @handle_crud_errors("mantención", "crear")
 @require_json
@@ -105,7 +107,34 @@ def create_mantencion(current_user):
     )
 
 
-@mantenciones_bp.route('/<int:mantencion_id>', methods=['PUT'])
+@mantenciones_bp.route('/bulk', methods=['POST'], provide_automatic_options=False)
+@can_update_records
+@handle_crud_errors("mantenciones", "crear")
+@require_json
+@log_api_call
+def bulk_create_mantenciones(current_user):
+    """
+    Create several maintenance records in one request.
+    
+    Body (JSON): List of maintenance objects with the same fields as
+        the single create endpoint.
+        
+    Returns:
+        JSON: IDs of the created maintenance records
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValidationError('Se espera una lista de mantenciones')
+    
+    ids = MantencionService.bulk_create_mantenciones(data)
+    
+    return created_response(
+        data={'ids': ids},
+        message=f"{len(ids)} mantenciones creadas exitosamente"
+    )
+
+
+@mantenciones_bp.route('/<int:mantencion_id>', methods=['PUT'], provide_automatic_options=False)
 @can_update_records
 @handle_crud_errors("mantención", "actualizar")
 @require_json
@@ -135,7 +164,7 @@ def update_mantencion(current_user, mantencion_id):
     )
 
 
-@mantenciones_bp.route('/<int:mantencion_id>', methods=['DELETE'])
+@mantenciones_bp.route('/<int:mantencion_id>', methods=['DELETE'], provide_automatic_options=False)
 @can_delete_vital_records
 @handle_crud_errors("mantención", "eliminar")
 @log_api_call
@@ -156,7 +185,7 @@ def delete_mantencion(current_user, mantencion_id):
     )
 
 
-@mantenciones_bp.route('/centro/<int:centro_id>', methods=['GET'])
+@mantenciones_bp.route('/centro/<int:centro_id>', methods=['GET'], provide_automatic_options=False)
 @apoyo_required
 @handle_crud_errors("mantenciones por centro", "obtener")
 @log_api_call
@@ -170,9 +199,8 @@ def get_mantenciones_by_centro(current_user, centro_id):
     Returns:
         JSON: List of maintenance records for the center
     """
-    mantenciones = MantencionService.get_mantenciones_by_centro(centro_id)
-    
-    return success_response(
-        data=[m.to_dict() for m in mantenciones],
+    return cached_json_response(
+        MantencionService.centro_cache_key(centro_id),
+        lambda: MantencionService.get_mantenciones_by_centro(centro_id),
         message=f"Mantenciones del centro {centro_id} obtenidas exitosamente"
-    )
\ No newline at end of file
+    )
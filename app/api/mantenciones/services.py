@@ -4,11 +4,69 @@ Maintenance Services
 Business logic layer for maintenance management operations.
 """
 
-from app.extensions import db
+from sqlalchemy import insert, select
+from app.extensions import db, cache
 from app.models import Mantenciones, CentrosComunitarios
-from app.api.utils import paginate_query, BaseCRUDService
+from app.api.utils import (
+    paginate_query, paginate_keyset, skip_list_cache, BaseCRUDService, reference_exists,
+    missing_references
+)
 from app.api.utils.errors import ValidationError, BusinessLogicError
-from datetime import datetime
+from app.api.utils.uow import transactional
+from datetime import date
+
+
+# Columns copied as is on update (fecha is parsed separately)
+_MANTENCION_UPDATABLE_FIELDS = frozenset((
+    'id_centro', 'detalle', 'observaciones', 'adjuntos', 'quienes_realizaron'
+))
+
+
+def _has_date_shape(value):
+    """Whether value looks like YYYY-MM-DD (checked before parsing)."""
+    return (isinstance(value, str) and len(value) == 10
+            and value[4] == '-' and value[7] == '-')
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD date from a request payload.
+    
+    Uses date.fromisoformat, implemented in C, instead of re-reading a
+    strptime format on every call. Dates already parsed are returned as is.
+    
+    Args:
+        value: Date string or date
+        
+    Returns:
+        date: Parsed date
+        
+    Raises:
+        ValidationError: If the value is not a valid YYYY-MM-DD date
+    """
+    if isinstance(value, date):
+        return value
+    if _has_date_shape(value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    raise ValidationError('Formato de fecha inválido. Use YYYY-MM-DD')
+
+
+def _parse_filter_date(value):
+    """
+    Parse a YYYY-MM-DD query filter, returning None for malformed input.
+    
+    The shape is checked before parsing so that typical bad input is
+    discarded without raising and catching a ValueError.
+    """
+    if not _has_date_shape(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None  # Well-formed but impossible date (e.g. 2024-13-45)
 
 
 class MantencionService(BaseCRUDService):
@@ -16,6 +74,19 @@ class MantencionService(BaseCRUDService):
     Service class for maintenance management operations.
     """
     
+    # Columns of Mantenciones.to_dict(), selected directly by the list endpoint
+    LIST_COLUMNS = (
+        Mantenciones.id,
+        Mantenciones.fecha,
+        Mantenciones.id_centro,
+        Mantenciones.detalle,
+        Mantenciones.observaciones,
+        Mantenciones.adjuntos,
+        Mantenciones.quienes_realizaron,
+        Mantenciones.created_at,
+        Mantenciones.updated_at
+    )
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -30,13 +101,15 @@ class MantencionService(BaseCRUDService):
         return 'id_mantencion'
     
     @staticmethod
-    def validate_mantencion_data(data, is_update=False):
+    def validate_mantencion_data(data, is_update=False, check_centro=True):
         """
         Validate maintenance data.
         
         Args:
             data: Maintenance data to validate
             is_update: Whether this is an update operation
+            check_centro: Whether to query the center here (bulk callers
+                validate all centers with a single query instead)
             
         Raises:
             ValidationError: If validation fails
@@ -47,61 +120,67 @@ class MantencionService(BaseCRUDService):
                 if not data.get(field):
                     raise ValidationError(f'{field.replace("_", " ").title()} es requerido')
         
-        # Validate center exists
-        if 'id_centro' in data and data['id_centro']:
-            centro = CentrosComunitarios.query.get(data['id_centro'])
-            if not centro:
+        # Validate center: an integer ID (a string or list would reach the
+        # cached reference checks and the batched IN query as is)
+        id_centro = data.get('id_centro')
+        if id_centro is not None and type(id_centro) is not int:
+            raise ValidationError('ID de centro comunitario debe ser un número entero')
+        if check_centro and id_centro:
+            if not reference_exists(CentrosComunitarios, id_centro):
                 raise ValidationError('Centro comunitario no encontrado')
         
-        # Validate date format
-        if 'fecha' in data and data['fecha']:
-            try:
-                if isinstance(data['fecha'], str):
-                    datetime.strptime(data['fecha'], '%Y-%m-%d')
-            except ValueError:
-                raise ValidationError('Formato de fecha inválido. Use YYYY-MM-DD')
+        # Validate date format; the parsed date replaces the string so
+        # build_row/update_entity_fields do not parse it a second time
+        fecha = data.get('fecha')
+        if fecha:
+            data['fecha'] = parse_date(fecha)
     
     @staticmethod
-    def get_mantenciones(page=1, per_page=10, centro_filter=None, fecha_desde=None, fecha_hasta=None):
+    @cache.memoize(timeout=60, unless=skip_list_cache)
+    def get_mantenciones(page=None, per_page=10, centro_filter=None, fecha_desde=None,
+                         fecha_hasta=None, cursor=None):
         """
         Get paginated list of maintenance records with optional filters.
         
+        Uses keyset pagination on (fecha, id) descending, served by
+        ix_mantenciones_fecha_id, unless a page number is given, in which
+        case offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page  
             centro_filter: Filter by center ID
             fecha_desde: Filter maintenance from this date
             fecha_hasta: Filter maintenance until this date
+            cursor: Keyset cursor from the previous page (optional)
             
         Returns:
             dict: Paginated maintenance data
         """
-        query = Mantenciones.query
+        # Core select of the serialized columns: rows go straight to
+        # dicts without building ORM instances (no lazy loads possible)
+        query = select(*MantencionService.LIST_COLUMNS)
         
         # Apply filters
-        if centro_filter:
-            try:
-                centro_id = int(centro_filter)
-                query = query.filter(Mantenciones.id_centro == centro_id)
-            except ValueError:
-                pass  # Invalid center ID, ignore filter
-        
-        if fecha_desde:
-            try:
-                fecha = datetime.strptime(fecha_desde, '%Y-%m-%d').date()
-                query = query.filter(Mantenciones.fecha >= fecha)
-            except ValueError:
-                pass  # Invalid date format, ignore filter
-        
-        if fecha_hasta:
-            try:
-                fecha = datetime.strptime(fecha_hasta, '%Y-%m-%d').date()
-                query = query.filter(Mantenciones.fecha <= fecha)
-            except ValueError:
-                pass  # Invalid date format, ignore filter
+        if centro_filter and str(centro_filter).isdigit():
+            query = query.filter(Mantenciones.id_centro == int(centro_filter))
+        
+        fecha = _parse_filter_date(fecha_desde)
+        if fecha:
+            query = query.filter(Mantenciones.fecha >= fecha)
+        
+        fecha = _parse_filter_date(fecha_hasta)
+        if fecha:
+            query = query.filter(Mantenciones.fecha <= fecha)
+        
+        if page is None:
+            return paginate_keyset(
+                query, (Mantenciones.fecha, Mantenciones.id), cursor, per_page,
+                descending=True
+            )
         
         # Order by date descending
-        query = query.order_by(Mantenciones.fecha.desc())
+        query = query.order_by(Mantenciones.fecha.desc(), Mantenciones.id.desc())
         
         return paginate_query(query, page, per_page)
     
@@ -137,31 +216,71 @@ class MantencionService(BaseCRUDService):
             ValidationError: If validation fails
         """
         service = MantencionService()
-        return service.create(data)
+        mantencion = service.create(data)
+        MantencionService.invalidate_centro_cache(mantencion.id_centro)
+        return mantencion
+    
+    @staticmethod
+    def bulk_create_mantenciones(items):
+        """
+        Create several maintenance records in a single round-trip.
+        
+        All items are validated first; the referenced centers are checked
+        with one query and the rows are inserted with one executemany
+        statement and a single commit.
+        
+        Args:
+            items: List of maintenance data dicts
+            
+        Returns:
+            list: IDs of the created maintenance records
+            
+        Raises:
+            ValidationError: If any item fails validation
+        """
+        if not items:
+            raise ValidationError('Debe proporcionar al menos una mantención')
+        
+        for data in items:
+            MantencionService.validate_mantencion_data(data, check_centro=False)
+        
+        # Validate all referenced centers with at most one query
+        centro_ids = {data['id_centro'] for data in items}
+        if missing_references(CentrosComunitarios, centro_ids):
+            raise ValidationError('Centro comunitario no encontrado')
+        
+        rows = [MantencionService.build_row(data) for data in items]
+        
+        with transactional():
+            # Ids in the order of items: clients pair them by position
+            ids = db.session.execute(
+                insert(Mantenciones).returning(Mantenciones.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+        
+        MantencionService.invalidate_centro_cache(*centro_ids)
+        
+        return ids
     
     # BaseCRUDService abstract methods implementation
     def validate_create_data(self, data):
         """Validate data for maintenance creation."""
         MantencionService.validate_mantencion_data(data)
     
+    @staticmethod
+    def build_row(data):
+        """Build the column values of a maintenance record from data."""
+        return {
+            'fecha': parse_date(data['fecha']),
+            'id_centro': data['id_centro'],
+            'detalle': data.get('detalle'),
+            'observaciones': data.get('observaciones'),
+            'adjuntos': data.get('adjuntos'),
+            'quienes_realizaron': data.get('quienes_realizaron')
+        }
+    
     def build_entity(self, data):
         """Build maintenance instance from data."""
-        # Parse date if it's a string
-        fecha = data['fecha']
-        if isinstance(fecha, str):
-            fecha = datetime.strptime(fecha, '%Y-%m-%d').date()
-        
-        # Create maintenance record
-        mantencion = Mantenciones(
-            fecha=fecha,
-            id_centro=data['id_centro'],
-            detalle=data.get('detalle'),
-            observaciones=data.get('observaciones'),
-            adjuntos=data.get('adjuntos'),
-            quienes_realizaron=data.get('quienes_realizaron')
-        )
-        
-        return mantencion
+        return Mantenciones(**MantencionService.build_row(data))
     
     @staticmethod
     def update_mantencion(mantencion_id, data):
@@ -180,7 +299,10 @@ class MantencionService(BaseCRUDService):
             BusinessLogicError: If business rules are violated
         """
         service = MantencionService()
-        return service.update(mantencion_id, data)
+        previous_centro = service.get_by_id(mantencion_id).id_centro
+        mantencion = service.update(mantencion_id, data)
+        MantencionService.invalidate_centro_cache(previous_centro, mantencion.id_centro)
+        return mantencion
     
     def validate_update_data(self, data, entity):
         """Validate data for maintenance update."""
@@ -188,23 +310,11 @@ class MantencionService(BaseCRUDService):
     
     def update_entity_fields(self, entity, data):
         """Update maintenance fields with new data."""
-        # Update fields
         if 'fecha' in data:
-            fecha = data['fecha']
-            if isinstance(fecha, str):
-                fecha = datetime.strptime(fecha, '%Y-%m-%d').date()
-            entity.fecha = fecha
-        
-        if 'id_centro' in data:
-            entity.id_centro = data['id_centro']
-        if 'detalle' in data:
-            entity.detalle = data['detalle']
-        if 'observaciones' in data:
-            entity.observaciones = data['observaciones']
-        if 'adjuntos' in data:
-            entity.adjuntos = data['adjuntos']
-        if 'quienes_realizaron' in data:
-            entity.quienes_realizaron = data['quienes_realizaron']
+            entity.fecha = parse_date(data['fecha'])
+        
+        for field in _MANTENCION_UPDATABLE_FIELDS.intersection(data):
+            setattr(entity, field, data[field])
     
     @staticmethod
     def delete_mantencion(mantencion_id):
@@ -217,8 +327,9 @@ class MantencionService(BaseCRUDService):
         Raises:
             BusinessLogicError: If maintenance not found or cannot be deleted
         """
-        service = MantencionService()
-        return service.delete(mantencion_id)
+        deleted = MantencionService().delete_by_id(mantencion_id, Mantenciones.id_centro)
+        MantencionService.invalidate_centro_cache(deleted.id_centro)
+        return True
     
     @staticmethod
     def get_mantenciones_by_centro(centro_id):
@@ -229,8 +340,41 @@ class MantencionService(BaseCRUDService):
             centro_id: Center ID
             
         Returns:
-            list: List of maintenance records
+            list: Serialized maintenance records
+        """
+        mantenciones = db.session.scalars(
+            select(Mantenciones)
+            .where(Mantenciones.id_centro == centro_id)
+            .order_by(Mantenciones.fecha.desc())
+        )
+        
+        return [m.to_dict() for m in mantenciones]
+    
+    @staticmethod
+    def centro_cache_key(centro_id):
+        """
+        Cache key of the serialized maintenance list of a center.
+        
+        Args:
+            centro_id: Center ID
+            
+        Returns:
+            str: Cache key
+        """
+        return f'mant:centro:{centro_id}'
+    
+    @staticmethod
+    def invalidate_centro_cache(*centro_ids):
+        """
+        Drop the cached maintenance lists after a write.
+        
+        Every cached page of the paginated list is dropped, together with
+        the per-center lists of the given centers.
+        
+        Args:
+            centro_ids: Center IDs whose cached lists are stale
         """
-        return Mantenciones.query.filter_by(id_centro=centro_id).order_by(
-            Mantenciones.fecha.desc()
-        ).all()
\ No newline at end of file
+        cache.delete_memoized(MantencionService.get_mantenciones)
+        cache.delete_many(*(
+            MantencionService.centro_cache_key(centro_id) for centro_id in set(centro_ids)
+        ))
@@ -10,9 +10,8 @@ from app.models import PersonasACargo
 from app.auth_utils import apoyo_required, admin_required, can_update_records, can_delete_vital_records
 from app.api.utils import (
     success_response, created_response, deleted_response,
-    handle_db_error, handle_validation_error, handle_business_logic_error,
-    ValidationError, BusinessLogicError, get_request_args, handle_crud_errors,
-    validate_pagination_params, log_api_call
+    get_request_args, get_json_body, ValidationError, handle_crud_errors,
+    require_json, validate_pagination_params, log_api_call
 )
 from .services import PersonasACargoService
 
@@ -29,12 +28,25 @@ personas_a_cargo_bp = Blueprint(
 @validate_pagination_params
 @log_api_call
 def list_personas_a_cargo(current_user):
-    """Get paginated personas a cargo list."""
+    """
+    Get paginated personas a cargo list.
+
+    Query Parameters:
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
+        per_page (int): Items per page (default: 10, max: 100)
+        with_total (int): 1 to include the number of matches in keyset mode
+        nombre (str): Filter by nombre or apellido
+        rut (str): Filter by RUT prefix
+        search (str): Search in RUT, nombre, apellido
+    """
 
     args = get_request_args(request)
 
     result = PersonasACargoService.get_personas_a_cargo(
-        page=args.get('page', 1),
+        page=args.get('page'),
+        cursor=args.get('cursor'),
+        with_total=bool(args.get('with_total')),
         per_page=min(args.get('per_page', 10), 100),
         nombre_filter=args.get('nombre'),
         rut_filter=args.get('rut'),
@@ -46,6 +58,7 @@ def list_personas_a_cargo(current_user):
 
 @personas_a_cargo_bp.route('/<string:rut>', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("persona a cargo", "obtener")
 def get_persona_a_cargo(current_user, rut):
     """
     Get a specific persona a cargo by RUT.
@@ -56,16 +69,13 @@ def get_persona_a_cargo(current_user, rut):
     Returns:
         JSON: Caregiver data
     """
-    try:
-        persona = PersonasACargo.query.get_or_404(rut)
-        return success_response(data=persona.to_dict())
-        
-    except Exception as e:
-        return handle_db_error(e, "retrieving persona a cargo")
+    persona = db.get_or_404(PersonasACargo, rut)
+    return success_response(data=persona.to_dict())
 
 
 @personas_a_cargo_bp.route('', methods=['POST'])
 @admin_required
+@handle_crud_errors("persona a cargo", "crear")
 def create_persona_a_cargo(current_user):
     """
     Create a new persona a cargo (admin only).
@@ -81,25 +91,44 @@ def create_persona_a_cargo(current_user):
     Returns:
         JSON: Created caregiver data
     """
-    try:
-        data = request.get_json() or {}
-        persona = PersonasACargoService.create_persona_a_cargo(data)
-        
-        return created_response(
-            data=persona.to_dict(),
-            message="Persona a cargo creada exitosamente"
-        )
+    data = get_json_body(request)
+    persona = PersonasACargoService.create_persona_a_cargo(data)
+    
+    return created_response(
+        data=persona.to_dict(),
+        message="Persona a cargo creada exitosamente"
+    )
+
+
+@personas_a_cargo_bp.route('/bulk', methods=['POST'])
+@admin_required
+@handle_crud_errors("personas a cargo", "crear")
+@require_json
+def bulk_create_personas_a_cargo(current_user):
+    """
+    Create several personas a cargo in one request.
+    
+    Body (JSON): List of objects with the same fields as the single
+        create endpoint.
         
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "creating persona a cargo")
+    Returns:
+        JSON: RUTs of the created people
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValidationError('Se espera una lista de personas a cargo')
+    
+    ruts = PersonasACargoService.create_many(data)
+    
+    return created_response(
+        data={'ruts': ruts},
+        message=f"{len(ruts)} personas a cargo creadas exitosamente"
+    )
 
 
 @personas_a_cargo_bp.route('/<string:rut>', methods=['PUT'])
 @can_update_records
+@handle_crud_errors("persona a cargo", "actualizar")
 def update_persona_a_cargo(current_user, rut):
     """
     Update an existing persona a cargo.
@@ -113,23 +142,18 @@ def update_persona_a_cargo(current_user, rut):
     Returns:
         JSON: Updated caregiver data
     """
-    try:
-        data = request.get_json() or {}
-        persona = PersonasACargoService.update_persona_a_cargo(rut, data)
-        
-        return success_response(
-            data=persona.to_dict(),
-            message="Persona a cargo actualizada exitosamente"
-        )
-        
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except Exception as e:
-        return handle_db_error(e, "updating persona a cargo")
+    data = get_json_body(request)
+    persona = PersonasACargoService.update_persona_a_cargo(rut, data)
+    
+    return success_response(
+        data=persona.to_dict(),
+        message="Persona a cargo actualizada exitosamente"
+    )
 
 
 @personas_a_cargo_bp.route('/<string:rut>', methods=['DELETE'])
 @can_delete_vital_records
+@handle_crud_errors("persona a cargo", "eliminar")
 def delete_persona_a_cargo(current_user, rut):
     """
     Delete a persona a cargo (admin only).
@@ -140,13 +164,6 @@ def delete_persona_a_cargo(current_user, rut):
     Returns:
         JSON: Success confirmation
     """
-    try:
-        persona = PersonasACargo.query.get_or_404(rut)
-        
-        db.session.delete(persona)
-        db.session.commit()
-        
-        return deleted_response("Persona a cargo eliminada exitosamente")
-        
-    except Exception as e:
-        return handle_db_error(e, "deleting persona a cargo")
\ No newline at end of file
+    PersonasACargoService.delete_persona_a_cargo(rut)
+    
+    return deleted_response("Persona a cargo eliminada exitosamente")
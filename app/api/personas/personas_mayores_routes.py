@@ -9,11 +9,13 @@ from app.extensions import db
 from app.models import PersonasMayores
 from app.auth_utils import apoyo_required, can_update_records, can_delete_vital_records
 from app.api.utils import (
-    paginate_query, success_response, error_response, 
-    created_response, deleted_response, handle_db_error,
-    handle_validation_error, handle_business_logic_error,
-    ValidationError, BusinessLogicError
+    paginate_query, paginate_keyset, success_response,
+    created_response, deleted_response,
+    get_json_body, ValidationError,
+    # Decorators
+    handle_crud_errors, require_json
 )
+from app.api.utils.uow import transactional
 from .services import PersonasMayoresService
 
 personas_mayores_bp = Blueprint(
@@ -25,12 +27,14 @@ personas_mayores_bp = Blueprint(
 
 @personas_mayores_bp.route('', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("personas mayores", "listar")
 def list_personas_mayores(current_user):
     """
     Get paginated list of personas mayores with filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 50, max: 100)
         search (str): Search in RUT, nombre, apellidos
         sector (str): Filter by sector
@@ -39,37 +43,41 @@ def list_personas_mayores(current_user):
     Returns:
         JSON: Paginated list with metadata
     """
-    try:
-        # Get filter parameters
-        search = request.args.get('search', '').strip()
-        sector = request.args.get('sector', '').strip()
-        genero = request.args.get('genero', '').strip()
-        
-        # Build filtered query
-        query = PersonasMayoresService.build_search_query(
-            search=search, 
-            sector=sector, 
-            genero=genero
-        )
-        
-        # Paginate results
+    # Get filter parameters
+    search = request.args.get('search', '').strip()
+    sector = request.args.get('sector', '').strip()
+    genero = request.args.get('genero', '').strip()
+    
+    # Build filtered query
+    query = PersonasMayoresService.build_search_query(
+        search=search, 
+        sector=sector, 
+        genero=genero
+    )
+    
+    # Paginate results: keyset by default, offset (with COUNT) only on request
+    if 'page' in request.args:
         result = paginate_query(query)
-        
-        # Add filter information to response
-        result['filters'] = {
-            'search': search,
-            'sector': sector,
-            'genero': genero
-        }
-        
-        return success_response(data=result)
-        
-    except Exception as e:
-        return handle_db_error(e, "retrieving personas mayores")
+    else:
+        result = paginate_keyset(
+            query,
+            PersonasMayoresService.LIST_ORDER,
+            cursor=request.args.get('cursor')
+        )
+    
+    # Add filter information to response
+    result['filters'] = {
+        'search': search,
+        'sector': sector,
+        'genero': genero
+    }
+    
+    return success_response(data=result)
 
 
 @personas_mayores_bp.route('/<string:rut>', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("persona mayor", "obtener")
 def get_persona_mayor(current_user, rut):
     """
     Get a specific persona mayor by RUT.
@@ -80,16 +88,13 @@ def get_persona_mayor(current_user, rut):
     Returns:
         JSON: Person data
     """
-    try:
-        persona = PersonasMayores.query.get_or_404(rut)
-        return success_response(data=persona.to_dict())
-        
-    except Exception as e:
-        return handle_db_error(e, "retrieving persona mayor")
+    persona = db.get_or_404(PersonasMayores, rut)
+    return success_response(data=persona.to_dict())
 
 
 @personas_mayores_bp.route('', methods=['POST'])
 @can_update_records
+@handle_crud_errors("persona mayor", "crear")
 def create_persona_mayor(current_user):
     """
     Create a new persona mayor.
@@ -109,25 +114,44 @@ def create_persona_mayor(current_user):
     Returns:
         JSON: Created person data
     """
-    try:
-        data = request.get_json() or {}
-        persona = PersonasMayoresService.create_persona_mayor(data)
-        
-        return created_response(
-            data=persona.to_dict(),
-            message="Persona mayor creada exitosamente"
-        )
+    data = get_json_body(request)
+    persona = PersonasMayoresService.create_persona_mayor(data)
+    
+    return created_response(
+        data=persona.to_dict(),
+        message="Persona mayor creada exitosamente"
+    )
+
+
+@personas_mayores_bp.route('/bulk', methods=['POST'])
+@can_update_records
+@handle_crud_errors("personas mayores", "crear")
+@require_json
+def bulk_create_personas_mayores(current_user):
+    """
+    Create several personas mayores in one request.
+    
+    Body (JSON): List of objects with the same fields as the single
+        create endpoint.
         
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "creating persona mayor")
+    Returns:
+        JSON: RUTs of the created people
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValidationError('Se espera una lista de personas mayores')
+    
+    ruts = PersonasMayoresService.create_many(data)
+    
+    return created_response(
+        data={'ruts': ruts},
+        message=f"{len(ruts)} personas mayores creadas exitosamente"
+    )
 
 
 @personas_mayores_bp.route('/<string:rut>', methods=['PUT'])
 @can_update_records
+@handle_crud_errors("persona mayor", "actualizar")
 def update_persona_mayor(current_user, rut):
     """
     Update an existing persona mayor.
@@ -141,23 +165,18 @@ def update_persona_mayor(current_user, rut):
     Returns:
         JSON: Updated person data
     """
-    try:
-        data = request.get_json() or {}
-        persona = PersonasMayoresService.update_persona_mayor(rut, data)
-        
-        return success_response(
-            data=persona.to_dict(),
-            message="Persona mayor actualizada exitosamente"
-        )
-        
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except Exception as e:
-        return handle_db_error(e, "updating persona mayor")
+    data = get_json_body(request)
+    persona = PersonasMayoresService.update_persona_mayor(rut, data)
+    
+    return success_response(
+        data=persona.to_dict(),
+        message="Persona mayor actualizada exitosamente"
+    )
 
 
 @personas_mayores_bp.route('/<string:rut>', methods=['DELETE'])
 @can_delete_vital_records
+@handle_crud_errors("persona mayor", "eliminar")
 def delete_persona_mayor(current_user, rut):
     """
     Delete a persona mayor.
@@ -168,13 +187,9 @@ def delete_persona_mayor(current_user, rut):
     Returns:
         JSON: Success confirmation
     """
-    try:
-        persona = PersonasMayores.query.get_or_404(rut)
-        
+    persona = db.get_or_404(PersonasMayores, rut)
+    
+    with transactional():
         db.session.delete(persona)
-        db.session.commit()
-        
-        return deleted_response("Persona mayor eliminada exitosamente")
-        
-    except Exception as e:
-        return handle_db_error(e, "deleting persona mayor")
\ No newline at end of file
+    
+    return deleted_response("Persona mayor eliminada exitosamente")
@@ -4,13 +4,142 @@ Personas Services
 Business logic layer for person-related operations.
 """
 
-from sqlalchemy import or_
+import re
+from functools import lru_cache
+from sqlalchemy import or_, literal_column, update
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models import PersonasMayores, PersonasACargo
 from app.api.utils.errors import ValidationError, BusinessLogicError
-from app.api.utils import paginate_query
+from app.api.utils import (
+    paginate_query, paginate_keyset, insert_rows, delete_by_pk, forget_reference
+)
+from app.api.utils.uow import transactional
+from app.api.servicios.services import ServicioService
 from app.auth_utils import validate_rut, normalize_rut
-from datetime import datetime, date
+from datetime import date
+
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Columnas que se toman del payload al crear una persona
+_PM_CREATE_FIELDS = (
+    'rut', 'nombre', 'apellidos', 'genero', 'fecha_nacimiento',
+    'direccion', 'sector', 'telefono', 'email'
+)
+_PAC_CREATE_FIELDS = (
+    'rut', 'nombre', 'apellido', 'correo_electronico',
+    'telefono', 'fecha_nacimiento'
+)
+
+# Campos que pueden modificarse en una actualización (el RUT no)
+_PM_UPDATABLE_FIELDS = frozenset((
+    'nombre', 'apellidos', 'genero', 'fecha_nacimiento',
+    'direccion', 'sector', 'telefono', 'email', 'cedula_discapacidad'
+))
+_PAC_UPDATABLE_FIELDS = frozenset((
+    'nombre', 'apellido', 'correo_electronico',
+    'telefono', 'fecha_nacimiento'
+))
+
+# Búsquedas que son un RUT completo, con o sin puntos (12.345.678-5)
+_FULL_RUT_RE = re.compile(r'^(\d{1,2}\.?\d{3}\.?\d{3})-([\dkK])$')
+
+# Búsquedas que parecen el inicio de un RUT (solo dígitos y guión)
+_RUT_PREFIX_RE = re.compile(r'^\d[\d-]*$')
+
+# Textos de búsqueda por persona. Deben coincidir exactamente con las
+# expresiones de los índices trigram (ix_pm_search_trgm, ix_pac_search_trgm)
+# para que PostgreSQL los use; el separador va como literal SQL y no como
+# parámetro por la misma razón.
+_SEPARATOR = literal_column("' '")
+_PM_SEARCH_DOCUMENT = (
+    PersonasMayores.rut
+    .concat(_SEPARATOR).concat(PersonasMayores.nombre)
+    .concat(_SEPARATOR).concat(PersonasMayores.apellidos)
+)
+_PAC_SEARCH_DOCUMENT = (
+    PersonasACargo.rut
+    .concat(_SEPARATOR).concat(PersonasACargo.nombre)
+    .concat(_SEPARATOR).concat(PersonasACargo.apellido)
+)
+
+
+def _search_filter(rut_column, search_document, search):
+    """
+    Build the search predicate for a person table.
+    
+    A complete, valid RUT becomes an equality on the primary key. RUT
+    prefixes use LIKE 'term%', which the varchar_pattern_ops B-tree index
+    on rut can serve. Any other term uses ILIKE '%term%' over the
+    concatenated search document, served by its trigram index.
+    
+    Args:
+        rut_column: RUT column of the model
+        search_document: Concatenated rut/nombre/apellido expression
+        search: Stripped search term
+        
+    Returns:
+        ColumnElement: Filter predicate
+    """
+    match = _FULL_RUT_RE.match(search)
+    if match:
+        rut = f"{match.group(1).replace('.', '')}-{match.group(2)}"
+        if validate_rut(rut):
+            # RUTs are stored as entered, so the K check digit may be either case
+            if rut[-1] in 'kK':
+                return rut_column.in_((rut[:-1] + 'K', rut[:-1] + 'k'))
+            return rut_column == rut
+    
+    if _RUT_PREFIX_RE.match(search):
+        return rut_column.like(f"{search}%")
+    return search_document.ilike(f"%{search}%")
+
+
+# Predicados de búsqueda por término normalizado. Las expresiones SQLAlchemy
+# son inmutables, así que pueden reutilizarse entre peticiones; la
+# compilación a SQL ya la evita el caché de sentencias del engine.
+@lru_cache(maxsize=512)
+def _pm_search_predicate(search):
+    return _search_filter(PersonasMayores.rut, _PM_SEARCH_DOCUMENT, search)
+
+
+@lru_cache(maxsize=512)
+def _pac_search_predicate(search):
+    return _search_filter(PersonasACargo.rut, _PAC_SEARCH_DOCUMENT, search)
+
+
+def _update_persona(model, rut, changes, not_found_message):
+    """
+    Apply a partial update to a person row in a single statement.
+    
+    Issues UPDATE ... WHERE rut = :rut RETURNING *, so the row is neither
+    loaded before the change nor re-selected after it.
+    
+    Args:
+        model: PersonasMayores or PersonasACargo
+        rut: RUT of the person to update
+        changes: Dict of column values to set
+        not_found_message: Error message when the RUT does not exist
+        
+    Returns:
+        Model instance: Updated person
+        
+    Raises:
+        BusinessLogicError: If no person has this RUT
+    """
+    if changes:
+        with transactional():
+            persona = db.session.execute(
+                update(model).where(model.rut == rut).values(**changes).returning(model)
+            ).scalar_one_or_none()
+    else:
+        persona = db.session.get(model, rut)
+    
+    if persona is None:
+        raise BusinessLogicError(not_found_message)
+    
+    return persona
 
 
 class PersonasMayoresService:
@@ -18,6 +147,9 @@ class PersonasMayoresService:
     Service class for PersonasMayores operations.
     """
     
+    # Unique sort key of the list, also used as the keyset pagination key
+    LIST_ORDER = (PersonasMayores.apellidos, PersonasMayores.nombre, PersonasMayores.rut)
+    
     @staticmethod
     def build_search_query(search=None, sector=None, genero=None):
         """
@@ -34,12 +166,7 @@ class PersonasMayoresService:
         query = PersonasMayores.query
         
         if search:
-            search_term = f"%{search.strip()}%"
-            query = query.filter(or_(
-                PersonasMayores.rut.ilike(search_term),
-                PersonasMayores.nombre.ilike(search_term),
-                PersonasMayores.apellidos.ilike(search_term)
-            ))
+            query = query.filter(_pm_search_predicate(search.strip()))
         
         if sector:
             query = query.filter(PersonasMayores.sector.ilike(f"%{sector.strip()}%"))
@@ -47,16 +174,18 @@ class PersonasMayoresService:
         if genero:
             query = query.filter(PersonasMayores.genero == genero)
         
-        return query.order_by(PersonasMayores.apellidos, PersonasMayores.nombre)
+        return query.order_by(*PersonasMayoresService.LIST_ORDER)
     
     @staticmethod
-    def validate_persona_mayor_data(data, is_update=False):
+    def validate_persona_mayor_data(data, is_update=False, current_rut=None):
         """
         Validate persona mayor data.
         
         Args:
             data: Dict with person data
             is_update: Whether this is an update operation
+            current_rut: Stored RUT of the person being updated; an
+                identical RUT in ``data`` is not validated again
             
         Raises:
             ValidationError: If validation fails
@@ -68,8 +197,8 @@ class PersonasMayoresService:
                 if not data.get(field):
                     raise ValidationError(f'{field} es requerido', field=field)
         
-        # Validate RUT if provided
-        if 'rut' in data:
+        # Validate RUT if provided and different from the stored one
+        if 'rut' in data and data['rut'] != current_rut:
             rut = normalize_rut(data['rut'])
             if not rut:
                 raise ValidationError('Formato de RUT inválido', field='rut')
@@ -77,18 +206,14 @@ class PersonasMayoresService:
         
         # Validate email format if provided
         if data.get('email'):
-            import re
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, data['email']):
+            if not _EMAIL_RE.match(data['email']):
                 raise ValidationError('Formato de email inválido', field='email')
         
         # Validate fecha_nacimiento if provided
         if data.get('fecha_nacimiento'):
             try:
                 if isinstance(data['fecha_nacimiento'], str):
-                    data['fecha_nacimiento'] = datetime.strptime(
-                        data['fecha_nacimiento'], '%Y-%m-%d'
-                    ).date()
+                    data['fecha_nacimiento'] = date.fromisoformat(data['fecha_nacimiento'])
             except ValueError:
                 raise ValidationError(
                     'Formato de fecha inválido. Use YYYY-MM-DD', 
@@ -111,29 +236,66 @@ class PersonasMayoresService:
             BusinessLogicError: If business rules are violated
         """
         PersonasMayoresService.validate_persona_mayor_data(data)
+        persona = PersonasMayoresService.build_persona_mayor(data)
         
-        # Check if RUT already exists
-        existing = PersonasMayores.query.filter_by(rut=data['rut']).first()
-        if existing:
+        # The RUT primary key rejects duplicates; no need to query first
+        try:
+            with transactional():
+                db.session.add(persona)
+        except IntegrityError:
             raise BusinessLogicError('Ya existe una persona mayor con este RUT')
         
-        persona = PersonasMayores(
-            rut=data['rut'],
-            nombre=data['nombre'],
-            apellidos=data['apellidos'],
-            genero=data.get('genero'),
-            fecha_nacimiento=data.get('fecha_nacimiento'),
-            direccion=data.get('direccion'),
-            sector=data.get('sector'),
-            telefono=data.get('telefono'),
-            email=data.get('email'),
-            cedula_discapacidad=data.get('cedula_discapacidad', False)
-        )
+        return persona
+    
+    @staticmethod
+    def create_many(data_list):
+        """
+        Create several personas mayores in a single transaction.
         
-        db.session.add(persona)
-        db.session.commit()
+        All items are validated before anything is written; the rows are
+        then inserted with insert_rows (COPY for large batches) and
+        committed once.
         
-        return persona
+        Args:
+            data_list: List of dicts with person data
+            
+        Returns:
+            list: RUTs of the created people
+            
+        Raises:
+            ValidationError: If any item fails validation
+            BusinessLogicError: If any RUT is repeated or already exists
+        """
+        if not data_list:
+            raise ValidationError('Debe proporcionar al menos una persona mayor')
+        
+        for data in data_list:
+            PersonasMayoresService.validate_persona_mayor_data(data)
+        
+        if len({data['rut'] for data in data_list}) != len(data_list):
+            raise BusinessLogicError('La lista contiene RUT repetidos')
+        
+        rows = [PersonasMayoresService.build_persona_mayor_row(data) for data in data_list]
+        
+        try:
+            with transactional():
+                insert_rows(PersonasMayores, rows)
+        except IntegrityError:
+            raise BusinessLogicError('Ya existe una persona mayor con alguno de estos RUT')
+        
+        return [data['rut'] for data in data_list]
+    
+    @staticmethod
+    def build_persona_mayor_row(data):
+        """Build the column values of a persona mayor from validated data."""
+        row = {field: data.get(field) for field in _PM_CREATE_FIELDS}
+        row['cedula_discapacidad'] = data.get('cedula_discapacidad', False)
+        return row
+    
+    @staticmethod
+    def build_persona_mayor(data):
+        """Build an unsaved persona mayor from validated data."""
+        return PersonasMayores(**PersonasMayoresService.build_persona_mayor_row(data))
     
     @staticmethod
     def update_persona_mayor(rut, data):
@@ -149,24 +311,16 @@ class PersonasMayoresService:
             
         Raises:
             ValidationError: If validation fails
+            BusinessLogicError: If the person does not exist
         """
-        persona = PersonasMayores.query.get_or_404(rut)
-        
-        PersonasMayoresService.validate_persona_mayor_data(data, is_update=True)
+        PersonasMayoresService.validate_persona_mayor_data(
+            data, is_update=True, current_rut=rut
+        )
         
         # Update fields
-        updatable_fields = [
-            'nombre', 'apellidos', 'genero', 'fecha_nacimiento',
-            'direccion', 'sector', 'telefono', 'email', 'cedula_discapacidad'
-        ]
-        
-        for field in updatable_fields:
-            if field in data:
-                setattr(persona, field, data[field])
+        changes = {field: data[field] for field in _PM_UPDATABLE_FIELDS.intersection(data)}
         
-        db.session.commit()
-        
-        return persona
+        return _update_persona(PersonasMayores, rut, changes, 'Persona mayor no encontrada')
 
 
 class PersonasACargoService:
@@ -174,20 +328,16 @@ class PersonasACargoService:
     Service class for PersonasACargo operations.
     """
     
+    # Unique sort key of the list, also used as the keyset pagination key
+    LIST_ORDER = (PersonasACargo.apellido, PersonasACargo.nombre, PersonasACargo.rut)
+    
     @staticmethod
     def _base_query(nombre_filter=None, rut_filter=None, search=None):
         """Build base query for personas a cargo with optional filters."""
         query = PersonasACargo.query
 
         if search:
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    PersonasACargo.rut.ilike(search_term),
-                    PersonasACargo.nombre.ilike(search_term),
-                    PersonasACargo.apellido.ilike(search_term),
-                )
-            )
+            query = query.filter(_pac_search_predicate(search.strip()))
 
         if nombre_filter:
             nombre_term = f"%{nombre_filter.strip()}%"
@@ -199,31 +349,49 @@ class PersonasACargoService:
             )
 
         if rut_filter:
-            rut_term = f"%{rut_filter.strip()}%"
-            query = query.filter(PersonasACargo.rut.ilike(rut_term))
+            rut_term = f"{rut_filter.strip()}%"
+            query = query.filter(PersonasACargo.rut.like(rut_term))
 
-        return query.order_by(PersonasACargo.apellido, PersonasACargo.nombre)
+        return query.order_by(*PersonasACargoService.LIST_ORDER)
 
     @staticmethod
     def get_personas_a_cargo(
-        page=1,
+        page=None,
         per_page=10,
         nombre_filter=None,
         rut_filter=None,
         search=None,
+        cursor=None,
+        with_total=False,
     ):
-        """Get paginated list of personas a cargo with optional filters."""
+        """
+        Get paginated list of personas a cargo with optional filters.
+
+        Keyset pagination on LIST_ORDER by default; a page number switches
+        to offset pagination with totals.
+        """
 
         query = PersonasACargoService._base_query(
             nombre_filter=nombre_filter, rut_filter=rut_filter, search=search
         )
 
+        if page is None:
+            return paginate_keyset(
+                query, PersonasACargoService.LIST_ORDER, cursor, per_page,
+                with_total=with_total,
+            )
+
         return paginate_query(query, page, per_page)
 
     @staticmethod
-    def validate_persona_a_cargo_data(data, is_update=False):
+    def validate_persona_a_cargo_data(data, is_update=False, current_rut=None):
         """
         Validate persona a cargo data.
+        
+        Args:
+            data: Dict with person data
+            is_update: Whether this is an update operation
+            current_rut: Stored RUT of the person being updated
         """
         if not is_update:
             required_fields = ['rut', 'nombre', 'apellido']
@@ -231,8 +399,8 @@ class PersonasACargoService:
                 if not data.get(field):
                     raise ValidationError(f'{field} es requerido', field=field)
         
-        # Validate RUT if provided
-        if 'rut' in data:
+        # Validate RUT if provided and different from the stored one
+        if 'rut' in data and data['rut'] != current_rut:
             rut = normalize_rut(data['rut'])
             if not rut:
                 raise ValidationError('Formato de RUT inválido', field='rut')
@@ -240,18 +408,14 @@ class PersonasACargoService:
         
         # Validate email format if provided
         if data.get('correo_electronico'):
-            import re
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not re.match(email_pattern, data['correo_electronico']):
+            if not _EMAIL_RE.match(data['correo_electronico']):
                 raise ValidationError('Formato de email inválido', field='correo_electronico')
         
         # Validate fecha_nacimiento if provided
         if data.get('fecha_nacimiento'):
             try:
                 if isinstance(data['fecha_nacimiento'], str):
-                    data['fecha_nacimiento'] = datetime.strptime(
-                        data['fecha_nacimiento'], '%Y-%m-%d'
-                    ).date()
+                    data['fecha_nacimiento'] = date.fromisoformat(data['fecha_nacimiento'])
             except ValueError:
                 raise ValidationError(
                     'Formato de fecha inválido. Use YYYY-MM-DD', 
@@ -264,45 +428,77 @@ class PersonasACargoService:
         Create a new persona a cargo.
         """
         PersonasACargoService.validate_persona_a_cargo_data(data)
+        persona = PersonasACargoService.build_persona_a_cargo(data)
         
-        # Check if RUT already exists
-        existing = PersonasACargo.query.filter_by(rut=data['rut']).first()
-        if existing:
+        # The RUT primary key rejects duplicates; no need to query first
+        try:
+            with transactional():
+                db.session.add(persona)
+        except IntegrityError:
             raise BusinessLogicError('Ya existe una persona a cargo con este RUT')
         
-        persona = PersonasACargo(
-            rut=data['rut'],
-            nombre=data['nombre'],
-            apellido=data['apellido'],
-            correo_electronico=data.get('correo_electronico'),
-            telefono=data.get('telefono'),
-            fecha_nacimiento=data.get('fecha_nacimiento')
-        )
-        
-        db.session.add(persona)
-        db.session.commit()
-        
         return persona
     
     @staticmethod
-    def update_persona_a_cargo(rut, data):
+    def create_many(data_list):
         """
-        Update an existing persona a cargo.
+        Create several personas a cargo in a single transaction.
+        
+        Rows are inserted with insert_rows (COPY for large batches).
+        Returns the RUTs of the created people.
         """
-        persona = PersonasACargo.query.get_or_404(rut)
+        if not data_list:
+            raise ValidationError('Debe proporcionar al menos una persona a cargo')
         
-        PersonasACargoService.validate_persona_a_cargo_data(data, is_update=True)
+        for data in data_list:
+            PersonasACargoService.validate_persona_a_cargo_data(data)
         
-        # Update fields
-        updatable_fields = [
-            'nombre', 'apellido', 'correo_electronico', 
-            'telefono', 'fecha_nacimiento'
+        if len({data['rut'] for data in data_list}) != len(data_list):
+            raise BusinessLogicError('La lista contiene RUT repetidos')
+        
+        rows = [
+            {field: data.get(field) for field in _PAC_CREATE_FIELDS} for data in data_list
         ]
         
-        for field in updatable_fields:
-            if field in data:
-                setattr(persona, field, data[field])
+        try:
+            with transactional():
+                insert_rows(PersonasACargo, rows)
+        except IntegrityError:
+            raise BusinessLogicError('Ya existe una persona a cargo con alguno de estos RUT')
+        
+        return [data['rut'] for data in data_list]
+    
+    @staticmethod
+    def build_persona_a_cargo(data):
+        """Build an unsaved persona a cargo from validated data."""
+        return PersonasACargo(**{field: data.get(field) for field in _PAC_CREATE_FIELDS})
+    
+    @staticmethod
+    def update_persona_a_cargo(rut, data):
+        """
+        Update an existing persona a cargo.
+        """
+        PersonasACargoService.validate_persona_a_cargo_data(
+            data, is_update=True, current_rut=rut
+        )
         
-        db.session.commit()
+        # Update fields
+        changes = {field: data[field] for field in _PAC_UPDATABLE_FIELDS.intersection(data)}
         
-        return persona
\ No newline at end of file
+        return _update_persona(PersonasACargo, rut, changes, 'Persona a cargo no encontrada')
+
+    @staticmethod
+    def delete_persona_a_cargo(rut):
+        """
+        Delete a persona a cargo with a single DELETE statement.
+
+        The foreign keys set persona_a_cargo to NULL in actividades,
+        talleres and servicios and drop its gestiones, so the cached
+        servicios list is dropped too.
+
+        Raises:
+            BusinessLogicError: If the person does not exist
+        """
+        delete_by_pk(PersonasACargo, rut, 'Persona a cargo no encontrada')
+        forget_reference(PersonasACargo, rut)
+        ServicioService.invalidate_list_cache()
\ No newline at end of file
@@ -4,14 +4,59 @@ Services Management Services
 Business logic layer for services and relationship management operations.
 """
 
-from datetime import datetime
-from app.extensions import db
+from datetime import date
+from sqlalchemy import exists, insert, inspect, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.extensions import db, cache
 from app.models import (
-    Servicios, Participa, Gestiona,
-    PersonasMayores, PersonasACargo, CentrosComunitarios
+    Servicios, Participa, Gestiona, Actividades, Talleres,
+    PersonasMayores, PersonasACargo
+)
+from app.api.utils import (
+    paginate_query, paginate_keyset, skip_list_cache, BaseCRUDService, delete_by_pk,
+    MIN_FILTER_LENGTH
 )
-from app.api.utils import paginate_query, BaseCRUDService
 from app.api.utils.errors import ValidationError, BusinessLogicError
+from app.api.utils.uow import transactional
+from app.api.utils.search import FullTextDocument
+
+
+# Writable columns of Servicios and the length limit of its text columns
+_SERVICIO_FIELDS = frozenset((
+    'nombre', 'lugar', 'direccion_servicio', 'persona_a_cargo',
+    'fecha', 'estado', 'observaciones'
+))
+_SERVICIO_MAX_LENGTHS = {
+    'nombre': 150, 'lugar': 200, 'direccion_servicio': 200,
+    'persona_a_cargo': 12, 'estado': 50
+}
+
+# Full-text document of a service, indexed by ix_servicios_search_fts
+_SERVICIO_SEARCH_DOCUMENT = FullTextDocument(
+    'spanish', Servicios.nombre, Servicios.observaciones
+)
+
+
+def _servicio_name_filter(term):
+    """
+    Build the name filter of the service list.
+    
+    On PostgreSQL a single word of MIN_FILTER_LENGTH or more characters
+    is matched as a prefix against the full-text document (nombre and
+    observaciones) through its GIN index; any other term keeps the ILIKE
+    on nombre, trigram-indexed from three characters on.
+    
+    Args:
+        term: Filter text
+        
+    Returns:
+        ColumnElement: Filter predicate
+    """
+    if len(term) >= MIN_FILTER_LENGTH:
+        predicate = _SERVICIO_SEARCH_DOCUMENT.prefix_match(term)
+        if predicate is not None:
+            return predicate
+    return Servicios.nombre.ilike(f'%{term}%')
 
 
 class ServicioService(BaseCRUDService):
@@ -19,6 +64,20 @@ class ServicioService(BaseCRUDService):
     Service class for service management operations.
     """
     
+    # Columns of Servicios.to_dict(), selected directly by the list endpoint
+    LIST_COLUMNS = (
+        Servicios.id,
+        Servicios.nombre,
+        Servicios.lugar,
+        Servicios.direccion_servicio,
+        Servicios.persona_a_cargo,
+        Servicios.fecha,
+        Servicios.estado,
+        Servicios.observaciones,
+        Servicios.created_at,
+        Servicios.updated_at
+    )
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -35,7 +94,11 @@ class ServicioService(BaseCRUDService):
     @staticmethod
     def validate_servicio_data(data, is_update=False):
         """
-        Validate service data.
+        Validate service data in a single pass over the payload.
+        
+        Text fields are checked against their column length and ``fecha``
+        is parsed once and written back as a date, so building or updating
+        the entity does not parse it again.
         
         Args:
             data: Service data to validate
@@ -44,40 +107,55 @@ class ServicioService(BaseCRUDService):
         Raises:
             ValidationError: If validation fails
         """
-        if not is_update:
-            required_fields = ['nombre']
-            for field in required_fields:
-                if not data.get(field):
-                    raise ValidationError(f'{field.replace("_", " ").title()} es requerido')
-        
-        # Validate name length
-        if 'nombre_servicio' in data and data['nombre_servicio']:
-            if len(data['nombre_servicio']) > 100:
-                raise ValidationError('Nombre del servicio no puede exceder 100 caracteres')
-        
-        # Validate description length
-        if 'descripcion_servicio' in data and data['descripcion_servicio']:
-            if len(data['descripcion_servicio']) > 500:
-                raise ValidationError('Descripción no puede exceder 500 caracteres')
+        if not data.get('nombre') and (not is_update or 'nombre' in data):
+            raise ValidationError('Nombre es requerido', field='nombre')
+        
+        for field in _SERVICIO_FIELDS.intersection(data):
+            value = data[field]
+            if field == 'fecha':
+                if isinstance(value, str):
+                    try:
+                        data['fecha'] = date.fromisoformat(value)
+                    except ValueError:
+                        raise ValidationError('Formato de fecha inválido. Use YYYY-MM-DD', field='fecha')
+            elif value is not None:
+                label = field.replace('_', ' ').capitalize()
+                if not isinstance(value, str):
+                    raise ValidationError(f'{label} debe ser texto', field=field)
+                max_length = _SERVICIO_MAX_LENGTHS.get(field)
+                if max_length and len(value) > max_length:
+                    raise ValidationError(
+                        f'{label} no puede exceder {max_length} caracteres', field=field
+                    )
     
     @staticmethod
-    def get_servicios(page, per_page, nombre_filter=None):
+    @cache.memoize(timeout=60, unless=skip_list_cache)
+    def get_servicios(page=None, per_page=10, nombre_filter=None, cursor=None):
         """
         Get paginated list of services with optional filters.
         
+        Uses keyset pagination (no COUNT query) unless a page number is
+        given, in which case offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             nombre_filter: Filter by service name
+            cursor: Keyset cursor from the previous page (optional)
             
         Returns:
             dict: Paginated service data
         """
-        query = Servicios.query
+        # Core select of the serialized columns: rows go straight to
+        # dicts without building ORM instances (no lazy loads possible)
+        query = select(*ServicioService.LIST_COLUMNS)
         
         # Apply filters
         if nombre_filter:
-            query = query.filter(Servicios.nombre.ilike(f'%{nombre_filter}%'))
+            query = query.filter(_servicio_name_filter(nombre_filter))
+        
+        if page is None:
+            return paginate_keyset(query, (Servicios.nombre, Servicios.id), cursor, per_page)
         
         # Order by name
         query = query.order_by(Servicios.nombre)
@@ -116,19 +194,58 @@ class ServicioService(BaseCRUDService):
             ValidationError: If validation fails
         """
         service = ServicioService()
-        return service.create(data)
+        servicio = service.create(data)
+        ServicioService.invalidate_list_cache()
+        return servicio
+    
+    @staticmethod
+    def bulk_create_servicios(items):
+        """
+        Create several services in a single round-trip.
+        
+        All items are validated first; the rows are then inserted with one
+        executemany statement returning the new IDs, and committed once.
+        
+        Args:
+            items: List of service data dicts
+            
+        Returns:
+            list: IDs of the created services
+            
+        Raises:
+            ValidationError: If any item fails validation
+        """
+        if not items:
+            raise ValidationError('Debe proporcionar al menos un servicio')
+        
+        for data in items:
+            ServicioService.validate_servicio_data(data)
+        
+        # Every row carries the same keys so they are sent as one batch
+        rows = [{field: data.get(field) for field in _SERVICIO_FIELDS} for data in items]
+        
+        with transactional():
+            # Ids in the order of items: clients pair them by position
+            ids = db.session.execute(
+                insert(Servicios).returning(Servicios.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+        
+        ServicioService.invalidate_list_cache()
+        
+        return ids
     
     # BaseCRUDService abstract methods implementation
     def validate_create_data(self, data):
         """Validate data for service creation."""
         ServicioService.validate_servicio_data(data)
     
+    def build_row(self, data):
+        """Build the column values of a service from data."""
+        return {field: data[field] for field in _SERVICIO_FIELDS.intersection(data)}
+    
     def build_entity(self, data):
         """Build service instance from data."""
-        return Servicios(
-            nombre_servicio=data.get('nombre_servicio'),
-            descripcion_servicio=data.get('descripcion_servicio')
-        )
+        return Servicios(**self.build_row(data))
     
     @staticmethod
     def update_servicio(servicio_id, data):
@@ -147,7 +264,9 @@ class ServicioService(BaseCRUDService):
             BusinessLogicError: If service not found
         """
         service = ServicioService()
-        return service.update(servicio_id, data)
+        servicio = service.update(servicio_id, data)
+        ServicioService.invalidate_list_cache()
+        return servicio
     
     def validate_update_data(self, data, entity):
         """Validate data for service update."""
@@ -155,11 +274,8 @@ class ServicioService(BaseCRUDService):
     
     def update_entity_fields(self, entity, data):
         """Update service fields with new data."""
-        if 'nombre_servicio' in data:
-            entity.nombre_servicio = data['nombre_servicio']
-        
-        if 'descripcion_servicio' in data:
-            entity.descripcion_servicio = data['descripcion_servicio']
+        for field in _SERVICIO_FIELDS.intersection(data):
+            setattr(entity, field, data[field])
     
     @staticmethod
     def delete_servicio(servicio_id):
@@ -172,23 +288,128 @@ class ServicioService(BaseCRUDService):
         Raises:
             BusinessLogicError: If service not found
         """
-        service = ServicioService()
-        return service.delete(servicio_id)
+        ServicioService().delete_by_id(servicio_id)
+        ServicioService.invalidate_list_cache()
+        return True
+    
+    @staticmethod
+    def invalidate_list_cache():
+        """Drop every cached page of the service list."""
+        cache.delete_memoized(ServicioService.get_servicios)
 
 
 class RelacionService:
     """
     Service class for relationship management (Participa and Gestiona).
+    
+    Both relations link a person, by RUT, to an actividad, taller or
+    servicio identified by ``tipo`` and ``id_actividad_taller_servicio``.
     """
     
+    # Target table for each relation tipo and its not-found message
+    TARGETS = {
+        'actividad': (Actividades, 'Actividad no encontrada'),
+        'taller': (Talleres, 'Taller no encontrado'),
+        'servicio': (Servicios, 'Servicio no encontrado'),
+    }
+    
+    @staticmethod
+    def _target_exists(tipo, target_id):
+        """
+        Build the EXISTS clause for the actividad, taller or servicio.
+        
+        Raises:
+            ValidationError: If tipo is invalid
+        """
+        # tipo llega del cuerpo JSON: una lista u objeto no es hashable
+        if not isinstance(tipo, str) or tipo not in RelacionService.TARGETS:
+            raise ValidationError('Tipo inválido. Use actividad, taller o servicio', field='tipo')
+        target_model = RelacionService.TARGETS[tipo][0]
+        return exists().where(target_model.id == target_id)
+    
     @staticmethod
-    def create_participacion(persona_mayor_id, actividad_id):
+    def _check_relation_ends(persona_exists, tipo, target_id, persona_missing):
+        """
+        Check in a single query that both ends of a new relation exist.
+        
+        Args:
+            persona_exists: EXISTS clause for the person
+            tipo: Relation type ('actividad', 'taller' or 'servicio')
+            target_id: ID of the actividad, taller or servicio
+            persona_missing: Error message when the person does not exist
+            
+        Raises:
+            ValidationError: If tipo is invalid or either end does not exist
+        """
+        target_exists = RelacionService._target_exists(tipo, target_id)
+        
+        row = db.session.execute(select(
+            persona_exists.label('persona'),
+            target_exists.label('destino'),
+        )).one()
+        
+        if not row.persona:
+            raise ValidationError(persona_missing)
+        if not row.destino:
+            raise ValidationError(RelacionService.TARGETS[tipo][1])
+    
+    @staticmethod
+    def _insert_relation(model, persona_exists, persona_missing, **values):
+        """
+        Insert a relation row if both ends exist and it is not a duplicate.
+        
+        Runs a single INSERT ... SELECT ... WHERE EXISTS (persona) AND
+        EXISTS (destino) ON CONFLICT (primary key) DO NOTHING RETURNING, so
+        the reference checks, the duplicate check and the insert are one
+        race-free statement. Only when nothing is inserted is a second
+        query run to tell a missing end from a duplicate. The returned
+        instance is detached before the commit so that it keeps the values
+        RETURNING loaded.
+        
+        Args:
+            model: Participa or Gestiona
+            persona_exists: EXISTS clause for the person
+            persona_missing: Error message when the person does not exist
+            values: Column values of the new row
+            
+        Returns:
+            Model instance: Created relation
+            
+        Raises:
+            ValidationError: If tipo is invalid or either end does not exist
+            BusinessLogicError: If the relation already exists
+        """
+        tipo = values['tipo']
+        target_id = values['id_actividad_taller_servicio']
+        target_exists = RelacionService._target_exists(tipo, target_id)
+        
+        columns = model.__table__.c
+        source = select(
+            *(literal(value, columns[name].type) for name, value in values.items())
+        ).where(persona_exists, target_exists)
+        stmt = pg_insert(model).from_select(list(values), source).on_conflict_do_nothing(
+            index_elements=inspect(model).primary_key
+        ).returning(model)
+        
+        with transactional():
+            relation = db.session.execute(stmt).scalar_one_or_none()
+        
+        if relation is None:
+            RelacionService._check_relation_ends(
+                persona_exists, tipo, target_id, persona_missing
+            )
+            raise BusinessLogicError('La relación ya existe')
+        return relation
+    
+    @staticmethod
+    def create_participacion(rut_persona, tipo, id_destino):
         """
         Create a participation relationship.
         
         Args:
-            persona_mayor_id: Elderly person ID
-            actividad_id: Activity ID
+            rut_persona: Elderly person RUT
+            tipo: 'actividad', 'taller' or 'servicio'
+            id_destino: ID of the actividad, taller or servicio
             
         Returns:
             Participa: Created participation instance
@@ -197,64 +418,39 @@ class RelacionService:
             ValidationError: If validation fails
             BusinessLogicError: If relationship already exists
         """
-        # Validate entities exist
-        if not PersonasMayores.query.get(persona_mayor_id):
-            raise ValidationError('Persona mayor no encontrada')
-        
-        # Note: We'll need to import Actividades here or check differently
-        # For now, assume the relationship is valid if entities exist
-        
-        # Check if relationship already exists
-        existing = Participa.query.filter_by(
-            id_persona_mayor=persona_mayor_id,
-            id_actividad=actividad_id
-        ).first()
-        
-        if existing:
-            raise BusinessLogicError('Esta persona ya participa en esta actividad')
-        
-        # Create participation
-        participacion = Participa(
-            id_persona_mayor=persona_mayor_id,
-            id_actividad=actividad_id
+        return RelacionService._insert_relation(
+            Participa,
+            exists().where(PersonasMayores.rut == rut_persona),
+            'Persona mayor no encontrada',
+            rut_persona=rut_persona,
+            tipo=tipo,
+            id_actividad_taller_servicio=id_destino
         )
-        
-        db.session.add(participacion)
-        db.session.commit()
-        
-        return participacion
     
     @staticmethod
-    def delete_participacion(persona_mayor_id, actividad_id):
+    def delete_participacion(rut_persona, tipo, id_destino):
         """
         Delete a participation relationship.
         
         Args:
-            persona_mayor_id: Elderly person ID
-            actividad_id: Activity ID
+            rut_persona: Elderly person RUT
+            tipo: 'actividad', 'taller' or 'servicio'
+            id_destino: ID of the actividad, taller or servicio
             
         Raises:
             BusinessLogicError: If relationship not found
         """
-        participacion = Participa.query.filter_by(
-            id_persona_mayor=persona_mayor_id,
-            id_actividad=actividad_id
-        ).first()
-        
-        if not participacion:
-            raise BusinessLogicError('Participación no encontrada')
-        
-        db.session.delete(participacion)
-        db.session.commit()
+        delete_by_pk(Participa, (rut_persona, tipo, id_destino), 'Participación no encontrada')
     
     @staticmethod
-    def create_gestion(persona_a_cargo_id, centro_id):
+    def create_gestion(rut_persona_a_cargo, tipo, id_destino):
         """
         Create a management relationship.
         
         Args:
-            persona_a_cargo_id: Person in charge ID
-            centro_id: Community center ID
+            rut_persona_a_cargo: Person in charge RUT
+            tipo: 'actividad', 'taller' or 'servicio'
+            id_destino: ID of the actividad, taller or servicio
             
         Returns:
             Gestiona: Created management instance
@@ -263,52 +459,26 @@ class RelacionService:
             ValidationError: If validation fails
             BusinessLogicError: If relationship already exists
         """
-        # Validate entities exist
-        if not PersonasACargo.query.get(persona_a_cargo_id):
-            raise ValidationError('Persona a cargo no encontrada')
-        
-        if not CentrosComunitarios.query.get(centro_id):
-            raise ValidationError('Centro comunitario no encontrado')
-        
-        # Check if relationship already exists
-        existing = Gestiona.query.filter_by(
-            id_persona_a_cargo=persona_a_cargo_id,
-            id_centro=centro_id
-        ).first()
-        
-        if existing:
-            raise BusinessLogicError('Esta persona ya gestiona este centro')
-        
-        # Create management
-        gestion = Gestiona(
-            id_persona_a_cargo=persona_a_cargo_id,
-            id_centro=centro_id
+        return RelacionService._insert_relation(
+            Gestiona,
+            exists().where(PersonasACargo.rut == rut_persona_a_cargo),
+            'Persona a cargo no encontrada',
+            rut_persona_a_cargo=rut_persona_a_cargo,
+            tipo=tipo,
+            id_actividad_taller_servicio=id_destino
         )
-        
-        db.session.add(gestion)
-        db.session.commit()
-        
-        return gestion
     
     @staticmethod
-    def delete_gestion(persona_a_cargo_id, centro_id):
+    def delete_gestion(rut_persona_a_cargo, tipo, id_destino):
         """
         Delete a management relationship.
         
         Args:
-            persona_a_cargo_id: Person in charge ID
-            centro_id: Community center ID
+            rut_persona_a_cargo: Person in charge RUT
+            tipo: 'actividad', 'taller' or 'servicio'
+            id_destino: ID of the actividad, taller or servicio
             
         Raises:
             BusinessLogicError: If relationship not found
         """
-        gestion = Gestiona.query.filter_by(
-            id_persona_a_cargo=persona_a_cargo_id,
-            id_centro=centro_id
-        ).first()
-        
-        if not gestion:
-            raise BusinessLogicError('Gestión no encontrada')
-        
-        db.session.delete(gestion)
-        db.session.commit()
\ No newline at end of file
+        delete_by_pk(Gestiona, (rut_persona_a_cargo, tipo, id_destino), 'Gestión no encontrada')
@@ -7,9 +7,10 @@ RESTful endpoints for support worker management.
 from flask import Blueprint, request
 from app.auth_utils import apoyo_required, can_update_records, can_delete_vital_records
 from app.api.utils import (
-    success_response, error_response, created_response,
-    handle_validation_error, handle_business_logic_error, handle_db_error,
-    get_request_args, ValidationError, BusinessLogicError
+    success_response, created_response, streamed_json_response,
+    get_request_args, get_json_body, ValidationError,
+    # Decorators
+    handle_crud_errors, require_json
 )
 from .services import TrabajadorApoyoService
 
@@ -18,39 +19,40 @@ trabajadores_bp = Blueprint('trabajadores', __name__, url_prefix='/api/trabajado
 
 @trabajadores_bp.route('/', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("trabajadores de apoyo", "listar")
 def get_trabajadores(current_user):
     """
     Get paginated list of support workers with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
-        nombre (str): Filter by worker name or last name
+        nombre (str): Filter by worker name or last name; a single word
+            of 3+ characters matches the start of any word of either
         centro (int): Filter by center ID
         cargo (str): Filter by position/role
         
     Returns:
         JSON: Paginated support workers list
     """
-    try:
-        args = get_request_args(request)
-        
-        result = TrabajadorApoyoService.get_trabajadores(
-            page=args.get('page', 1),
-            per_page=min(args.get('per_page', 10), 100),
-            nombre_filter=args.get('nombre'),
-            centro_filter=args.get('centro'),
-            cargo_filter=args.get('cargo')
-        )
-        
-        return success_response(data=result)
-        
-    except Exception as e:
-        return handle_db_error(e, "retrieving support workers")
+    args = get_request_args(request)
+    
+    result = TrabajadorApoyoService.get_trabajadores(
+        page=args.get('page'),
+        cursor=args.get('cursor'),
+        per_page=min(args.get('per_page', 10), 100),
+        nombre_filter=args.get('nombre'),
+        centro_filter=args.get('centro'),
+        cargo_filter=args.get('cargo')
+    )
+    
+    return success_response(data=result)
 
 
 @trabajadores_bp.route('/<string:rut>', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("trabajador de apoyo", "obtener")
 def get_trabajador(current_user, rut):
     """
     Get support worker by RUT.
@@ -61,22 +63,17 @@ def get_trabajador(current_user, rut):
     Returns:
         JSON: Support worker data
     """
-    try:
-        trabajador = TrabajadorApoyoService.get_trabajador_by_rut(rut)
-        
-        return success_response(
-            data=trabajador.to_dict(),
-            message="Trabajador de apoyo encontrado"
-        )
-        
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "retrieving support worker")
+    trabajador = TrabajadorApoyoService.get_trabajador_by_rut(rut)
+    
+    return success_response(
+        data=trabajador.to_dict(),
+        message="Trabajador de apoyo encontrado"
+    )
 
 
 @trabajadores_bp.route('/', methods=['POST'])
 @can_update_records
+@handle_crud_errors("trabajador de apoyo", "crear")
 def create_trabajador(current_user):
     """
     Create a new support worker.
@@ -91,25 +88,44 @@ def create_trabajador(current_user):
     Returns:
         JSON: Created support worker data
     """
-    try:
-        data = request.get_json() or {}
-        trabajador = TrabajadorApoyoService.create_trabajador(data)
-        
-        return created_response(
-            data=trabajador.to_dict(),
-            message="Trabajador de apoyo creado exitosamente"
-        )
+    data = get_json_body(request)
+    trabajador = TrabajadorApoyoService.create_trabajador(data)
+    
+    return created_response(
+        data=trabajador.to_dict(),
+        message="Trabajador de apoyo creado exitosamente"
+    )
+
+
+@trabajadores_bp.route('/bulk', methods=['POST'])
+@can_update_records
+@handle_crud_errors("trabajadores de apoyo", "crear")
+@require_json
+def bulk_create_trabajadores(current_user):
+    """
+    Create several support workers in one request.
+    
+    Body (JSON): List of worker objects with the same fields as the
+        single create endpoint.
         
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "creating support worker")
+    Returns:
+        JSON: RUTs of the created support workers
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValidationError('Se espera una lista de trabajadores de apoyo')
+    
+    ruts = TrabajadorApoyoService.bulk_create_trabajadores(data)
+    
+    return created_response(
+        data={'ruts': ruts},
+        message=f"{len(ruts)} trabajadores de apoyo creados exitosamente"
+    )
 
 
 @trabajadores_bp.route('/<string:rut>', methods=['PUT'])
 @can_update_records
+@handle_crud_errors("trabajador de apoyo", "actualizar")
 def update_trabajador(current_user, rut):
     """
     Update a support worker.
@@ -122,25 +138,18 @@ def update_trabajador(current_user, rut):
     Returns:
         JSON: Updated support worker data
     """
-    try:
-        data = request.get_json() or {}
-        trabajador = TrabajadorApoyoService.update_trabajador(rut, data)
-        
-        return success_response(
-            data=trabajador.to_dict(),
-            message="Trabajador de apoyo actualizado exitosamente"
-        )
-        
-    except ValidationError as e:
-        return handle_validation_error(e)
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "updating support worker")
+    data = get_json_body(request)
+    trabajador = TrabajadorApoyoService.update_trabajador(rut, data)
+    
+    return success_response(
+        data=trabajador.to_dict(),
+        message="Trabajador de apoyo actualizado exitosamente"
+    )
 
 
 @trabajadores_bp.route('/<string:rut>', methods=['DELETE'])
 @can_delete_vital_records
+@handle_crud_errors("trabajador de apoyo", "eliminar")
 def delete_trabajador(current_user, rut):
     """
     Delete a support worker.
@@ -151,21 +160,16 @@ def delete_trabajador(current_user, rut):
     Returns:
         JSON: Deletion confirmation
     """
-    try:
-        TrabajadorApoyoService.delete_trabajador(rut)
-        
-        return success_response(
-            message="Trabajador de apoyo eliminado exitosamente"
-        )
-        
-    except BusinessLogicError as e:
-        return handle_business_logic_error(e)
-    except Exception as e:
-        return handle_db_error(e, "deleting support worker")
+    TrabajadorApoyoService.delete_trabajador(rut)
+    
+    return success_response(
+        message="Trabajador de apoyo eliminado exitosamente"
+    )
 
 
 @trabajadores_bp.route('/centro/<int:centro_id>', methods=['GET'])
 @apoyo_required
+@handle_crud_errors("trabajadores del centro", "obtener")
 def get_trabajadores_by_centro(current_user, centro_id):
     """
     Get all support workers for a specific center.
@@ -176,13 +180,11 @@ def get_trabajadores_by_centro(current_user, centro_id):
     Returns:
         JSON: List of support workers for the center
     """
-    try:
-        trabajadores = TrabajadorApoyoService.get_trabajadores_by_centro(centro_id)
-        
-        return success_response(
-            data=[t.to_dict() for t in trabajadores],
-            message=f"Trabajadores del centro {centro_id} obtenidos exitosamente"
-        )
-        
-    except Exception as e:
-        return handle_db_error(e, "retrieving center support workers")
\ No newline at end of file
+    batches = TrabajadorApoyoService.get_trabajadores_by_centro(centro_id)
+    
+    return streamed_json_response(
+        batches,
+        # orjson writes the timestamps in ISO format itself
+        lambda row: row._asdict(),
+        message=f"Trabajadores del centro {centro_id} obtenidos exitosamente"
+    )
@@ -4,18 +4,106 @@ Support Workers Services
 Business logic layer for support worker management operations.
 """
 
-from app.extensions import db
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, cache
 from app.models import TrabajadoresApoyo, CentrosComunitarios
-from app.api.utils import paginate_query, BaseCRUDService
+from app.api.utils import (
+    paginate_query, paginate_keyset, skip_list_cache, BaseCRUDService, record_exists,
+    reference_exists, missing_references, forget_reference, insert_rows, MIN_FILTER_LENGTH
+)
 from app.api.utils.errors import ValidationError, BusinessLogicError
+from app.api.utils.uow import transactional
+from app.api.utils.search import FullTextDocument
+import logging
 import re
 
 
+logger = logging.getLogger(__name__)
+
+# Worker RUTs are stored without dots or dash (e.g. 123456785)
+_RUT_RE = re.compile(r'^\d{7,8}[0-9Kk]$')
+_RUT_STRIP = str.maketrans('', '', '.-')
+
+
+def _clean_rut(rut):
+    """Strip dots and dash from a RUT in a single pass."""
+    # Most clients already send the stored form; skip the copy for those
+    if '.' not in rut and '-' not in rut:
+        return rut
+    return rut.translate(_RUT_STRIP)
+
+
+# Full-text document of a worker's name, indexed by ix_trabajadores_search_fts.
+# The 'simple' configuration does not stem, which suits personal names.
+_TRABAJADOR_SEARCH_DOCUMENT = FullTextDocument(
+    'simple', TrabajadoresApoyo.nombre, TrabajadoresApoyo.apellidos
+)
+
+
+def _trabajador_name_filter(term):
+    """
+    Build the name filter of the worker list.
+    
+    On PostgreSQL a single word of MIN_FILTER_LENGTH or more characters
+    is matched as a prefix of any word of nombre or apellidos through one
+    GIN index; any other term keeps the ILIKE on both columns,
+    trigram-indexed from three characters on.
+    
+    Args:
+        term: Filter text
+        
+    Returns:
+        ColumnElement: Filter predicate
+    """
+    if len(term) >= MIN_FILTER_LENGTH:
+        predicate = _TRABAJADOR_SEARCH_DOCUMENT.prefix_match(term)
+        if predicate is not None:
+            return predicate
+    return (
+        TrabajadoresApoyo.nombre.ilike(f'%{term}%') |
+        TrabajadoresApoyo.apellidos.ilike(f'%{term}%')
+    )
+
+
+# Rows fetched per batch when streaming the workers of a center
+_CENTRO_BATCH_SIZE = 500
+
+# Columns taken from the payload when creating a worker
+_TRABAJADOR_CREATE_FIELDS = ('rut', 'nombre', 'apellidos', 'cargo', 'id_centro')
+
+# Columns that can be changed on update (the RUT cannot)
+_TRABAJADOR_UPDATABLE_FIELDS = frozenset(('nombre', 'apellidos', 'cargo', 'id_centro'))
+
+# Text fields of a worker with their column length and error message
+_TRABAJADOR_TEXT_FIELDS = (
+    ('nombre', 100, 'Nombre no puede exceder 100 caracteres'),
+    ('apellidos', 150, 'Apellidos no pueden exceder 150 caracteres'),
+    ('cargo', 100, 'Cargo no puede exceder 100 caracteres'),
+)
+
+
 class TrabajadorApoyoService(BaseCRUDService):
     """
     Service class for support worker management operations.
     """
     
+    # Columns of TrabajadoresApoyo.to_dict(), selected directly by the
+    # read-only list endpoints
+    LIST_COLUMNS = (
+        TrabajadoresApoyo.rut,
+        TrabajadoresApoyo.nombre,
+        TrabajadoresApoyo.apellidos,
+        TrabajadoresApoyo.cargo,
+        TrabajadoresApoyo.id_centro,
+        TrabajadoresApoyo.created_at,
+        TrabajadoresApoyo.updated_at
+    )
+    
+    # Unique, non-null sort key of the list, used for keyset pagination
+    # (apellidos is nullable, so it cannot be part of a row comparison)
+    LIST_ORDER = (TrabajadoresApoyo.nombre, TrabajadoresApoyo.rut)
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -30,13 +118,15 @@ class TrabajadorApoyoService(BaseCRUDService):
         return 'rut'
     
     @staticmethod
-    def validate_trabajador_data(data, is_update=False):
+    def validate_trabajador_data(data, is_update=False, check_centro=True):
         """
         Validate support worker data.
         
         Args:
             data: Worker data to validate
             is_update: Whether this is an update operation
+            check_centro: Whether to query the center here (bulk callers
+                validate all centers with a single query instead)
             
         Raises:
             ValidationError: If validation fails
@@ -48,65 +138,71 @@ class TrabajadorApoyoService(BaseCRUDService):
                     raise ValidationError(f'{field.replace("_", " ").title()} es requerido')
         
         # Validate RUT format
-        if 'rut' in data and data['rut']:
-            rut = data['rut'].replace('.', '').replace('-', '')
-            if not re.match(r'^\d{7,8}[0-9Kk]$', rut):
+        rut = data.get('rut')
+        if rut:
+            if not isinstance(rut, str) or not _RUT_RE.match(_clean_rut(rut)):
                 raise ValidationError('Formato de RUT inválido')
         
-        # Validate name length
-        if 'nombre' in data and data['nombre']:
-            if len(data['nombre']) > 100:
-                raise ValidationError('Nombre no puede exceder 100 caracteres')
-        
-        # Validate apellidos length
-        if 'apellidos' in data and data['apellidos']:
-            if len(data['apellidos']) > 150:
-                raise ValidationError('Apellidos no pueden exceder 150 caracteres')
-        
-        # Validate cargo length
-        if 'cargo' in data and data['cargo']:
-            if len(data['cargo']) > 100:
-                raise ValidationError('Cargo no puede exceder 100 caracteres')
-        
-        # Validate center exists
-        if 'id_centro' in data and data['id_centro']:
-            centro = CentrosComunitarios.query.get(data['id_centro'])
-            if not centro:
+        # Validate text fields: type and column length
+        for field, max_length, message in _TRABAJADOR_TEXT_FIELDS:
+            value = data.get(field)
+            if value:
+                if not isinstance(value, str):
+                    raise ValidationError(f'{field.title()} debe ser texto')
+                if len(value) > max_length:
+                    raise ValidationError(message)
+        
+        # Validate center: an integer ID (a string or list would reach the
+        # cached reference checks and the batched IN query as is)
+        id_centro = data.get('id_centro')
+        if id_centro is not None and type(id_centro) is not int:
+            raise ValidationError('ID de centro comunitario debe ser un número entero')
+        if check_centro and id_centro:
+            if not reference_exists(CentrosComunitarios, id_centro):
                 raise ValidationError('Centro comunitario no encontrado')
     
     @staticmethod
-    def get_trabajadores(page=1, per_page=10, nombre_filter=None, centro_filter=None, cargo_filter=None):
+    @cache.memoize(timeout=60, unless=skip_list_cache)
+    def get_trabajadores(page=None, per_page=10, nombre_filter=None, centro_filter=None,
+                         cargo_filter=None, cursor=None):
         """
         Get paginated list of support workers with optional filters.
         
+        Uses keyset pagination on (nombre, rut), served by
+        ix_trabajadores_nombre_rut, unless a page number is given, in which
+        case offset pagination with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             nombre_filter: Filter by worker name
             centro_filter: Filter by center ID
             cargo_filter: Filter by position/role
+            cursor: Keyset cursor from the previous page (optional)
             
         Returns:
             dict: Paginated worker data
         """
-        query = TrabajadoresApoyo.query
+        # Plain rows instead of ORM instances: the list is read-only
+        query = select(*TrabajadorApoyoService.LIST_COLUMNS)
         
-        # Apply filters
+        # Apply filters (terms under three characters cannot use the
+        # trigram indexes, but are still applied)
         if nombre_filter:
-            query = query.filter(
-                (TrabajadoresApoyo.nombre.ilike(f'%{nombre_filter}%')) |
-                (TrabajadoresApoyo.apellidos.ilike(f'%{nombre_filter}%'))
-            )
+            query = query.where(_trabajador_name_filter(nombre_filter))
         
         if centro_filter:
             try:
                 centro_id = int(centro_filter)
-                query = query.filter(TrabajadoresApoyo.id_centro == centro_id)
+                query = query.where(TrabajadoresApoyo.id_centro == centro_id)
             except ValueError:
                 pass  # Invalid center ID, ignore filter
         
         if cargo_filter:
-            query = query.filter(TrabajadoresApoyo.cargo.ilike(f'%{cargo_filter}%'))
+            query = query.where(TrabajadoresApoyo.cargo.ilike(f'%{cargo_filter}%'))
+        
+        if page is None:
+            return paginate_keyset(query, TrabajadorApoyoService.LIST_ORDER, cursor, per_page)
         
         # Order by name
         query = query.order_by(TrabajadoresApoyo.nombre, TrabajadoresApoyo.apellidos)
@@ -117,10 +213,10 @@ class TrabajadorApoyoService(BaseCRUDService):
     def get_trabajador_by_rut(rut):
         """
         Get support worker by RUT.
-        Soporta formatos XXXXXXX-X y XXXXXXXX-X
+        Soporta formatos con o sin puntos y guión (12.345.678-5, 123456785)
         
         Args:
-            rut: Worker RUT (con guión)
+            rut: Worker RUT
             
         Returns:
             TrabajadoresApoyo: Worker instance
@@ -128,26 +224,21 @@ class TrabajadorApoyoService(BaseCRUDService):
         Raises:
             BusinessLogicError: If worker not found
         """
-        from app.auth_utils import normalize_rut
-        import logging
-        
-        logger = logging.getLogger(__name__)
-        
-        # Normalize and validate RUT format
-        normalized_rut = normalize_rut(rut)
-        if not normalized_rut:
+        # Clean and validate RUT format; workers are stored without
+        # dots or dash, so the cleaned RUT is the primary key
+        rut_clean = _clean_rut(rut)
+        if not _RUT_RE.match(rut_clean):
             logger.warning(f"Formato de RUT inválido: {rut}")
             raise BusinessLogicError('Formato de RUT inválido')
         
-        # Search worker by normalized RUT (which is the primary key)
         service = TrabajadorApoyoService()
         
         try:
-            trabajador = service.get_by_id(normalized_rut)
-            logger.info(f"Trabajador encontrado: {normalized_rut}")
+            trabajador = service.get_by_id(rut_clean)
+            logger.info(f"Trabajador encontrado: {rut_clean}")
             return trabajador
         except BusinessLogicError:
-            logger.warning(f"Trabajador con RUT {normalized_rut} no encontrado")
+            logger.warning(f"Trabajador con RUT {rut_clean} no encontrado")
             raise BusinessLogicError('Trabajador de apoyo no encontrado')
     
     @staticmethod
@@ -166,7 +257,75 @@ class TrabajadorApoyoService(BaseCRUDService):
             BusinessLogicError: If business rules are violated
         """
         service = TrabajadorApoyoService()
-        return service.create(data)
+        
+        # The insert itself rejects a repeated RUT, so the common path
+        # needs no lookup; only a failed insert is checked for the cause
+        try:
+            trabajador = service.create(data)
+        except IntegrityError:
+            if record_exists(TrabajadoresApoyo, data['rut']):
+                raise BusinessLogicError('Ya existe un trabajador con este RUT')
+            # The center was validated from the reference cache; an entry
+            # outliving a deletion in another process ends up here
+            id_centro = data.get('id_centro')
+            if id_centro and not record_exists(CentrosComunitarios, id_centro):
+                forget_reference(CentrosComunitarios, id_centro)
+                raise ValidationError('Centro comunitario no encontrado')
+            raise
+        
+        TrabajadorApoyoService.invalidate_list_cache()
+        return trabajador
+    
+    @staticmethod
+    def bulk_create_trabajadores(items):
+        """
+        Create several support workers in a single round-trip.
+        
+        All items are validated first; the referenced centers are checked
+        with one query, and the rows are inserted with insert_rows (COPY
+        for large batches) and a single commit. Duplicate RUTs are rejected
+        by the primary key instead of being looked up one by one.
+        
+        Args:
+            items: List of worker data dicts
+            
+        Returns:
+            list: Cleaned RUTs of the created workers
+            
+        Raises:
+            ValidationError: If any item fails validation
+            BusinessLogicError: If any RUT is repeated or already exists
+        """
+        if not items:
+            raise ValidationError('Debe proporcionar al menos un trabajador')
+        
+        for data in items:
+            TrabajadorApoyoService.validate_trabajador_data(data, check_centro=False)
+            data['rut'] = _clean_rut(data['rut'])
+        
+        ruts = [data['rut'] for data in items]
+        if len(set(ruts)) != len(ruts):
+            raise BusinessLogicError('La lista contiene RUT repetidos')
+        
+        # Validate all referenced centers with at most one query
+        centro_ids = (data['id_centro'] for data in items if data.get('id_centro'))
+        if missing_references(CentrosComunitarios, centro_ids):
+            raise ValidationError('Centro comunitario no encontrado')
+        
+        rows = [
+            {field: data.get(field) for field in _TRABAJADOR_CREATE_FIELDS}
+            for data in items
+        ]
+        
+        try:
+            with transactional():
+                insert_rows(TrabajadoresApoyo, rows)
+        except IntegrityError:
+            raise BusinessLogicError('Ya existe un trabajador con alguno de estos RUT')
+        
+        TrabajadorApoyoService.invalidate_list_cache()
+        
+        return ruts
     
     # BaseCRUDService abstract methods implementation
     def validate_create_data(self, data):
@@ -174,23 +333,16 @@ class TrabajadorApoyoService(BaseCRUDService):
         # Validate data
         TrabajadorApoyoService.validate_trabajador_data(data)
         
-        # Clean RUT
-        rut_clean = data['rut'].replace('.', '').replace('-', '')
-        data['rut'] = rut_clean  # Update with cleaned RUT
-        
-        # Check if worker already exists
-        if not self.check_unique_field('rut', rut_clean):
-            raise BusinessLogicError('Ya existe un trabajador con este RUT')
+        # Clean RUT; duplicates are detected by the primary key on insert
+        data['rut'] = _clean_rut(data['rut'])
+    
+    def build_row(self, data):
+        """Build the column values of a worker from data."""
+        return {field: data.get(field) for field in _TRABAJADOR_CREATE_FIELDS}
     
     def build_entity(self, data):
         """Build worker instance from data."""
-        return TrabajadoresApoyo(
-            rut=data['rut'],
-            nombre=data['nombre'],
-            apellidos=data.get('apellidos'),
-            cargo=data.get('cargo'),
-            id_centro=data.get('id_centro')
-        )
+        return TrabajadoresApoyo(**self.build_row(data))
     
     @staticmethod
     def update_trabajador(rut, data):
@@ -209,26 +361,25 @@ class TrabajadorApoyoService(BaseCRUDService):
             BusinessLogicError: If business rules are violated
         """
         # Clean RUT
-        rut_clean = rut.replace('.', '').replace('-', '')
+        rut_clean = _clean_rut(rut)
         
         service = TrabajadorApoyoService()
-        return service.update(rut_clean, data)
+        trabajador = service.update(rut_clean, data)
+        TrabajadorApoyoService.invalidate_list_cache()
+        return trabajador
     
     def validate_update_data(self, data, entity):
         """Validate data for worker update."""
         TrabajadorApoyoService.validate_trabajador_data(data, is_update=True)
     
+    def update_values(self, data):
+        """Updatable worker columns present in the data."""
+        return {field: data[field] for field in _TRABAJADOR_UPDATABLE_FIELDS.intersection(data)}
+    
     def update_entity_fields(self, entity, data):
         """Update worker fields with new data."""
-        # Update fields (RUT cannot be changed)
-        if 'nombre' in data:
-            entity.nombre = data['nombre']
-        if 'apellidos' in data:
-            entity.apellidos = data['apellidos']
-        if 'cargo' in data:
-            entity.cargo = data['cargo']
-        if 'id_centro' in data:
-            entity.id_centro = data['id_centro']
+        for field in _TRABAJADOR_UPDATABLE_FIELDS.intersection(data):
+            setattr(entity, field, data[field])
     
     @staticmethod
     def delete_trabajador(rut):
@@ -242,22 +393,36 @@ class TrabajadorApoyoService(BaseCRUDService):
             BusinessLogicError: If worker not found or cannot be deleted
         """
         # Clean RUT
-        rut_clean = rut.replace('.', '').replace('-', '')
+        rut_clean = _clean_rut(rut)
         
-        service = TrabajadorApoyoService()
-        return service.delete(rut_clean)
+        TrabajadorApoyoService().delete_by_id(rut_clean)
+        TrabajadorApoyoService.invalidate_list_cache()
+        return True
+    
+    @staticmethod
+    def invalidate_list_cache():
+        """Drop every cached page of the worker list."""
+        cache.delete_memoized(TrabajadorApoyoService.get_trabajadores)
     
     @staticmethod
     def get_trabajadores_by_centro(centro_id):
         """
-        Get all support workers for a specific center.
+        Get all support workers for a specific center, in batches.
+        
+        The query runs immediately but rows are fetched 500 at a time
+        (server-side cursor on PostgreSQL), so only one batch is held in
+        memory while the caller serializes it. Rows are plain column
+        tuples.
         
         Args:
             centro_id: Center ID
             
         Returns:
-            list: List of workers for the center
+            Iterator[list]: Batches of worker rows for the center
         """
-        return TrabajadoresApoyo.query.filter_by(id_centro=centro_id).order_by(
-            TrabajadoresApoyo.nombre, TrabajadoresApoyo.apellidos
-        ).all()
\ No newline at end of file
+        return db.session.execute(
+            select(*TrabajadorApoyoService.LIST_COLUMNS)
+            .where(TrabajadoresApoyo.id_centro == centro_id)
+            .order_by(TrabajadoresApoyo.nombre, TrabajadoresApoyo.apellidos)
+            .execution_options(yield_per=_CENTRO_BATCH_SIZE)
+        ).partitions()
\ No newline at end of file
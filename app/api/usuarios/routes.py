@@ -8,12 +8,13 @@ from flask import Blueprint, request
 from app.auth_utils import admin_required, can_manage_users
 from app.extensions import limiter
 from app.api.utils import (
-    success_response, created_response,
+    success_response, created_response, cached_json_response,
     get_request_args, ValidationError,
     # Decorators
     handle_crud_errors, require_json, validate_request_data,
     validate_pagination_params, log_api_call
 )
+from app.api.utils.rate_limiting import concurrency_limit
 from .services import UsuarioService
 
 usuarios_bp = Blueprint('usuarios', __name__, url_prefix='/api/usuarios')
@@ -29,10 +30,13 @@ def get_usuarios(current_user):
     Get paginated list of users with optional filters.
     
     Query Parameters:
-        page (int): Page number (default: 1)
+        cursor (str): next_cursor of the previous page (keyset pagination)
+        page (int): Page number; switches to offset pagination with totals
         per_page (int): Items per page (default: 10, max: 100)
         rut (str): Filter by RUT
         username (str): Filter by username
+        match (str): 'prefix' to match rut/username from the start (any
+            length) instead of anywhere in the value
         nivel (int): Filter by user level (1-3)
         
     Returns:
@@ -41,11 +45,13 @@ def get_usuarios(current_user):
     args = get_request_args(request)
     
     result = UsuarioService.get_usuarios(
-        page=args.get('page', 1),
+        page=args.get('page'),
+        cursor=args.get('cursor'),
         per_page=min(args.get('per_page', 10), 100),
         rut_filter=args.get('rut'),
         username_filter=args.get('username'),
-        nivel_filter=args.get('nivel')
+        nivel_filter=args.get('nivel'),
+        match_mode=args.get('match', 'contains')
     )
     
     return success_response(data=result)
@@ -72,6 +78,7 @@ def get_usuario(current_user, usuario_id):
 @usuarios_bp.route('/', methods=['POST'])
 @limiter.limit("10 per hour")
 @admin_required
+@concurrency_limit()
 @handle_crud_errors("usuario", "crear")
 @require_json
 @validate_request_data(['rut_usuario', 'user_usuario', 'password'], ['nivel_usuario'])
@@ -98,6 +105,35 @@ def create_usuario(current_user):
     )
 
 
+@usuarios_bp.route('/bulk', methods=['POST'])
+@limiter.limit("5 per hour")
+@admin_required
+@concurrency_limit()
+@handle_crud_errors("usuarios", "crear")
+@require_json
+@log_api_call
+def bulk_create_usuarios(current_user):
+    """
+    Create several users in one request (admin only).
+    
+    Body (JSON): List of user objects with the same fields as the
+        single create endpoint.
+        
+    Returns:
+        JSON: IDs of the created users
+    """
+    data = request.get_json()
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValidationError('Se espera una lista de usuarios')
+    
+    ids = UsuarioService.bulk_create_usuarios(data)
+    
+    return created_response(
+        data={'ids': ids},
+        message=f"{len(ids)} usuarios creados exitosamente"
+    )
+
+
 @usuarios_bp.route('/<int:usuario_id>', methods=['PUT'])
 @admin_required
 @handle_crud_errors("usuario", "actualizar")
@@ -149,9 +185,58 @@ def delete_usuario(current_user, usuario_id):
     )
 
 
+@usuarios_bp.route('/bulk', methods=['DELETE'])
+@admin_required
+@handle_crud_errors("usuarios", "eliminar")
+@require_json
+@log_api_call
+def bulk_delete_usuarios(current_user):
+    """
+    Delete several users in one request (admin only).
+    
+    Body (JSON): List of user IDs
+        
+    Returns:
+        JSON: IDs of the deleted users
+    """
+    ids = UsuarioService.bulk_delete_usuarios(request.get_json(), current_user)
+    
+    return success_response(
+        data={'ids': ids},
+        message=f"{len(ids)} usuarios eliminados exitosamente"
+    )
+
+
+@usuarios_bp.route('/bulk', methods=['PUT'])
+@admin_required
+@handle_crud_errors("usuarios", "actualizar")
+@require_json
+@validate_request_data(['ids', 'nivel_usuario'])
+@log_api_call
+def bulk_update_nivel(current_user):
+    """
+    Set the access level of several users (admin only).
+    
+    Body (JSON):
+        ids (list): User IDs (required)
+        nivel_usuario (int): Access level (required)
+        
+    Returns:
+        JSON: IDs of the updated users
+    """
+    data = request.get_json()
+    ids = UsuarioService.bulk_update_nivel(data['ids'], data['nivel_usuario'])
+    
+    return success_response(
+        data={'ids': ids},
+        message=f"{len(ids)} usuarios actualizados exitosamente"
+    )
+
+
 @usuarios_bp.route('/<int:usuario_id>/reset-password', methods=['POST'])
 @limiter.limit("5 per hour")
 @admin_required
+@concurrency_limit()
 @handle_crud_errors("usuario", "restablecer contraseña")
 @require_json
 @validate_request_data(['new_password'])
@@ -187,8 +272,13 @@ def get_user_stats(current_user):
     """
     Get user statistics.
     
+    The serialized statistics are cached for 60 seconds and dropped when
+    a user is created or deleted or changes level, so dashboards polling
+    this endpoint do not re-run the counts.
+    
     Returns:
         JSON: User statistics
     """
-    stats = UsuarioService.get_user_stats()
-    return success_response(data=stats)
\ No newline at end of file
+    return cached_json_response(
+        UsuarioService.STATS_CACHE_KEY, UsuarioService.get_user_stats, timeout=60
+    )
\ No newline at end of file
@@ -4,11 +4,51 @@ User Services
 Business logic layer for user management operations.
 """
 
-from app.extensions import db
+from sqlalchemy import delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from app.extensions import db, cache
 from app.models import Usuario
-from app.api.utils import paginate_query, BaseCRUDService
+from app.api.utils import paginate_query, paginate_keyset, BaseCRUDService
 from app.api.utils.errors import ValidationError, BusinessLogicError
-from app.auth_utils import validate_rut, normalize_rut, validate_password_strength
+from app.api.utils.uow import transactional, release_connection
+from app.auth_utils import (
+    validate_rut, normalize_rut, validate_password_strength, load_user,
+    forget_users, USER_PUBLIC_COLUMNS
+)
+
+
+# Keys of the per-level counts in the user statistics
+_LEVEL_NAMES = {1: 'apoyo', 2: 'encargado', 3: 'admin'}
+
+# Fields a new user must provide, in the order they are reported
+_USUARIO_REQUIRED_FIELDS = ('rut_usuario', 'user_usuario', 'password', 'nivel_usuario')
+
+
+def _username_matches(username):
+    """Case-insensitive username comparison, served by ux_usuarios_user_lower."""
+    return func.lower(Usuario.user_usuario) == username.lower()
+
+
+def _serialize_usuario_row(row):
+    """Serialize a LIST_COLUMNS row like Usuario.to_dict()."""
+    data = row._asdict()
+    data['nivel_nombre'] = Usuario.nivel_nombre(row.nivel_usuario)
+    return data
+
+
+def _validate_user_ids(ids):
+    """Check a list of user IDs from a request body; returns them as a set."""
+    if (not isinstance(ids, list) or not ids
+            or not all(type(user_id) is int for user_id in ids)):
+        raise ValidationError('Se espera una lista de IDs de usuario')
+    return set(ids)
+
+
+def _prefix_pattern(value):
+    """LIKE pattern matching values that start with ``value`` literally."""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{escaped}%'
 
 
 class UsuarioService(BaseCRUDService):
@@ -16,6 +56,19 @@ class UsuarioService(BaseCRUDService):
     Service class for user management operations.
     """
     
+    # Password hash computed by validate_update_data
+    _password_hash = None
+    
+    # Unique sort key of the list, used for keyset pagination
+    LIST_ORDER = (Usuario.id_usuario,)
+    
+    # Columns of Usuario.to_dict(), selected directly by the list endpoint
+    # (rows instead of ORM instances, never the password hash)
+    LIST_COLUMNS = USER_PUBLIC_COLUMNS
+    
+    # Cache key of the serialized user statistics
+    STATS_CACHE_KEY = 'usuarios:stats'
+    
     # BaseCRUDService properties
     @property
     def model_class(self):
@@ -30,36 +83,65 @@ class UsuarioService(BaseCRUDService):
         return 'id_usuario'
     
     @staticmethod
-    def get_usuarios(page, per_page, rut_filter=None, username_filter=None, nivel_filter=None):
+    def get_usuarios(page=None, per_page=10, rut_filter=None, username_filter=None,
+                     nivel_filter=None, cursor=None, match_mode='contains'):
         """
         Get paginated list of users with optional filters.
         
+        Uses keyset pagination on the primary key (no OFFSET, no COUNT)
+        unless a page number is given, in which case offset pagination
+        with totals is used.
+        
         Args:
-            page: Page number
+            page: Page number (optional)
             per_page: Items per page
             rut_filter: Filter by RUT
             username_filter: Filter by username
             nivel_filter: Filter by user level
+            cursor: Keyset cursor from the previous page (optional)
+            match_mode: 'contains' (default) or 'prefix'; prefix filters
+                match the start of the value and use B-tree indexes
             
         Returns:
             dict: Paginated user data
         """
-        query = Usuario.query
+        query = select(*UsuarioService.LIST_COLUMNS)
         
-        # Apply filters
+        if match_mode == 'prefix':
+            # Served by the ix_usuarios_rut_prefix / ux_usuarios_user_lower
+            # pattern indexes, at any filter length; usernames are compared
+            # lower-case, like ILIKE
+            if rut_filter:
+                query = query.where(
+                    Usuario.rut_usuario.like(_prefix_pattern(rut_filter), escape='\\')
+                )
+            if username_filter:
+                query = query.where(func.lower(Usuario.user_usuario).like(
+                    _prefix_pattern(username_filter.lower()), escape='\\'
+                ))
+            rut_filter = username_filter = None
+        
+        # Apply filters (terms under three characters cannot use the
+        # trigram indexes, but are still applied)
         if rut_filter:
-            query = query.filter(Usuario.rut_usuario.ilike(f'%{rut_filter}%'))
+            query = query.where(Usuario.rut_usuario.ilike(f'%{rut_filter}%'))
         
         if username_filter:
-            query = query.filter(Usuario.user_usuario.ilike(f'%{username_filter}%'))
+            query = query.where(Usuario.user_usuario.ilike(f'%{username_filter}%'))
         
         if nivel_filter is not None:
-            query = query.filter(Usuario.nivel_usuario == nivel_filter)
+            query = query.where(Usuario.nivel_usuario == nivel_filter)
+        
+        if page is None:
+            return paginate_keyset(
+                query, UsuarioService.LIST_ORDER, cursor, per_page,
+                serialize_func=_serialize_usuario_row
+            )
         
         # Order by ID for consistent pagination
         query = query.order_by(Usuario.id_usuario)
         
-        return paginate_query(query, page, per_page)
+        return paginate_query(query, page, per_page, serialize_func=_serialize_usuario_row)
     
     @staticmethod
     def get_usuario_by_id(usuario_id):
@@ -78,6 +160,13 @@ class UsuarioService(BaseCRUDService):
         service = UsuarioService()
         return service.get_by_id(usuario_id)
     
+    def get_by_id(self, entity_id):
+        """Get user by ID through the shared user cache."""
+        usuario = load_user(entity_id)
+        if usuario is None:
+            raise BusinessLogicError(f'{self.entity_name} no encontrado')
+        return usuario
+    
     @staticmethod
     def create_usuario(data):
         """
@@ -96,12 +185,87 @@ class UsuarioService(BaseCRUDService):
         service = UsuarioService()
         return service.create(data)
     
+    @staticmethod
+    def bulk_create_usuarios(items):
+        """
+        Create several users in a single transaction.
+        
+        All items are validated first and checked against existing users
+        with one query; the passwords are hashed without holding a
+        connection and the rows are inserted with one executemany
+        statement and a single commit.
+        
+        Args:
+            items: List of user data dicts
+            
+        Returns:
+            list: IDs of the created users
+            
+        Raises:
+            ValidationError: If any item fails validation
+            BusinessLogicError: If any RUT or username is repeated or taken
+        """
+        if not items:
+            raise ValidationError('Debe proporcionar al menos un usuario')
+        
+        service = UsuarioService()
+        for data in items:
+            service.validate_usuario_data(data)
+        
+        ruts = [data['rut_usuario'] for data in items]
+        usernames = [data['user_usuario'].lower() for data in items]
+        if len(set(ruts)) != len(ruts):
+            raise BusinessLogicError('La lista contiene RUT repetidos')
+        if len(set(usernames)) != len(usernames):
+            raise BusinessLogicError('La lista contiene nombres de usuario repetidos')
+        
+        taken = db.session.execute(
+            select(Usuario.rut_usuario)
+            .where(or_(
+                Usuario.rut_usuario.in_(ruts), func.lower(Usuario.user_usuario).in_(usernames)
+            ))
+            .limit(1)
+        ).first()
+        if taken:
+            raise BusinessLogicError('Ya existe un usuario con alguno de estos RUT o nombres de usuario')
+        
+        release_connection()
+        rows = [
+            {
+                'rut_usuario': data['rut_usuario'],
+                'user_usuario': data['user_usuario'],
+                'nivel_usuario': data['nivel_usuario'],
+                'passwd_usuario': Usuario.hash_password(data['password'])
+            }
+            for data in items
+        ]
+        
+        try:
+            with transactional():
+                # Ids in the order of items: clients pair them by position
+                ids = db.session.execute(
+                    insert(Usuario).returning(Usuario.id_usuario, sort_by_parameter_order=True), rows
+                ).scalars().all()
+        except IntegrityError:
+            raise BusinessLogicError('Ya existe un usuario con alguno de estos RUT o nombres de usuario')
+        
+        # Bulk inserts do not fire the ORM events that drop the stats
+        UsuarioService.invalidate_stats_cache()
+        
+        return ids
+    
     # BaseCRUDService abstract methods implementation
     def validate_create_data(self, data):
         """Validate data for user creation."""
+        self.validate_usuario_data(data)
+        
+        # Check RUT and username uniqueness with a single query
+        UsuarioService.check_identity_available(data['rut_usuario'], data['user_usuario'])
+    
+    def validate_usuario_data(self, data):
+        """Validate the fields of a new user and normalize its RUT."""
         # Validate required fields
-        required_fields = ['rut_usuario', 'user_usuario', 'password', 'nivel_usuario']
-        self.validate_required_fields(data, required_fields)
+        self.validate_required_fields(data, _USUARIO_REQUIRED_FIELDS)
         
         # Normalize and validate RUT
         rut = normalize_rut(data['rut_usuario'])
@@ -109,13 +273,8 @@ class UsuarioService(BaseCRUDService):
             raise ValidationError('Formato de RUT inválido')
         data['rut_usuario'] = rut  # Update with normalized RUT
         
-        # Check if user already exists by RUT
-        if not self.check_unique_field('rut_usuario', rut):
-            raise BusinessLogicError('Ya existe un usuario con este RUT')
-        
-        # Check if username already exists
-        if not self.check_unique_field('user_usuario', data['user_usuario']):
-            raise BusinessLogicError('Ya existe un usuario con este nombre de usuario')
+        if not isinstance(data['user_usuario'], str):
+            raise ValidationError('user_usuario debe ser texto')
         
         # Validate password strength
         is_valid, message = validate_password_strength(data['password'])
@@ -123,9 +282,34 @@ class UsuarioService(BaseCRUDService):
             raise ValidationError(message)
         
         # Validate user level
-        if data['nivel_usuario'] not in [1, 2, 3]:
+        if not Usuario.is_valid_nivel(data['nivel_usuario']):
             raise ValidationError('Nivel de usuario debe ser 1 (apoyo), 2 (encargado) o 3 (admin)')
     
+    @staticmethod
+    def check_identity_available(rut, username):
+        """
+        Check that neither the RUT nor the username is taken.
+        
+        Both are looked up in one query; the RUT conflict is reported
+        first when both are taken.
+        
+        Args:
+            rut: Normalized RUT
+            username: Username
+            
+        Raises:
+            BusinessLogicError: If a user already has the RUT or username
+        """
+        taken = db.session.scalars(
+            select(Usuario.rut_usuario)
+            .where(or_(Usuario.rut_usuario == rut, _username_matches(username)))
+        ).all()
+        
+        if rut in taken:
+            raise BusinessLogicError('Ya existe un usuario con este RUT')
+        if taken:
+            raise BusinessLogicError('Ya existe un usuario con este nombre de usuario')
+    
     def build_entity(self, data):
         """Build user instance from data."""
         # Create new user
@@ -135,7 +319,8 @@ class UsuarioService(BaseCRUDService):
             nivel_usuario=data['nivel_usuario']
         )
         
-        # Set password (this will hash it)
+        # Set password (this will hash it) without holding a connection
+        release_connection()
         usuario.set_password(data['password'])
         
         return usuario
@@ -163,14 +348,22 @@ class UsuarioService(BaseCRUDService):
         """Validate data for user update."""
         # Update username if provided
         if 'user_usuario' in data:
+            if not isinstance(data['user_usuario'], str):
+                raise ValidationError('user_usuario debe ser texto')
             if data['user_usuario'] != entity.user_usuario:
-                # Check if new username already exists
-                if not self.check_unique_field('user_usuario', data['user_usuario'], exclude_id=entity.id_usuario):
+                # Check if new username already exists (case-insensitive)
+                taken = db.session.execute(
+                    select(Usuario.id_usuario).where(
+                        _username_matches(data['user_usuario']),
+                        Usuario.id_usuario != entity.id_usuario
+                    ).limit(1)
+                ).first()
+                if taken:
                     raise BusinessLogicError('Ya existe un usuario con este nombre de usuario')
         
         # Validate user level if provided
         if 'nivel_usuario' in data:
-            if data['nivel_usuario'] not in [1, 2, 3]:
+            if not Usuario.is_valid_nivel(data['nivel_usuario']):
                 raise ValidationError('Nivel de usuario debe ser 1 (apoyo), 2 (encargado) o 3 (admin)')
         
         # Validate password if provided
@@ -178,6 +371,11 @@ class UsuarioService(BaseCRUDService):
             is_valid, message = validate_password_strength(data['password'])
             if not is_valid:
                 raise ValidationError(message)
+            
+            # Hash it here, before the update transaction and without
+            # holding a connection
+            release_connection()
+            self._password_hash = Usuario.hash_password(data['password'])
     
     def update_entity_fields(self, entity, data):
         """Update user fields with new data."""
@@ -189,9 +387,9 @@ class UsuarioService(BaseCRUDService):
         if 'nivel_usuario' in data:
             entity.nivel_usuario = data['nivel_usuario']
         
-        # Update password if provided
-        if 'password' in data and data['password']:
-            entity.set_password(data['password'])
+        # Update password if provided (hashed in validate_update_data)
+        if self._password_hash:
+            entity.passwd_usuario = self._password_hash
     
     @staticmethod
     def delete_usuario(usuario_id, current_user):
@@ -215,6 +413,84 @@ class UsuarioService(BaseCRUDService):
         # Use base class delete method
         return service.delete(usuario_id)
     
+    @staticmethod
+    def bulk_delete_usuarios(ids, current_user):
+        """
+        Delete several users with a single DELETE ... RETURNING.
+        
+        The users are not loaded first: the statement reports which ids
+        it deleted, and if any id does not exist the whole delete is
+        rolled back.
+        
+        Args:
+            ids: List of user IDs
+            current_user: Current authenticated user
+            
+        Returns:
+            list: IDs of the deleted users
+            
+        Raises:
+            ValidationError: If ids is not a non-empty list of integers
+            BusinessLogicError: If an id is the current user or does not exist
+        """
+        ids = _validate_user_ids(ids)
+        
+        # Prevent self-deletion
+        if current_user.id_usuario in ids:
+            raise BusinessLogicError('No puedes eliminar tu propio usuario')
+        
+        with transactional():
+            deleted = db.session.scalars(
+                delete(Usuario)
+                .where(Usuario.id_usuario.in_(ids))
+                .returning(Usuario.id_usuario)
+            ).all()
+            if len(deleted) != len(ids):
+                raise BusinessLogicError('Alguno de los usuarios no existe')
+        
+        # Bulk statements do not fire the ORM events that drop these caches
+        forget_users(deleted)
+        UsuarioService.invalidate_stats_cache()
+        
+        return deleted
+    
+    @staticmethod
+    def bulk_update_nivel(ids, nivel_usuario):
+        """
+        Set the level of several users with a single UPDATE ... RETURNING.
+        
+        Args:
+            ids: List of user IDs
+            nivel_usuario: New user level
+            
+        Returns:
+            list: IDs of the updated users
+            
+        Raises:
+            ValidationError: If ids or the level are invalid
+            BusinessLogicError: If any id does not exist
+        """
+        ids = _validate_user_ids(ids)
+        
+        if not Usuario.is_valid_nivel(nivel_usuario):
+            raise ValidationError('Nivel de usuario debe ser 1 (apoyo), 2 (encargado) o 3 (admin)')
+        
+        with transactional():
+            updated = db.session.scalars(
+                update(Usuario)
+                .where(Usuario.id_usuario.in_(ids))
+                .values(nivel_usuario=nivel_usuario)
+                .returning(Usuario.id_usuario)
+            ).all()
+            if len(updated) != len(ids):
+                raise BusinessLogicError('Alguno de los usuarios no existe')
+        
+        # Bulk statements do not fire the ORM events that drop these caches
+        forget_users(updated)
+        UsuarioService.invalidate_stats_cache()
+        
+        return updated
+    
     def validate_delete(self, entity):
         """Validate if user can be deleted."""
         # Check for related records
@@ -244,9 +520,11 @@ class UsuarioService(BaseCRUDService):
         if not is_valid:
             raise ValidationError(message)
         
-        # Set new password
-        usuario.set_password(new_password)
-        db.session.commit()
+        # Hash without holding a connection, then save it
+        release_connection()
+        password_hash = Usuario.hash_password(new_password)
+        with transactional():
+            usuario.passwd_usuario = password_hash
         
         return usuario
     
@@ -258,14 +536,51 @@ class UsuarioService(BaseCRUDService):
         Returns:
             dict: User statistics
         """
-        total_users = Usuario.query.count()
-        users_by_level = {
-            'apoyo': Usuario.query.filter_by(nivel_usuario=1).count(),
-            'encargado': Usuario.query.filter_by(nivel_usuario=2).count(),
-            'admin': Usuario.query.filter_by(nivel_usuario=3).count()
-        }
+        # One GROUP BY scan instead of a COUNT per level plus the total
+        counts = dict(db.session.execute(
+            select(Usuario.nivel_usuario, func.count()).group_by(Usuario.nivel_usuario)
+        ).all())
         
         return {
-            'total_users': total_users,
-            'users_by_level': users_by_level
-        }
\ No newline at end of file
+            'total_users': sum(counts.values()),
+            'users_by_level': {
+                name: counts.get(nivel, 0) for nivel, name in _LEVEL_NAMES.items()
+            }
+        }
+    
+    @staticmethod
+    def invalidate_stats_cache():
+        """Drop the cached user statistics after a user write."""
+        cache.delete(UsuarioService.STATS_CACHE_KEY)
+
+
+# The cached statistics are dropped from ORM events rather than from each
+# service method, so user writes made elsewhere (e.g. auth registration)
+# are covered too. Flushes only mark the session; the cache is cleared once
+# the transaction commits, so a concurrent request cannot cache counts
+# that are about to change, and a rollback clears nothing.
+_STATS_STALE = 'usuarios_stats_stale'
+
+
+@event.listens_for(Usuario, 'after_insert')
+@event.listens_for(Usuario, 'after_delete')
+def _mark_stats_stale(mapper, connection, target):
+    object_session(target).info[_STATS_STALE] = True
+
+
+@event.listens_for(Usuario, 'after_update')
+def _mark_stats_stale_on_level_change(mapper, connection, target):
+    # Only the level counts; password or username changes keep the stats
+    if inspect(target).attrs.nivel_usuario.history.has_changes():
+        object_session(target).info[_STATS_STALE] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_stats(session):
+    if session.info.pop(_STATS_STALE, False):
+        UsuarioService.invalidate_stats_cache()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stats_mark(session):
+    session.info.pop(_STATS_STALE, None)
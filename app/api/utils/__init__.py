@@ -6,20 +6,28 @@ Provides common utilities for API routes including:
 - Standardized response formatting
 - Error handling utilities
 - Request argument parsing
+- Transaction boundaries (unit of work)
 """
 
-from flask import request
-
-from .pagination import paginate_query, create_pagination_response
+from .pagination import (
+    paginate_query, paginate_keyset, create_pagination_response, create_keyset_response,
+    skip_list_cache
+)
 from .responses import (
     success_response, error_response, paginated_response,
-    created_response, deleted_response
+    created_response, deleted_response, cached_json_response,
+    streamed_json_response
 )
 from .errors import (
     handle_db_error, ValidationError, BusinessLogicError,
     handle_validation_error, handle_business_logic_error
 )
-from .base_crud_service import BaseCRUDService
+from .base_crud_service import (
+    BaseCRUDService, record_exists, reference_exists, missing_references,
+    forget_reference, delete_by_pk, insert_rows
+)
+from .uow import transactional, release_connection
+from .request_args import get_request_args, get_json_body
 from .decorators import (
     handle_api_errors, handle_crud_errors, require_json,
     validate_request_data, log_api_call, validate_pagination_params,
@@ -27,61 +35,22 @@ from .decorators import (
 )
 
 
-def get_request_args(request_obj):
-    """
-    Extract and parse request arguments for API endpoints.
-    
-    Args:
-        request_obj: Flask request object
-        
-    Returns:
-        dict: Parsed request arguments with appropriate types
-    """
-    args = {}
-    
-    # Pagination parameters
-    if 'page' in request_obj.args:
-        try:
-            args['page'] = int(request_obj.args.get('page', 1))
-        except (ValueError, TypeError):
-            args['page'] = 1
-    
-    if 'per_page' in request_obj.args:
-        try:
-            args['per_page'] = int(request_obj.args.get('per_page', 10))
-        except (ValueError, TypeError):
-            args['per_page'] = 10
-    
-    # Filter parameters (string filters)
-    string_filters = [
-        'nombre', 'rut', 'username', 'sector', 'direccion', 'cargo',
-        'email', 'telefono', 'fecha', 'fecha_inicio', 'fecha_fin',
-        'centro', 'actividad', 'nivel', 'search'
-    ]
-    
-    for filter_name in string_filters:
-        if filter_name in request_obj.args:
-            value = request_obj.args.get(filter_name)
-            if value and value.strip():
-                # Try to convert 'nivel' to int
-                if filter_name == 'nivel':
-                    try:
-                        args[filter_name] = int(value)
-                    except (ValueError, TypeError):
-                        pass  # Invalid level, ignore
-                else:
-                    args[filter_name] = value.strip()
-    
-    return args
+# Shortest filter term sent to an indexed search path (full-text prefix
+# or trigram ILIKE). Shorter terms are still applied, as a plain ILIKE.
+MIN_FILTER_LENGTH = 3
 
 
 __all__ = [
-    'paginate_query', 'create_pagination_response',
+    'paginate_query', 'paginate_keyset', 'create_pagination_response', 'create_keyset_response',
+    'skip_list_cache',
     'success_response', 'error_response', 'paginated_response',
-    'created_response', 'deleted_response',
+    'created_response', 'deleted_response', 'cached_json_response',
+    'streamed_json_response',
     'handle_db_error', 'ValidationError', 'BusinessLogicError',
     'handle_validation_error', 'handle_business_logic_error',
-    'get_request_args', 'BaseCRUDService',
+    'get_request_args', 'get_json_body', 'MIN_FILTER_LENGTH', 'BaseCRUDService', 'record_exists', 'reference_exists',
+    'missing_references', 'forget_reference', 'delete_by_pk', 'insert_rows',
+    'transactional', 'release_connection',
     # Decorators
     'handle_api_errors', 'handle_crud_errors', 'require_json',
     'validate_request_data', 'log_api_call', 'validate_pagination_params',
@@ -5,9 +5,249 @@ This module provides a base class with common CRUD operations that can be
 inherited by specific service classes to reduce code duplication.
 """
 
+import io
 from abc import ABC, abstractmethod
-from app.extensions import db
+from functools import lru_cache
+from flask import g
+from sqlalchemy import delete, exists, insert, inspect, select, update
+from sqlalchemy.exc import DBAPIError
+from app.extensions import db, cache
 from .errors import BusinessLogicError, ValidationError
+from .uow import transactional
+
+
+@lru_cache(maxsize=None)
+def _column_map(model):
+    """
+    Map the column attribute names of a model to its mapped attributes.
+    
+    Built once per model, so services that resolve field names from
+    request data do a dict lookup instead of getattr on the class, and
+    names that are not columns (relationships, methods) are rejected.
+    
+    Args:
+        model: Model class
+        
+    Returns:
+        dict: Attribute name to InstrumentedAttribute
+    """
+    return {
+        attr.key: getattr(model, attr.key) for attr in inspect(model).column_attrs
+    }
+
+
+def record_exists(model, pk):
+    """
+    Check whether a row with the given primary key exists.
+    
+    Only the primary key column is selected, so no ORM instance is built.
+    Meant for reference validation where the row itself is not needed.
+    
+    Args:
+        model: Model class with a single-column primary key
+        pk: Primary key value
+        
+    Returns:
+        bool: True if the row exists
+    """
+    pk_column = inspect(model).primary_key[0]
+    return db.session.execute(
+        select(pk_column).where(pk_column == pk)
+    ).first() is not None
+
+
+def _reference_key(model, pk):
+    return f'exists:{model.__tablename__}:{pk}'
+
+
+def reference_exists(model, pk, timeout=300):
+    """
+    Cached record_exists for rarely changing reference rows.
+    
+    Meant for rows that many writes point to (centros, personas a cargo).
+    Only positive answers are cached, so a row created right after a
+    miss is found at once; deletions must call forget_reference. A stale
+    entry left in another process's local cache is still caught by the
+    foreign key when the referencing row is written.
+    
+    Args:
+        model: Model class with a single-column primary key
+        pk: Primary key value
+        timeout: Seconds a positive answer is kept
+        
+    Returns:
+        bool: True if the row exists
+    """
+    key = _reference_key(model, pk)
+    if cache.get(key):
+        return True
+    
+    if record_exists(model, pk):
+        cache.set(key, True, timeout=timeout)
+        return True
+    return False
+
+
+def missing_references(model, pks, timeout=300):
+    """
+    Batch version of reference_exists for bulk writes.
+    
+    Keys found in the cache are skipped; the rest are checked with a
+    single IN query and the ones that exist are cached.
+    
+    Args:
+        model: Model class with a single-column primary key
+        pks: Iterable of primary key values, of the column's Python type
+        timeout: Seconds a positive answer is kept
+        
+    Returns:
+        set: Primary keys that do not exist
+    """
+    pks = set(pks)
+    if not pks:
+        return set()
+    
+    keys = {pk: _reference_key(model, pk) for pk in pks}
+    cached = cache.get_many(*keys.values())
+    unknown = {pk for pk, hit in zip(keys, cached) if not hit}
+    if not unknown:
+        return set()
+    
+    pk_column = inspect(model).primary_key[0]
+    found = set(db.session.scalars(select(pk_column).where(pk_column.in_(unknown))))
+    # The database may match a key of another type ('1' for 1); only keys
+    # given exactly as returned count as found
+    found &= unknown
+    if found:
+        cache.set_many({keys[pk]: True for pk in found}, timeout=timeout)
+    return unknown - found
+
+
+def forget_reference(model, pk):
+    """
+    Drop the cached existence of a reference row after deleting it.
+    
+    Args:
+        model: Model class
+        pk: Primary key value
+    """
+    cache.delete(_reference_key(model, pk))
+
+
+def delete_by_pk(model, pk, not_found_message, *returning):
+    """
+    Delete a row by primary key with a single DELETE ... RETURNING.
+    
+    The row is not loaded first, so existence check and delete are one
+    atomic statement. Only database-level cascades (ondelete) apply; use
+    session.delete for models that rely on ORM cascades.
+    
+    Args:
+        model: Model class
+        pk: Primary key value, or a tuple for composite keys
+        not_found_message: Error message when no row matches
+        returning: Extra columns to return from the deleted row
+        
+    Returns:
+        Row: Primary key and requested columns of the deleted row
+        
+    Raises:
+        BusinessLogicError: If no row has this primary key
+    """
+    pk_columns = inspect(model).primary_key
+    values = pk if isinstance(pk, tuple) else (pk,)
+    stmt = delete(model).where(
+        *(column == value for column, value in zip(pk_columns, values))
+    ).returning(*pk_columns, *returning)
+    
+    with transactional():
+        row = db.session.execute(stmt).first()
+    
+    if row is None:
+        raise BusinessLogicError(not_found_message)
+    return row
+
+
+# Smallest batch that insert_rows sends with COPY instead of an INSERT
+COPY_THRESHOLD = 100
+
+
+def _copy_defaults(table, columns):
+    """Python-side column defaults, which COPY does not apply by itself."""
+    defaults = {}
+    for column in table.columns:
+        default = column.default
+        if column.key in columns or default is None:
+            continue
+        if default.is_scalar:
+            defaults[column.key] = default.arg
+        elif default.is_callable:
+            defaults[column.key] = default.arg(None)
+    return defaults
+
+
+def _copy_field(value):
+    """
+    Format one value for COPY in CSV format.
+    
+    Every value is quoted, so an empty string stays an empty string; None
+    is written as an unquoted empty field, which COPY reads as NULL.
+    """
+    if value is None:
+        return ''
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+def insert_rows(model, rows, batch_size=2000):
+    """
+    Insert many rows of column values within the current transaction.
+    
+    On PostgreSQL, batches of COPY_THRESHOLD rows or more are streamed
+    with COPY ... FROM STDIN through the session's psycopg2 connection,
+    ``batch_size`` rows at a time so the buffer stays small. Smaller
+    batches, and other databases, use one executemany INSERT. COPY cannot
+    return generated keys, so use it for rows whose primary key is part
+    of the data. Call it inside transactional().
+    
+    Args:
+        model: Model class
+        rows: List of dicts with the same keys (column names)
+        batch_size: Rows per COPY buffer
+        
+    Raises:
+        IntegrityError: If a row violates a constraint
+    """
+    session = db.session
+    dialect = session.get_bind().dialect
+    if len(rows) < COPY_THRESHOLD or dialect.name != 'postgresql':
+        session.execute(insert(model), rows)
+        return
+    dbapi = dialect.loaded_dbapi
+    
+    table = model.__table__
+    keys = list(rows[0])
+    defaults = _copy_defaults(table, keys)
+    columns = [*keys, *defaults]
+    statement = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+        table.name, ', '.join(f'"{name}"' for name in columns)
+    )
+    
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        for start in range(0, len(rows), batch_size):
+            buffer = io.StringIO()
+            for row in rows[start:start + batch_size]:
+                values = [*(row[key] for key in keys), *defaults.values()]
+                buffer.write(','.join(map(_copy_field, values)))
+                buffer.write('\n')
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+    except dbapi.Error as error:
+        # Raw driver errors are not wrapped by SQLAlchemy; wrap them so
+        # callers catch IntegrityError as with any other statement
+        raise DBAPIError.instance(statement, None, error, dbapi.Error) from error
+    finally:
+        cursor.close()
 
 
 class BaseCRUDService(ABC):
@@ -19,6 +259,12 @@ class BaseCRUDService(ABC):
     and entity_name properties.
     """
     
+    # Loader options applied by get_by_id, e.g. (selectinload(Model.rel),)
+    # for services whose callers read relationships of the entity.
+    # Relationships are lazy='raise', so one that is read without being
+    # listed here fails instead of issuing a query per access.
+    load_options = ()
+    
     @property
     @abstractmethod
     def model_class(self):
@@ -65,15 +311,34 @@ class BaseCRUDService(ABC):
         Raises:
             BusinessLogicError: If entity not found
         """
-        entity = self.model_class.query.get(entity_id)
+        # The session's identity map only holds weak references, so an
+        # entity the caller did not keep (e.g. read for one attribute before
+        # update()) would be selected again. Loaded entities are kept for
+        # the rest of the request instead.
+        loaded = g.setdefault('_loaded_entities', {})
+        key = (self.model_class, entity_id)
+        entity = loaded.get(key)
+        if entity is not None and entity in db.session:
+            return entity
+        
+        entity = db.session.get(self.model_class, entity_id, options=self.load_options)
         if not entity:
             raise BusinessLogicError(f'{self.entity_name} no encontrado')
+        loaded[key] = entity
         return entity
     
+    def forget_loaded(self, entity_id):
+        """Drop an entity kept by get_by_id once its row is deleted."""
+        g.get('_loaded_entities', {}).pop((self.model_class, entity_id), None)
+    
     def create(self, data):
         """
         Create a new entity.
         
+        Services that implement build_row are inserted with a single
+        INSERT ... RETURNING statement instead of adding an instance to
+        the session and flushing it; the others use build_entity.
+        
         Args:
             data: Entity data dictionary
             
@@ -87,12 +352,19 @@ class BaseCRUDService(ABC):
         # Validate data using subclass method
         self.validate_create_data(data)
         
+        row = self.build_row(data)
+        if row is not None:
+            stmt = insert(self.model_class).values(**row).returning(self.model_class)
+            with transactional():
+                entity = db.session.execute(stmt).scalar_one()
+            return entity
+        
         # Create entity using subclass method
         entity = self.build_entity(data)
         
         # Save to database
-        db.session.add(entity)
-        db.session.commit()
+        with transactional():
+            db.session.add(entity)
         
         return entity
     
@@ -100,6 +372,11 @@ class BaseCRUDService(ABC):
         """
         Update an entity.
         
+        Services that implement update_values are updated with a single
+        UPDATE ... RETURNING statement instead of loading the entity and
+        flushing its changes; validate_update_data then receives None as
+        the entity.
+        
         Args:
             entity_id: Entity ID
             data: Update data dictionary
@@ -111,17 +388,32 @@ class BaseCRUDService(ABC):
             ValidationError: If validation fails
             BusinessLogicError: If business rules are violated
         """
+        values = self.update_values(data)
+        if values:
+            self.validate_update_data(data, None)
+            
+            pk_column = inspect(self.model_class).primary_key[0]
+            stmt = (
+                update(self.model_class)
+                .where(pk_column == entity_id)
+                .values(**values)
+                .returning(self.model_class)
+            )
+            with transactional():
+                entity = db.session.execute(stmt).scalar_one_or_none()
+                if entity is None:
+                    raise BusinessLogicError(f'{self.entity_name} no encontrado')
+            return entity
+        
         # Get existing entity
         entity = self.get_by_id(entity_id)
         
         # Validate update data using subclass method
         self.validate_update_data(data, entity)
         
-        # Update entity using subclass method
-        self.update_entity_fields(entity, data)
-        
-        # Save changes
-        db.session.commit()
+        # Update entity using subclass method and save changes
+        with transactional():
+            self.update_entity_fields(entity, data)
         
         return entity
     
@@ -145,11 +437,35 @@ class BaseCRUDService(ABC):
         self.validate_delete(entity)
         
         # Delete entity
-        db.session.delete(entity)
-        db.session.commit()
+        with transactional():
+            db.session.delete(entity)
+        self.forget_loaded(entity_id)
         
         return True
     
+    def delete_by_id(self, entity_id, *returning):
+        """
+        Delete an entity with a single DELETE ... RETURNING statement.
+        
+        Unlike delete(), the entity is not loaded first and validate_delete
+        is not called, so it suits entities without delete rules.
+        
+        Args:
+            entity_id: Entity ID
+            returning: Extra columns to return from the deleted row
+            
+        Returns:
+            Row: Primary key and requested columns of the deleted row
+            
+        Raises:
+            BusinessLogicError: If entity not found
+        """
+        deleted = delete_by_pk(
+            self.model_class, entity_id, f'{self.entity_name} no encontrado', *returning
+        )
+        self.forget_loaded(entity_id)
+        return deleted
+    
     # Abstract methods that subclasses must implement
     
     @abstractmethod
@@ -178,6 +494,37 @@ class BaseCRUDService(ABC):
         """
         pass
     
+    def build_row(self, data):
+        """
+        Build the column values of a new entity for a Core INSERT.
+        
+        Default implementation returns None, so create() builds an ORM
+        instance with build_entity. Override to opt into the Core path.
+        
+        Args:
+            data: Entity data
+            
+        Returns:
+            dict: Column values, or None to use build_entity
+        """
+        return None
+    
+    def update_values(self, data):
+        """
+        Build the column values of an update for a Core UPDATE.
+        
+        Default implementation returns None, so update() loads the entity
+        and applies update_entity_fields. Override to opt into the Core
+        path; an empty dict also falls back to it.
+        
+        Args:
+            data: Update data
+            
+        Returns:
+            dict: Column values, or None to use update_entity_fields
+        """
+        return None
+    
     @abstractmethod
     def validate_update_data(self, data, entity):
         """
@@ -223,23 +570,28 @@ class BaseCRUDService(ABC):
         """
         Check if a field value is unique.
         
+        Runs SELECT EXISTS(...), so the database answers with a boolean
+        instead of returning a row to hydrate. The field should lead an
+        index (ideally a unique one) so the probe is an index lookup
+        rather than a scan of the table.
+        
         Args:
             field_name: Field name to check
             value: Value to check for uniqueness
-            exclude_id: ID to exclude from the check (for updates)
+            exclude_id: Primary key to exclude from the check (for updates)
             
         Returns:
             bool: True if unique, False otherwise
         """
-        query = self.model_class.query.filter(
-            getattr(self.model_class, field_name) == value
-        )
+        condition = _column_map(self.model_class)[field_name] == value
         
         if exclude_id is not None:
-            id_field = getattr(self.model_class, self.id_field)
-            query = query.filter(id_field != exclude_id)
+            # The mapped primary key, not id_field: that is the name used
+            # in messages and payloads and may differ from the attribute
+            pk_column = inspect(self.model_class).primary_key[0]
+            condition = condition & (pk_column != exclude_id)
         
-        return query.first() is None
+        return not db.session.scalar(select(exists().where(condition)))
     
     def validate_required_fields(self, data, required_fields):
         """
@@ -247,7 +599,8 @@ class BaseCRUDService(ABC):
         
         Args:
             data: Data dictionary to validate
-            required_fields: List of required field names
+            required_fields: Sequence of required field names, in the
+                order they are reported
             
         Raises:
             ValidationError: If any required field is missing
@@ -4,20 +4,26 @@ API Decorators
 Decorators for centralized error handling, validation, and logging.
 """
 
+import os
 from functools import wraps
 from flask import request, jsonify
-import traceback
+from sqlalchemy.exc import SQLAlchemyError
 import logging
 
+from app.auth_utils import normalize_rut
 from .errors import ValidationError, BusinessLogicError
 from .responses import success_response
 from .errors import handle_validation_error, handle_business_logic_error, handle_db_error
+from .request_args import get_request_args
 
 
 def handle_api_errors(operation_description="operación"):
     """
     Decorador para manejo centralizado de errores en endpoints de API.
     
+    Solo captura los errores de validación, de negocio y de base de datos;
+    cualquier otra excepción llega al manejador global de la aplicación.
+    
     Args:
         operation_description (str): Descripción de la operación para logging y mensajes de error
         
@@ -45,9 +51,7 @@ def handle_api_errors(operation_description="operación"):
                 logging.warning(f"Error de lógica de negocio en {operation_description}: {str(e)}")
                 return handle_business_logic_error(e)
                 
-            except Exception as e:
-                logging.error(f"Error inesperado en {operation_description}: {str(e)}")
-                logging.error(f"Traceback: {traceback.format_exc()}")
+            except SQLAlchemyError as e:
                 return handle_db_error(e, operation_description)
                 
         return wrapper
@@ -58,6 +62,9 @@ def handle_crud_errors(entity_name, operation_type):
     """
     Decorador especializado para operaciones CRUD con mensajes más específicos.
     
+    Al igual que ``handle_api_errors``, deja pasar las excepciones que no
+    son de validación, de negocio ni de base de datos.
+    
     Args:
         entity_name (str): Nombre de la entidad (ej: "usuario", "centro")
         operation_type (str): Tipo de operación ("crear", "actualizar", "eliminar", "obtener", "listar")
@@ -88,9 +95,7 @@ def handle_crud_errors(entity_name, operation_type):
                 logging.warning(f"Error de lógica de negocio al {operation_description}: {str(e)}")
                 return handle_business_logic_error(e)
                 
-            except Exception as e:
-                logging.error(f"Error inesperado al {operation_description}: {str(e)}")
-                logging.error(f"Traceback: {traceback.format_exc()}")
+            except SQLAlchemyError as e:
                 return handle_db_error(e, operation_description)
                 
         return wrapper
@@ -138,6 +143,11 @@ def validate_request_data(required_fields=None, optional_fields=None):
     Returns:
         Decorated function with automatic request data validation
     """
+    # Se calculan una sola vez al decorar, no en cada petición. Los
+    # requeridos conservan su orden para el mensaje de error.
+    required = tuple(required_fields or ())
+    allowed = frozenset(required).union(optional_fields or ())
+    
     def decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
@@ -149,9 +159,16 @@ def validate_request_data(required_fields=None, optional_fields=None):
                     'message': 'El cuerpo de la petición está vacío'
                 }), 400
             
+            # Una lista o un valor escalar no tiene campos que validar
+            if not isinstance(data, dict):
+                return jsonify({
+                    'error': 'Formato de datos inválido',
+                    'message': 'El cuerpo de la petición debe ser un objeto JSON'
+                }), 400
+            
             # Validar campos requeridos
-            if required_fields:
-                missing_fields = [field for field in required_fields if field not in data or not data[field]]
+            if required:
+                missing_fields = [field for field in required if not data.get(field)]
                 if missing_fields:
                     return jsonify({
                         'error': f'Campos requeridos faltantes: {", ".join(missing_fields)}',
@@ -159,9 +176,8 @@ def validate_request_data(required_fields=None, optional_fields=None):
                     }), 400
             
             # Validar campos no permitidos
-            if required_fields or optional_fields:
-                allowed_fields = set((required_fields or []) + (optional_fields or []))
-                invalid_fields = [field for field in data.keys() if field not in allowed_fields]
+            if allowed:
+                invalid_fields = [field for field in data if field not in allowed]
                 if invalid_fields:
                     return jsonify({
                         'error': f'Campos no permitidos: {", ".join(invalid_fields)}',
@@ -221,8 +237,11 @@ def validate_pagination_params(f):
     """
     @wraps(f)
     def wrapper(*args, **kwargs):
+        # Mismo parseo que usará la vista (se guarda para toda la petición)
+        request_args = get_request_args(request)
+        
         # Validar página
-        page = request.args.get('page', 1, type=int)
+        page = request_args.get('page', 1)
         if page < 1:
             return jsonify({
                 'error': 'Número de página inválido',
@@ -230,7 +249,7 @@ def validate_pagination_params(f):
             }), 400
         
         # Validar elementos por página
-        per_page = request.args.get('per_page', 10, type=int)
+        per_page = request_args.get('per_page', 10)
         if per_page < 1 or per_page > 100:
             return jsonify({
                 'error': 'Cantidad de elementos por página inválida',
@@ -302,7 +321,6 @@ def handle_file_upload_errors(allowed_extensions=None, max_file_size=None):
             
             # Validar extensión
             if allowed_extensions:
-                import os
                 _, ext = os.path.splitext(file.filename.lower())
                 if ext not in allowed_extensions:
                     return jsonify({
@@ -336,8 +354,6 @@ def validate_rut_parameter(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        from app.auth_utils import validate_rut_format, normalize_rut
-        
         # Validar parámetros RUT en la URL
         for key, value in kwargs.items():
             if 'rut' in key.lower() and value:
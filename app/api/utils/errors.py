@@ -5,6 +5,7 @@ Provides common error handling patterns and custom exceptions.
 """
 
 import logging
+from flask import current_app
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.extensions import db
 from .responses import error_response
@@ -33,6 +34,20 @@ class BusinessLogicError(Exception):
         self.code = code
 
 
+def _describe_error(error):
+    """
+    Describe an error for logging.
+    
+    Outside debug mode only the exception class and SQLAlchemy's error
+    code are logged, so the (potentially large) statement and parameters
+    are never formatted. Debug mode keeps the full message.
+    """
+    if current_app.debug:
+        return str(error)
+    code = getattr(error, 'code', None)
+    return f"{type(error).__name__} [{code}]" if code else type(error).__name__
+
+
 def handle_db_error(error, operation="database operation"):
     """
     Handle database errors consistently.
@@ -47,7 +62,7 @@ def handle_db_error(error, operation="database operation"):
     db.session.rollback()
     
     if isinstance(error, IntegrityError):
-        logger.warning(f"Integrity error during {operation}: {str(error)}")
+        logger.warning(f"Integrity error during {operation}: {_describe_error(error)}")
         
         # Common integrity constraint violations
         error_msg = str(error.orig).lower()
@@ -71,7 +86,7 @@ def handle_db_error(error, operation="database operation"):
             )
     
     elif isinstance(error, SQLAlchemyError):
-        logger.error(f"Database error during {operation}: {str(error)}")
+        logger.error(f"Database error during {operation}: {_describe_error(error)}")
         return error_response(
             f"Database error during {operation}",
             status_code=500,
@@ -79,7 +94,7 @@ def handle_db_error(error, operation="database operation"):
         )
     
     else:
-        logger.error(f"Unexpected error during {operation}: {str(error)}")
+        logger.error(f"Unexpected error during {operation}: {_describe_error(error)}")
         return error_response(
             f"Unexpected error during {operation}",
             status_code=500,
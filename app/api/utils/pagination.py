@@ -4,9 +4,81 @@ Pagination Utilities
 Provides reusable pagination functionality for database queries.
 """
 
-from flask import request
+import base64
+import binascii
+import hashlib
+import math
+
+from datetime import date, datetime
+
+import orjson
+from flask import current_app, request
+from sqlalchemy import Select, func, select, tuple_
 from sqlalchemy.orm import Query
 
+from app.extensions import db, cache
+from .errors import ValidationError
+
+
+def serialize_row(row):
+    """
+    Serialize a Core result row the same way the models' to_dict() do.
+    
+    Args:
+        row: SQLAlchemy Row
+        
+    Returns:
+        dict: Column values keyed by name, dates as ISO strings
+    """
+    return {
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in row._mapping.items()
+    }
+
+
+def _selects_entity(select):
+    """Whether a select() returns a single mapped class rather than columns."""
+    descriptions = select.column_descriptions
+    return len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity']
+
+
+def _paginate_rows(query: Select, page: int, per_page: int):
+    """
+    Offset-paginate a Core select of columns, keeping whole result rows.
+    
+    Flask-SQLAlchemy's pagination returns only the first column of each
+    row, so the page and the COUNT are queried here directly.
+    
+    Returns:
+        tuple: (rows, pagination metadata as in create_pagination_response)
+    """
+    rows = db.session.execute(
+        query.limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    
+    # La primera página incompleta ya contiene todas las filas
+    if page == 1 and len(rows) < per_page:
+        total = len(rows)
+    else:
+        total = db.session.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        ).scalar_one()
+    
+    pages = math.ceil(total / per_page)
+    has_prev = page > 1
+    has_next = page < pages
+    
+    return rows, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_prev': has_prev,
+        'has_next': has_next,
+        'prev_num': page - 1 if has_prev else None,
+        'next_num': page + 1 if has_next else None
+    }
+
 
 def get_pagination_params():
     """
@@ -29,8 +101,12 @@ def paginate_query(query: Query, page: int = None, per_page: int = None, seriali
     """
     Paginate a SQLAlchemy query and return formatted results.
     
+    ``query`` may also be a 2.x ``select()``. A select of a single model
+    yields ORM instances as usual; a select of columns yields rows that
+    are serialized with serialize_row, so no ORM instances are built.
+    
     Args:
-        query: SQLAlchemy query object
+        query: SQLAlchemy query object or Core select
         page: Page number (if None, gets from request)
         per_page: Items per page (if None, gets from request)
         serialize_func: Function to serialize each item (defaults to .to_dict())
@@ -41,14 +117,34 @@ def paginate_query(query: Query, page: int = None, per_page: int = None, seriali
     if page is None or per_page is None:
         page, per_page = get_pagination_params()
     
-    if serialize_func is None:
-        serialize_func = lambda item: item.to_dict()
-    
-    paginated = query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    if isinstance(query, Select) and _selects_entity(query):
+        if serialize_func is None:
+            serialize_func = lambda item: item.to_dict()
+        
+        paginated = db.paginate(
+            query,
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+    elif isinstance(query, Select):
+        if serialize_func is None:
+            serialize_func = serialize_row
+        
+        rows, pagination = _paginate_rows(query, page, per_page)
+        return {
+            'items': [serialize_func(row) for row in rows],
+            'pagination': pagination
+        }
+    else:
+        if serialize_func is None:
+            serialize_func = lambda item: item.to_dict()
+        
+        paginated = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
     
     return {
         'items': [serialize_func(item) for item in paginated.items],
@@ -56,6 +152,220 @@ def paginate_query(query: Query, page: int = None, per_page: int = None, seriali
     }
 
 
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row into an opaque cursor.
+    
+    Args:
+        values: List of sort key values (JSON serializable)
+        
+    Returns:
+        str: URL-safe base64 cursor
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string from the request
+        size: Expected number of sort key values
+        
+    Returns:
+        list: Sort key values
+        
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, binascii.Error):
+        raise ValidationError('Cursor de paginación inválido', field='cursor')
+    
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError('Cursor de paginación inválido', field='cursor')
+    
+    return values
+
+
+def _cursor_value(column, value):
+    """
+    Convert a decoded cursor value back to the column's Python type.
+    
+    Dates travel as ISO strings inside the cursor and are parsed here so
+    the comparison is made against a real date parameter. Any other value
+    must already be of the column's Python type, so a tampered cursor
+    (a list, an object, a string for an integer key...) is rejected
+    instead of reaching the database.
+    
+    Raises:
+        ValidationError: If the value does not match the column type
+    """
+    if value is None:
+        return value
+    
+    if isinstance(column.type, (db.Date, db.DateTime)):
+        parse = datetime.fromisoformat if isinstance(column.type, db.DateTime) else date.fromisoformat
+        try:
+            return parse(value)
+        except (TypeError, ValueError):
+            raise ValidationError('Cursor de paginación inválido', field='cursor')
+    
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    
+    if python_type is None:
+        valid = isinstance(value, (str, int, float)) and not isinstance(value, bool)
+    elif python_type is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif python_type is int:
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, python_type)
+    
+    if not valid:
+        raise ValidationError('Cursor de paginación inválido', field='cursor')
+    
+    return value
+
+
+# Pages of this many items or fewer are cheap enough to always query
+LIST_CACHE_MIN_PER_PAGE = 5
+
+
+def skip_list_cache(f, *args, **kwargs):
+    """
+    ``unless`` callback for list services memoized with cache.memoize.
+    
+    Writes clear a memoized list with delete_memoized, which with a
+    per-process cache (SimpleCache) only reaches the worker that made the
+    write; the others would keep serving stale lists until the TTL. Lists
+    are therefore only cached in a shared cache (Redis), and never for
+    small pages.
+    
+    Args:
+        f: Undecorated list function (its per_page is the second argument)
+        
+    Returns:
+        bool: True to call the function without the cache
+    """
+    if 'redis' not in current_app.config.get('CACHE_TYPE', '').lower():
+        return True
+    
+    per_page = kwargs['per_page'] if 'per_page' in kwargs else args[1] if len(args) > 1 else None
+    return per_page is not None and per_page <= LIST_CACHE_MIN_PER_PAGE
+
+
+# Seconds a COUNT requested with with_total is reused for the same filters
+KEYSET_TOTAL_TIMEOUT = 60
+
+
+def count_total(query: Query):
+    """
+    Count the rows matched by a query, caching the result briefly.
+    
+    The count is keyed by the compiled SQL and its parameters, so each
+    distinct filter combination gets its own entry. Totals may lag behind
+    writes by up to KEYSET_TOTAL_TIMEOUT seconds.
+    
+    Args:
+        query: SQLAlchemy query object or Core select
+        
+    Returns:
+        int: Number of matching rows
+    """
+    statement = query if isinstance(query, Select) else query.statement
+    statement = select(func.count()).select_from(statement.order_by(None).subquery())
+    
+    compiled = statement.compile()
+    digest = hashlib.sha1(
+        f'{compiled}|{sorted(compiled.params.items())!r}'.encode()
+    ).hexdigest()
+    cache_key = f'pagination:total:{digest}'
+    
+    total = cache.get(cache_key)
+    if total is None:
+        total = db.session.execute(statement).scalar_one()
+        cache.set(cache_key, total, timeout=KEYSET_TOTAL_TIMEOUT)
+    
+    return total
+
+
+def paginate_keyset(query: Query, order_columns, cursor=None, per_page: int = None,
+                    serialize_func=None, descending=False, with_total=False):
+    """
+    Paginate a query by seeking past the last returned row.
+    
+    Rows are ordered by ``order_columns`` (which must form a unique key)
+    and filtered with ``(cols) > (cursor values)``, or ``<`` when
+    descending, so the cost of a page does not grow with its depth. One
+    extra row is fetched to know whether another page exists, which avoids
+    the COUNT(*) query issued by offset pagination.
+    
+    Args:
+        query: SQLAlchemy query object or Core select
+        order_columns: Model attributes forming a unique sort key
+        cursor: Cursor returned as next_cursor by the previous page (optional)
+        per_page: Items per page (if None, gets from request)
+        serialize_func: Function to serialize each item (defaults to .to_dict())
+        descending: Sort every column in descending order
+        with_total: Also return the number of matching rows (see count_total)
+        
+    Returns:
+        dict: Items and keyset pagination metadata
+        
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    if per_page is None:
+        _, per_page = get_pagination_params()
+    else:
+        per_page = max(1, min(per_page, 100))
+    
+    # Only a Core select of columns yields rows; queries and select() of a
+    # single model yield ORM instances
+    is_select = isinstance(query, Select)
+    yields_rows = is_select and not _selects_entity(query)
+    
+    if serialize_func is None:
+        serialize_func = serialize_row if yields_rows else lambda item: item.to_dict()
+    
+    total = count_total(query) if with_total else None
+    
+    if cursor:
+        values = [
+            _cursor_value(column, value)
+            for column, value in zip(order_columns, decode_cursor(cursor, len(order_columns)))
+        ]
+        key, bound = tuple_(*order_columns), tuple_(*values)
+        query = query.filter(key < bound if descending else key > bound)
+    
+    ordering = [column.desc() for column in order_columns] if descending else order_columns
+    query = query.order_by(None).order_by(*ordering).limit(per_page + 1)
+    if yields_rows:
+        rows = db.session.execute(query).all()
+    elif is_select:
+        rows = db.session.scalars(query).all()
+    else:
+        rows = query.all()
+    
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in order_columns])
+    
+    return {
+        'items': [serialize_func(item) for item in rows],
+        'pagination': create_keyset_response(per_page, has_next, next_cursor, total)
+    }
+
+
 def create_pagination_response(paginated):
     """
     Create standardized pagination metadata.
@@ -75,4 +385,27 @@ def create_pagination_response(paginated):
         'has_next': paginated.has_next,
         'prev_num': paginated.prev_num,
         'next_num': paginated.next_num
-    }
\ No newline at end of file
+    }
+
+
+def create_keyset_response(per_page, has_next, next_cursor, total=None):
+    """
+    Create keyset pagination metadata.
+    
+    Args:
+        per_page: Items per page
+        has_next: Whether another page exists
+        next_cursor: Cursor of the next page (None on the last page)
+        total: Number of matching rows, only when requested
+        
+    Returns:
+        dict: Pagination metadata
+    """
+    metadata = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
+    if total is not None:
+        metadata['total'] = total
+    return metadata
@@ -5,8 +5,11 @@ Custom rate limiting functions and decorators for the DPM backend.
 """
 
 from functools import wraps
+from threading import Lock
+from uuid import uuid4
 from flask import request, jsonify, current_app
 from app import limiter
+from app.auth_utils import verify_auth_token
 import time
 import hashlib
 
@@ -21,7 +24,6 @@ def get_user_id_from_token():
         auth_header = request.headers.get('Authorization')
         if auth_header and auth_header.startswith('Bearer '):
             token = auth_header.split(' ')[1]
-            from app.auth_utils import verify_auth_token
             payload = verify_auth_token(token)
             if payload:
                 return f"user:{payload.get('user_id')}"
@@ -31,18 +33,32 @@ def get_user_id_from_token():
     # Fallback to IP address
     return request.environ.get('HTTP_X_REAL_IP', request.remote_addr)
 
+# Longest key used as is; longer ones (e.g. a forged X-Real-IP header)
+# are hashed so the storage key stays bounded
+_MAX_RAW_KEY_LENGTH = 200
+
 def create_rate_limit_key(identifier):
     """
     Create a consistent rate limit key.
     
+    Identifiers are a user ID or an IP and endpoints are view names, so
+    the key is normally short and used without hashing.
+    
     Args:
         identifier (str): User identifier or IP
         
     Returns:
-        str: Hashed key for rate limiting
+        str: Key for rate limiting
     """
     endpoint = request.endpoint or 'unknown'
-    return hashlib.md5(f"{identifier}:{endpoint}".encode()).hexdigest()
+    key = f"{identifier}:{endpoint}"
+    if len(key) < _MAX_RAW_KEY_LENGTH:
+        return key
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+def _limit_string(count, window_minutes):
+    """Build a Flask-Limiter limit such as '3 per 60 minutes'."""
+    return f"{count} per {window_minutes} minute{'s' if window_minutes > 1 else ''}"
 
 def sensitive_operation_limit(max_attempts=3, window_minutes=60):
     """
@@ -55,19 +71,11 @@ def sensitive_operation_limit(max_attempts=3, window_minutes=60):
     Returns:
         function: Decorated function
     """
+    limit_string = _limit_string(max_attempts, window_minutes)
+    
     def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            # Apply the rate limit
-            limit_string = f"{max_attempts} per {window_minutes} minute{'s' if window_minutes > 1 else ''}"
-            
-            @limiter.limit(limit_string, key_func=get_user_id_from_token)
-            def limited_function():
-                return f(*args, **kwargs)
-            
-            return limited_function()
-        
-        return decorated_function
+        # Registered once per view, under the view's own name
+        return limiter.limit(limit_string, key_func=get_user_id_from_token)(f)
     return decorator
 
 def public_endpoint_limit(max_requests=100, window_minutes=60):
@@ -78,19 +86,129 @@ def public_endpoint_limit(max_requests=100, window_minutes=60):
         max_requests (int): Maximum requests allowed
         window_minutes (int): Time window in minutes
         
+    Returns:
+        function: Decorated function
+    """
+    limit_string = _limit_string(max_requests, window_minutes)
+    
+    def decorator(f):
+        # Registered once per view, under the view's own name
+        return limiter.limit(limit_string)(f)
+    return decorator
+
+# Requests in flight per key, stored in a Redis sorted set (member: request
+# ID, score: start time). Entries older than the timeout are pruned first,
+# so a worker killed mid-request cannot hold its slot forever.
+_ACQUIRE_SLOT_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local timeout = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - timeout)
+if redis.call('ZCARD', key) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('EXPIRE', key, timeout)
+return 1
+"""
+
+# Per-process fallback when the limiter storage is not Redis
+_local_slots = {}
+_local_slots_lock = Lock()
+
+
+def _concurrency_redis():
+    """
+    Return the Redis client of the limiter storage, or None when the
+    storage is not Redis (or the redis package is not installed).
+    """
+    extensions = current_app.extensions
+    if 'concurrency_redis' not in extensions:
+        client = None
+        storage_uri = current_app.config.get('RATELIMIT_STORAGE_URI', 'memory://')
+        if storage_uri.startswith(('redis://', 'rediss://')):
+            try:
+                import redis
+                client = redis.Redis.from_url(storage_uri)
+            except ImportError:
+                current_app.logger.warning(
+                    "redis package not installed; concurrency limits are per process"
+                )
+        extensions['concurrency_redis'] = client
+    return extensions['concurrency_redis']
+
+
+def _acquire_slot(key, max_concurrent, timeout):
+    """Take a slot for this request; returns its ID or None when full."""
+    slot = uuid4().hex
+    client = _concurrency_redis()
+    if client is not None:
+        try:
+            acquired = client.eval(
+                _ACQUIRE_SLOT_SCRIPT, 1, key, time.time(), timeout, max_concurrent, slot
+            )
+            return slot if acquired else None
+        except Exception as e:
+            # Same policy as RATELIMIT_SWALLOW_ERRORS: never fail on Redis
+            current_app.logger.warning(f"Concurrency limit skipped: {e}")
+            return slot
+    
+    with _local_slots_lock:
+        if _local_slots.get(key, 0) >= max_concurrent:
+            return None
+        _local_slots[key] = _local_slots.get(key, 0) + 1
+    return slot
+
+
+def _release_slot(key, slot):
+    """Free the slot taken by _acquire_slot."""
+    client = _concurrency_redis()
+    if client is not None:
+        try:
+            client.zrem(key, slot)
+        except Exception as e:
+            current_app.logger.warning(f"Concurrency slot not released: {e}")
+        return
+    
+    with _local_slots_lock:
+        remaining = _local_slots.get(key, 0) - 1
+        if remaining > 0:
+            _local_slots[key] = remaining
+        else:
+            _local_slots.pop(key, None)
+
+
+def concurrency_limit(max_concurrent=1, timeout=60):
+    """
+    Decorator limiting how many requests of one user (or IP) an endpoint
+    runs at the same time.
+    
+    Rate limits count requests per period; this caps requests in flight,
+    which is what protects workers from CPU-bound endpoints such as
+    password hashing. Slots live in Redis when the limiter storage is
+    Redis, so the limit holds across workers.
+    
+    Args:
+        max_concurrent (int): Requests allowed in flight per user or IP
+        timeout (int): Seconds after which a slot is considered abandoned
+        
     Returns:
         function: Decorated function
     """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            limit_string = f"{max_requests} per {window_minutes} minute{'s' if window_minutes > 1 else ''}"
-            
-            @limiter.limit(limit_string)
-            def limited_function():
+            key = f"concurrency:{create_rate_limit_key(get_user_id_from_token())}"
+            slot = _acquire_slot(key, max_concurrent, timeout)
+            if slot is None:
+                return jsonify({
+                    "error": "Too many concurrent requests",
+                    "message": "Wait for your previous request to finish."
+                }), 429
+            try:
                 return f(*args, **kwargs)
-            
-            return limited_function()
+            finally:
+                _release_slot(key, slot)
         
         return decorated_function
     return decorator
@@ -106,8 +224,9 @@ def get_rate_limit_status():
         # This would require Redis for proper implementation
         return {
             "rate_limiting_enabled": True,
-            "storage_type": current_app.config.get('RATELIMIT_STORAGE_URL', 'memory://'),
+            "storage_type": current_app.config.get('RATELIMIT_STORAGE_URI', 'memory://'),
             "default_limits": current_app.config.get('RATELIMIT_DEFAULT', '1000 per hour'),
+            "strategy": current_app.config.get('RATELIMIT_STRATEGY', 'fixed-window'),
             "headers_enabled": current_app.config.get('RATELIMIT_HEADERS_ENABLED', True)
         }
     except Exception as e:
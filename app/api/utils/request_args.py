@@ -0,0 +1,80 @@
+"""
+Request Arguments
+
+Query string parsing shared by list endpoints and their decorators.
+"""
+
+from flask import g
+
+from .errors import ValidationError
+
+
+# Query parameters accepted by list endpoints. Integer parameters map to
+# their fallback when the value is not a number; None means "ignore it".
+_INT_PARAMS = {'page': 1, 'per_page': 10, 'nivel': None, 'centro': None, 'with_total': 0}
+_STRING_PARAMS = frozenset({
+    'nombre', 'rut', 'username', 'sector', 'direccion', 'cargo',
+    'email', 'telefono', 'fecha', 'fecha_inicio', 'fecha_fin',
+    'fecha_desde', 'fecha_hasta', 'actividad', 'search', 'cursor', 'match'
+})
+
+
+def get_request_args(request_obj):
+    """
+    Extract and parse request arguments for API endpoints.
+    
+    The query string is read once with ``to_dict`` and only the keys
+    actually present are converted. The result is kept for the rest of
+    the request, so decorators and the view share a single parse; treat
+    it as read-only.
+    
+    Args:
+        request_obj: Flask request object
+        
+    Returns:
+        dict: Parsed request arguments with appropriate types
+    """
+    args = g.get('_request_args')
+    if args is not None:
+        return args
+    
+    args = {}
+    
+    for key, value in request_obj.args.to_dict().items():
+        if key in _INT_PARAMS:
+            try:
+                args[key] = int(value)
+            except ValueError:
+                if _INT_PARAMS[key] is not None:
+                    args[key] = _INT_PARAMS[key]
+        elif key in _STRING_PARAMS:
+            value = value.strip()
+            if value:
+                args[key] = value
+    
+    g._request_args = args
+    return args
+
+
+def get_json_body(request_obj):
+    """
+    Parse the JSON body of a create or update request.
+    
+    A missing or empty body yields an empty dict, so it fails the usual
+    field validation. A body that is present but is not valid JSON is
+    rejected instead of being treated as empty, which would turn an
+    update into a successful no-op.
+    
+    Args:
+        request_obj: Flask request object
+        
+    Returns:
+        The parsed body, or an empty dict when there is none
+        
+    Raises:
+        ValidationError: If the body is not valid JSON
+    """
+    data = request_obj.get_json(silent=True, cache=True)
+    if data is None and request_obj.get_data(cache=True).strip():
+        raise ValidationError('El cuerpo de la petición no es JSON válido')
+    return data or {}
@@ -4,8 +4,10 @@ Standardized Response Utilities
 Provides consistent response formatting for all API endpoints.
 """
 
-from flask import jsonify
+import orjson
+from flask import jsonify, current_app, stream_with_context
 from datetime import datetime
+from app.extensions import cache
 
 
 def success_response(data=None, message=None, status_code=200):
@@ -94,4 +96,89 @@ def deleted_response(message="Resource deleted successfully"):
     """
     Convenience method for deletion responses.
     """
-    return success_response(message=message, status_code=200)
\ No newline at end of file
+    return success_response(message=message, status_code=200)
+
+def cached_json_response(key, builder, message=None, timeout=30, status_code=200):
+    """
+    Create a success response whose data is served from a bytes cache.
+    
+    The data is cached already serialized with orjson, so a cache hit
+    skips both building the Python objects and encoding them. Only the
+    small envelope (timestamp, message) is encoded per request.
+    
+    Args:
+        key: Cache key for the serialized data
+        builder: Callable returning the data to serialize on a cache miss
+        message: Success message (optional)
+        timeout: Cache TTL in seconds (default: 30)
+        status_code: HTTP status code (default: 200)
+        
+    Returns:
+        tuple: (Response, status_code)
+    """
+    payload = cache.get(key)
+    if payload is None:
+        payload = orjson.dumps(builder())
+        cache.set(key, payload, timeout=timeout)
+    
+    envelope = {
+        'success': True,
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    if message:
+        envelope['message'] = message
+    
+    # Splice the cached data into the envelope without re-encoding it
+    body = orjson.dumps(envelope)[:-1] + b',"data":' + payload + b'}'
+    
+    return current_app.response_class(body, mimetype='application/json'), status_code
+
+
+def streamed_json_response(batches, serialize, message=None, status_code=200):
+    """
+    Create a success response whose data list is streamed in batches.
+    
+    The envelope is sent first and each batch of items is encoded and
+    written as it is fetched, so the full list never has to be held in
+    memory as ORM objects plus dicts. The body is the same JSON that
+    success_response(data=[...]) would produce.
+    
+    Items are encoded with plain orjson, which writes date and datetime
+    values as ISO 8601 strings exactly like the models' to_dict(); a
+    Core row therefore only needs ``row._asdict()``.
+    
+    Errors raised while streaming cannot change the status code any
+    more, so callers should run the query before returning.
+    
+    Args:
+        batches: Iterable of lists of items (e.g. Result.partitions())
+        serialize: Function turning an item into a JSON-serializable dict
+        message: Success message (optional)
+        status_code: HTTP status code (default: 200)
+        
+    Returns:
+        tuple: (Response, status_code)
+    """
+    envelope = {
+        'success': True,
+        'timestamp': datetime.now().isoformat()
+    }
+    
+    if message:
+        envelope['message'] = message
+    
+    head = orjson.dumps(envelope)[:-1] + b',"data":['
+    
+    def generate():
+        yield head
+        separator = b''
+        for batch in batches:
+            if batch:
+                yield separator + b','.join(orjson.dumps(serialize(item)) for item in batch)
+                separator = b','
+        yield b']}'
+    
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype='application/json'
+    ), status_code
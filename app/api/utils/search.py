@@ -0,0 +1,52 @@
+"""
+Full-text Search Utilities
+
+Builds tsvector documents and prefix queries for list filters served by
+PostgreSQL GIN expression indexes.
+"""
+
+import re
+
+from sqlalchemy import func, literal_column
+
+from app.extensions import db
+
+
+# Single-word filters (letters and digits only), safe to use in a tsquery
+_WORD_RE = re.compile(r'^[^\W_]+$')
+
+
+class FullTextDocument:
+    """
+    ``to_tsvector(config, coalesce(col, '') || ' ' || ...)`` over columns.
+    
+    The expression must match its GIN index exactly for PostgreSQL to use
+    it, so the configuration and separators are rendered as SQL literals
+    and not as bound parameters.
+    """
+    
+    def __init__(self, config, *columns):
+        self.config = literal_column(f"'{config}'")
+        
+        text = func.coalesce(columns[0], literal_column("''"))
+        for column in columns[1:]:
+            text = text.concat(literal_column("' '")).concat(
+                func.coalesce(column, literal_column("''"))
+            )
+        self.expression = func.to_tsvector(self.config, text)
+    
+    def prefix_match(self, term):
+        """
+        Match a single word as a prefix of any word in the document.
+        
+        Args:
+            term: Filter text
+            
+        Returns:
+            ColumnElement: Filter predicate, or None when the term is not a
+            single word or the database is not PostgreSQL (callers then
+            keep their ILIKE filter)
+        """
+        if not _WORD_RE.match(term) or db.engine.dialect.name != 'postgresql':
+            return None
+        return self.expression.op('@@')(func.to_tsquery(self.config, f'{term}:*'))
@@ -0,0 +1,61 @@
+"""
+Unit of Work
+
+Transaction boundary helper shared by the service layer.
+"""
+
+from contextlib import contextmanager
+from flask import g
+from app.extensions import db
+
+
+@contextmanager
+def transactional():
+    """
+    Run a block of writes inside a single database transaction.
+
+    The outermost block commits when it exits normally and rolls back
+    when it raises. Nested blocks only flush (so generated keys are
+    available) and leave the commit to the outermost one, which lets a
+    service method group several writes, including calls to other
+    services, into one COMMIT.
+
+    Usage:
+        with transactional():
+            db.session.add(entity)
+
+    Yields:
+        Session: The current database session
+    """
+    depth = g.get('_uow_depth', 0)
+    g._uow_depth = depth + 1
+    try:
+        yield db.session
+        if depth == 0:
+            db.session.commit()
+        else:
+            db.session.flush()
+    except Exception:
+        if depth == 0:
+            db.session.rollback()
+        raise
+    finally:
+        g._uow_depth = depth
+
+
+def release_connection():
+    """
+    Return the session's connection to the pool before slow non-database
+    work, such as hashing a password.
+
+    Flask-SQLAlchemy keeps the connection checked out from the first query
+    until the request ends. Ending the read-only transaction here lets
+    other requests use the connection meanwhile; the next query checks one
+    out again. Loaded instances stay usable because commits do not expire
+    them. Nothing is done inside a transactional() block or when the
+    session has unflushed changes, so no write is ever committed early.
+    """
+    session = db.session
+    if g.get('_uow_depth', 0) or session.new or session.dirty or session.deleted:
+        return
+    session.commit()
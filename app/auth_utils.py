@@ -12,9 +12,12 @@ import secrets
 import re
 import logging
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import lru_cache, wraps
+from operator import mul
 from flask import current_app, request, jsonify, session
-from app.extensions import db
+from sqlalchemy import event
+from sqlalchemy.orm import Session, load_only, make_transient_to_detached, object_session
+from app.extensions import db, cache
 from app.models import Usuario
 
 logger = logging.getLogger(__name__)
@@ -24,6 +27,9 @@ logger = logging.getLogger(__name__)
 # VALIDACIÓN DE RUT
 # =============================================================================
 
+# 7 u 8 dígitos + guión + dígito verificador (0-9 o k/K)
+_RUT_FORMAT_RE = re.compile(r'^\d{7,8}-[\dkK]$')
+
 def validate_rut_format(rut):
     """
     Validar que el RUT tenga el formato correcto.
@@ -40,10 +46,7 @@ def validate_rut_format(rut):
     if not rut or not isinstance(rut, str):
         return False
     
-    # Patrón que acepta 7 u 8 dígitos + guión + dígito verificador (0-9 o k/K)
-    pattern = r'^\d{7,8}-[\dkK]$'
-    
-    is_valid = bool(re.match(pattern, rut.strip()))
+    is_valid = _RUT_FORMAT_RE.match(rut.strip()) is not None
     
     if not is_valid:
         logger.debug(f"Formato de RUT inválido: {rut}")
@@ -61,14 +64,13 @@ def normalize_rut(rut):
     Returns:
         str: RUT normalizado o None si es inválido
     """
-    if not rut:
+    if not rut or not isinstance(rut, str):
         return None
     
-    # Remover espacios en blanco
+    # Remover espacios en blanco y validar formato en una sola pasada
     normalized = rut.strip()
-    
-    # Validar formato
-    if not validate_rut_format(normalized):
+    if _RUT_FORMAT_RE.match(normalized) is None:
+        logger.debug(f"Formato de RUT inválido: {rut}")
         return None
     
     return normalized
@@ -145,6 +147,107 @@ def generate_session_token():
     return secrets.token_urlsafe(32)
 
 
+# =============================================================================
+# CACHÉ DE USUARIOS
+# =============================================================================
+
+# Cada petición autenticada busca a su usuario por ID. Sus columnas (salvo
+# el hash de la contraseña) se guardan en caché desde el login y se
+# descartan al confirmar cualquier cambio o eliminación del usuario, así
+# que los permisos se leen de la caché y no de los claims del token. Con
+# una caché compartida (RedisCache) un usuario degradado o eliminado pierde
+# el acceso en la siguiente petición; con SimpleCache el descarte solo
+# alcanza al worker que hizo el cambio y los demás lo notan al vencer el
+# TTL (USER_CACHE_TIMEOUT, 30 segundos por defecto en ese caso).
+_USERS_STALE = 'usuarios_cache_stale'
+
+# Columnas que usan los permisos y to_dict(). El hash de la contraseña solo
+# se necesita para verificarla, así que no se carga al buscar usuarios.
+USER_PUBLIC_COLUMNS = (
+    Usuario.id_usuario, Usuario.rut_usuario, Usuario.user_usuario, Usuario.nivel_usuario
+)
+
+
+def _user_cache_key(user_id):
+    return f'usuario:{user_id}'
+
+
+def load_user(user_id):
+    """
+    Obtener un usuario por ID, usando la caché cuando es posible.
+    
+    En un acierto de caché el usuario se reconstruye y se adjunta a la
+    sesión sin consultar la base de datos; sigue siendo una instancia
+    persistente, por lo que puede modificarse y guardarse como siempre.
+    En ambos casos el hash de la contraseña se carga solo si se accede a él.
+    
+    Args:
+        user_id (int): ID del usuario
+    
+    Returns:
+        Usuario or None: Instancia del usuario o None si no existe
+    """
+    key = _user_cache_key(user_id)
+    columns = cache.get(key)
+    if columns is None:
+        usuario = db.session.get(
+            Usuario, user_id, options=[load_only(*USER_PUBLIC_COLUMNS)]
+        )
+        if usuario is not None:
+            cache_user(usuario)
+        return usuario
+    
+    usuario = Usuario(**columns)
+    make_transient_to_detached(usuario)
+    return db.session.merge(usuario, load=False)
+
+
+def cache_user(usuario):
+    """
+    Guardar en caché las columnas públicas de un usuario ya cargado.
+    
+    Args:
+        usuario (Usuario): Instancia del modelo Usuario
+    """
+    cache.set(
+        _user_cache_key(usuario.id_usuario),
+        {column.key: getattr(usuario, column.key) for column in USER_PUBLIC_COLUMNS},
+        timeout=current_app.config.get('USER_CACHE_TIMEOUT', 30)
+    )
+
+
+def forget_users(user_ids):
+    """
+    Descartar de la caché los usuarios indicados.
+    
+    Las sentencias UPDATE/DELETE masivas no disparan los eventos del ORM
+    que lo hacen automáticamente; quien las ejecute debe llamar a esta
+    función después del commit.
+    
+    Args:
+        user_ids: IDs de los usuarios modificados o eliminados
+    """
+    cache.delete_many(*(_user_cache_key(user_id) for user_id in user_ids))
+
+
+@event.listens_for(Usuario, 'after_update')
+@event.listens_for(Usuario, 'after_delete')
+def _mark_user_stale(mapper, connection, target):
+    object_session(target).info.setdefault(_USERS_STALE, set()).add(target.id_usuario)
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_users(session):
+    stale = session.info.pop(_USERS_STALE, None)
+    if stale:
+        forget_users(stale)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_users_mark(session):
+    session.info.pop(_USERS_STALE, None)
+
+
 # =============================================================================
 # DECORADORES DE AUTENTICACIÓN
 # =============================================================================
@@ -179,15 +282,16 @@ def token_required(f):
                 return jsonify({'error': 'Token inválido o expirado'}), 401
             
             # Obtener usuario actual
-            current_user = Usuario.query.get(payload['user_id'])
+            current_user = load_user(payload['user_id'])
             if not current_user:
                 return jsonify({'error': 'Usuario no encontrado'}), 401
             
-            # Pasar usuario al endpoint
-            return f(current_user, *args, **kwargs)
-            
         except Exception as e:
             return jsonify({'error': 'Error al verificar token'}), 401
+        
+        # Pasar usuario al endpoint fuera del try: los errores del endpoint
+        # los resuelven sus propios manejadores, no la verificación del token
+        return f(current_user, *args, **kwargs)
     
     return decorated
 
@@ -333,10 +437,24 @@ def can_update_participa_mantenciones(f):
 # FUNCIONES DE VALIDACIÓN
 # =============================================================================
 
+# Multiplicadores del módulo 11 (2, 3, 4, 5, 6, 7, 2, 3 de derecha a
+# izquierda) en el orden de un número de 8 dígitos, y dígito verificador
+# correspondiente a cada resto de la suma. La suma se calcula sobre los
+# bytes ASCII del número; restar el aporte del '0' (48) en cada posición
+# deja la suma de los dígitos sin convertir cada uno con int().
+_RUT_MULTIPLIERS = (3, 2, 7, 6, 5, 4, 3, 2)
+_RUT_ASCII_OFFSET = ord('0') * sum(_RUT_MULTIPLIERS)
+_RUT_CHECK_DIGITS = '0K987654321'
+
+
+@lru_cache(maxsize=4096)
 def validate_rut(rut):
     """
     Validar formato de RUT chileno.
     
+    El resultado se memoiza: los mismos RUT se validan una y otra vez
+    entre peticiones y la función es pura.
+    
     Args:
         rut (str): RUT a validar
     
@@ -356,31 +474,14 @@ def validate_rut(rut):
     numero = rut[:-1]
     dv = rut[-1]
     
-    # Validar que el número sean solo dígitos
-    if not numero.isdigit():
+    # Validar que el número sean solo dígitos ASCII
+    if not (numero.isascii() and numero.isdigit()):
         return False
     
     # Calcular dígito verificador
-    suma = 0
-    multiplicador = 2
-    
-    for digit in reversed(numero):
-        suma += int(digit) * multiplicador
-        multiplicador += 1
-        if multiplicador > 7:
-            multiplicador = 2
-    
-    resto = suma % 11
-    dv_calculado = 11 - resto
-    
-    if dv_calculado == 11:
-        dv_calculado = '0'
-    elif dv_calculado == 10:
-        dv_calculado = 'K'
-    else:
-        dv_calculado = str(dv_calculado)
+    suma = sum(map(mul, numero.zfill(8).encode(), _RUT_MULTIPLIERS)) - _RUT_ASCII_OFFSET
     
-    return dv == dv_calculado
+    return dv == _RUT_CHECK_DIGITS[suma % 11]
 
 
 def validate_password_strength(password):
@@ -432,8 +533,10 @@ def login_user(usuario):
     # Actualizar timestamp de último login
     usuario.update_last_login()
     
-    # Generar token JWT
+    # Generar token JWT; las peticiones con el token encontrarán al
+    # usuario en la caché
     token = generate_auth_token(usuario)
+    cache_user(usuario)
     
     # Guardar información en sesión de Flask
     session['user_id'] = usuario.id_usuario
@@ -472,7 +575,7 @@ def get_current_user_from_session():
     """
     user_id = session.get('user_id')
     if user_id:
-        return Usuario.query.get(user_id)
+        return load_user(user_id)
     return None
 
 
@@ -38,6 +38,13 @@ class Config:
         DB_PASSWORD (str): Contraseña de la base de datos
         SQLALCHEMY_DATABASE_URI (str): URI completa de conexión a PostgreSQL
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Desactivar tracking de modificaciones
+        SQLALCHEMY_ENGINE_OPTIONS (dict): Tamaño y comportamiento del pool de conexiones
+        RATELIMIT_STORAGE_URI (str): Almacenamiento de Flask-Limiter (memory:// o redis://)
+        RATELIMIT_STRATEGY (str): Estrategia de ventana de Flask-Limiter
+        CACHE_TYPE (str): Backend de Flask-Caching (SimpleCache o RedisCache)
+        CACHE_DEFAULT_TIMEOUT (int): TTL por defecto de la caché en segundos
+        USER_CACHE_TIMEOUT (int): TTL en segundos del usuario autenticado en caché
+        MAX_CONTENT_LENGTH (int): Tamaño máximo del cuerpo de una petición en bytes
     """
     
     # Configuración de seguridad
@@ -69,8 +76,43 @@ class Config:
     # Configuraciones de SQLAlchemy
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Desactivar para mejorar rendimiento
     
-    # Configuración de Rate Limiting
-    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    # Pool de conexiones por proceso. pool_pre_ping descarta conexiones
+    # cerradas por el servidor y pool_recycle las renueva antes de que
+    # PostgreSQL o un firewall intermedio las corten por inactividad.
+    # Con workers gevent cientos de peticiones comparten este pool;
+    # pool_timeout limita cuánto espera una de ellas por una conexión libre
+    # antes de fallar, en lugar de acumularse hasta el timeout del worker.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 6)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # 30 minutos
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+    
+    # Configuración de Rate Limiting. Flask-Limiter 3 lee RATELIMIT_STORAGE_URI;
+    # con memory:// cada worker lleva su propia cuenta, por lo que en
+    # producción debe apuntar a Redis. La ventana móvil evita que se acepte
+    # el doble del límite en el cambio de ventana.
+    RATELIMIT_STORAGE_URI = os.environ.get(
+        'RATELIMIT_STORAGE_URI', os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    )
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'moving-window')
     RATELIMIT_DEFAULT = os.environ.get('RATELIMIT_DEFAULT', '1000 per hour')
     RATELIMIT_HEADERS_ENABLED = True
-    RATELIMIT_SWALLOW_ERRORS = True  # No fallar si Redis no está disponible
\ No newline at end of file
+    RATELIMIT_SWALLOW_ERRORS = True  # No fallar si Redis no está disponible
+    
+    # Configuración de caché (SimpleCache por proceso; RedisCache en producción)
+    CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/1')
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT', 30))  # 30 segundos por defecto
+    # Usuario autenticado en caché. Los cambios por el ORM solo la invalidan
+    # en la caché que ve el worker que los hizo: con una caché por proceso
+    # los demás workers mantienen los permisos anteriores hasta el TTL, por
+    # lo que solo una caché compartida (Redis) admite un TTL largo.
+    USER_CACHE_TIMEOUT = int(os.environ.get(
+        'USER_CACHE_TIMEOUT', 300 if 'redis' in CACHE_TYPE.lower() else 30
+    ))
+    
+    # Límite del cuerpo de las peticiones: Werkzeug responde 413 sin leerlo
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024))  # 64 KB por defecto
@@ -9,11 +9,15 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from flask_caching import Cache
 
-# Initialize extensions
-db = SQLAlchemy()
+# Initialize extensions. Sessions are scoped to a request, so committed
+# instances are not expired: serializing them after the commit (or reading
+# what INSERT/UPDATE ... RETURNING loaded) needs no extra SELECT.
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 migrate = Migrate()
 cors = CORS()
+cache = Cache()
 
 # Initialize rate limiter with default configuration
 limiter = Limiter(
@@ -0,0 +1,56 @@
+"""
+JSON Provider Module
+
+Proveedor JSON de Flask basado en orjson. Reemplaza el módulo ``json`` de
+la biblioteca estándar tanto para los cuerpos de las peticiones POST/PUT
+(``request.get_json()``) como para las respuestas (``jsonify``).
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider, _default
+
+# orjson ordena las claves como el proveedor por defecto y delega fechas,
+# Decimal y UUID en la misma función que usa Flask, de modo que el formato
+# de las respuestas no cambia.
+_DUMPS_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON que usa orjson para codificar y decodificar.
+
+    orjson acepta ``bytes`` directamente, por lo que el cuerpo de la
+    petición no necesita decodificarse a ``str`` antes de parsearse.
+    Los errores de parseo heredan de ``ValueError``, por lo que Flask
+    los sigue transformando en una respuesta 400.
+    """
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode()
+
+    def dumps_bytes(self, obj, **kwargs):
+        """Codifica ``obj`` directamente a ``bytes``, sin pasar por ``str``."""
+        option = _DUMPS_OPTIONS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def response(self, *args, **kwargs):
+        """
+        Construye la respuesta de ``jsonify`` con los bytes de orjson.
+
+        La implementación por defecto decodifica el JSON a ``str`` y la
+        respuesta lo vuelve a codificar a UTF-8; aquí los bytes se entregan
+        tal cual. Se conserva la indentación en modo debug y el salto de
+        línea final.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype
+        )
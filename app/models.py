@@ -27,6 +27,30 @@ import bcrypt
 # MODELO: USUARIOS (AUTENTICACIÓN)
 # =============================================================================
 
+def _run_kdf(func, *args):
+    """
+    Ejecutar una función de bcrypt sin bloquear al resto de las peticiones.
+    
+    Con workers gevent todas las peticiones de un worker comparten un hilo:
+    un hash de cientos de ms detendría a las demás. En ese caso la función
+    corre en el pool de hilos nativos de gevent (bcrypt libera el GIL) y
+    solo espera la petición que la pidió. Con workers sync se llama
+    directamente, ya que un pool no ahorraría nada.
+    """
+    try:
+        from gevent import get_hub, monkey
+    except ImportError:
+        return func(*args)
+    if not monkey.is_module_patched('threading'):
+        return func(*args)
+    return get_hub().threadpool.apply(func, args)
+
+
+# Nombre de cada nivel de usuario y niveles válidos (check_nivel_usuario)
+_NIVEL_NOMBRES = {3: 'Admin', 2: 'Encargado', 1: 'Apoyo'}
+NIVELES_USUARIO = frozenset(_NIVEL_NOMBRES)
+
+
 class Usuario(db.Model):
     """
     Modelo para representar usuarios del sistema con autenticación.
@@ -54,6 +78,12 @@ class Usuario(db.Model):
     # Constraint para validar niveles de usuario
     __table_args__ = (
         db.CheckConstraint("nivel_usuario IN (1, 2, 3)", name='check_nivel_usuario'),
+        # Nombres de usuario únicos sin distinguir mayúsculas; el operador de
+        # patrón permite usar el mismo índice en los filtros por prefijo
+        db.Index(
+            'ux_usuarios_user_lower', db.func.lower(user_usuario).label('user_lower'),
+            unique=True, postgresql_ops={'user_lower': 'text_pattern_ops'}
+        ),
     )
     
     def __repr__(self):
@@ -66,14 +96,33 @@ class Usuario(db.Model):
         Args:
             password (str): Contraseña en texto plano
             
+        Raises:
+            ValueError: Si la contraseña excede los límites permitidos
+        """
+        self.passwd_usuario = Usuario.hash_password(password)
+    
+    @staticmethod
+    def hash_password(password):
+        """
+        Calcular el hash bcrypt de una contraseña sin asignarlo.
+        
+        Permite calcular el hash (cientos de ms de CPU) antes de abrir la
+        transacción que lo guarda.
+        
+        Args:
+            password (str): Contraseña en texto plano
+            
+        Returns:
+            str: Hash bcrypt
+            
         Raises:
             ValueError: Si la contraseña excede los límites permitidos
         """
         if len(password) > 128:  # Límite razonable para contraseña original
             raise ValueError("La contraseña no puede exceder 128 caracteres")
         # Generar hash bcrypt con rounds=12 (balance entre seguridad y rendimiento)
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=12))
-        self.passwd_usuario = hashed.decode('utf-8')
+        hashed = _run_kdf(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=12))
+        return hashed.decode('utf-8')
     
     def check_password(self, password):
         """
@@ -88,7 +137,9 @@ class Usuario(db.Model):
         """
         # Si el hash empieza con $2, es bcrypt
         if self.passwd_usuario.startswith('$2'):
-            return bcrypt.checkpw(password.encode('utf-8'), self.passwd_usuario.encode('utf-8'))
+            return _run_kdf(
+                bcrypt.checkpw, password.encode('utf-8'), self.passwd_usuario.encode('utf-8')
+            )
         else:
             # Para hashes legacy de Werkzeug (pbkdf2, scrypt, etc.)
             # Importamos werkzeug solo cuando es necesario para compatibilidad
@@ -122,8 +173,18 @@ class Usuario(db.Model):
     
     def get_nivel_nombre(self):
         """Obtener nombre del nivel de usuario."""
-        niveles = {3: 'Admin', 2: 'Encargado', 1: 'Apoyo'}
-        return niveles.get(self.nivel_usuario, 'Desconocido')
+        return Usuario.nivel_nombre(self.nivel_usuario)
+    
+    @staticmethod
+    def nivel_nombre(nivel_usuario):
+        """Obtener el nombre de un nivel de usuario."""
+        return _NIVEL_NOMBRES.get(nivel_usuario, 'Desconocido')
+    
+    @staticmethod
+    def is_valid_nivel(nivel_usuario):
+        """Verificar que un valor recibido sea un nivel de usuario válido."""
+        # Los valores no enteros (listas, objetos JSON) no son hashables
+        return isinstance(nivel_usuario, int) and nivel_usuario in NIVELES_USUARIO
     
     def can_create_users(self):
         """Verificar si puede crear usuarios (solo admin)."""
@@ -214,10 +275,17 @@ class PersonasACargo(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow) 
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relaciones con otras entidades
-    actividades = db.relationship('Actividades', backref='persona_responsable', lazy=True)
-    talleres = db.relationship('Talleres', backref='persona_responsable', lazy=True)
-    servicios = db.relationship('Servicios', backref='persona_responsable', lazy=True)
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination)
+        db.Index('ix_personas_a_cargo_apellido_nombre_rut', apellido, nombre, rut),
+    )
+    
+    # Relaciones con otras entidades. lazy='raise' hace fallar cualquier
+    # carga implícita (una consulta por fila en un listado); quien necesite
+    # la relación debe pedirla con selectinload() en su consulta
+    actividades = db.relationship('Actividades', back_populates='persona_responsable', lazy='raise')
+    talleres = db.relationship('Talleres', back_populates='persona_responsable', lazy='raise')
+    servicios = db.relationship('Servicios', back_populates='persona_responsable', lazy='raise')
     
     def __repr__(self):
         """Representación string del objeto para debugging"""
@@ -279,9 +347,19 @@ class CentrosComunitarios(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relaciones con otras entidades
-    trabajadores = db.relationship('TrabajadoresApoyo', backref='centro', lazy=True)
-    mantenciones = db.relationship('Mantenciones', backref='centro', lazy=True)
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination)
+        db.Index('ix_centros_comunitarios_nombre_id', nombre, id),
+    )
+    
+    # Relaciones con otras entidades. passive_deletes deja el borrado de un
+    # centro a las claves foráneas (SET NULL / CASCADE) en lugar de cargar
+    # todos sus trabajadores y mantenciones para actualizarlos uno a uno;
+    # lazy='raise' impide cargarlas implícitamente (ver PersonasACargo)
+    trabajadores = db.relationship('TrabajadoresApoyo', back_populates='centro', lazy='raise',
+                                   passive_deletes=True)
+    mantenciones = db.relationship('Mantenciones', back_populates='centro', lazy='raise',
+                                   passive_deletes=True)
     
     def __repr__(self):
         """Representación string del objeto para debugging"""
@@ -314,8 +392,8 @@ class PersonasMayores(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    participaciones = db.relationship('Participa', backref='persona', lazy=True)
+    # Relationships (lazy='raise': see PersonasACargo)
+    participaciones = db.relationship('Participa', back_populates='persona', lazy='raise')
     
     def __repr__(self):
         return f'<PersonaMayor {self.rut}: {self.nombre} {self.apellidos}>'
@@ -345,10 +423,16 @@ class Actividades(db.Model):
     fecha_inicio = db.Column(db.Date, nullable=False)
     fecha_termino = db.Column(db.Date)
     persona_a_cargo = db.Column(db.String(12), db.ForeignKey('personas_a_cargo.rut', ondelete='SET NULL', onupdate='CASCADE'))
+    persona_responsable = db.relationship('PersonasACargo', back_populates='actividades', lazy='raise')
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination, newest first)
+        db.Index('ix_actividades_fecha_inicio_id', fecha_inicio.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f'<Actividad {self.id}: {self.nombre}>'
     
@@ -373,10 +457,16 @@ class Talleres(db.Model):
     fecha_inicio = db.Column(db.Date, nullable=False)
     fecha_termino = db.Column(db.Date)
     persona_a_cargo = db.Column(db.String(12), db.ForeignKey('personas_a_cargo.rut', ondelete='SET NULL', onupdate='CASCADE'))
+    persona_responsable = db.relationship('PersonasACargo', back_populates='talleres', lazy='raise')
     observaciones = db.Column(db.Text)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination)
+        db.Index('ix_talleres_nombre_id', nombre, id),
+    )
+    
     def __repr__(self):
         return f'<Taller {self.id}: {self.nombre}>'
     
@@ -401,6 +491,7 @@ class Servicios(db.Model):
     lugar = db.Column(db.String(200))
     direccion_servicio = db.Column(db.String(200))
     persona_a_cargo = db.Column(db.String(12), db.ForeignKey('personas_a_cargo.rut', ondelete='SET NULL', onupdate='CASCADE'))
+    persona_responsable = db.relationship('PersonasACargo', back_populates='servicios', lazy='raise')
     fecha = db.Column(db.Date)
     estado = db.Column(db.String(50))
     observaciones = db.Column(db.Text)
@@ -433,9 +524,21 @@ class TrabajadoresApoyo(db.Model):
     apellidos = db.Column(db.String(150))
     cargo = db.Column(db.String(100))
     id_centro = db.Column(db.Integer, db.ForeignKey('centros_comunitarios.id', ondelete='SET NULL', onupdate='CASCADE'))
+    centro = db.relationship('CentrosComunitarios', back_populates='trabajadores', lazy='raise')
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination)
+        db.Index('ix_trabajadores_nombre_rut', nombre, rut),
+        # Workers of a center in list order; INCLUDE covers the remaining
+        # columns of the response so PostgreSQL can answer index-only
+        db.Index(
+            'ix_trabajadores_centro_nombre', id_centro, nombre, apellidos,
+            postgresql_include=['rut', 'cargo', 'created_at', 'updated_at']
+        ),
+    )
+    
     def __repr__(self):
         return f'<TrabajadorApoyo {self.rut}: {self.nombre} {self.apellidos}>'
     
@@ -457,6 +560,7 @@ class Mantenciones(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date, nullable=False)
     id_centro = db.Column(db.Integer, db.ForeignKey('centros_comunitarios.id', ondelete='CASCADE', onupdate='CASCADE'), nullable=False)
+    centro = db.relationship('CentrosComunitarios', back_populates='mantenciones', lazy='raise')
     detalle = db.Column(db.Text)
     observaciones = db.Column(db.Text)
     adjuntos = db.Column(db.Text)
@@ -464,6 +568,11 @@ class Mantenciones(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Sort key of the list endpoint (keyset pagination, newest first)
+        db.Index('ix_mantenciones_fecha_id', fecha.desc(), id.desc()),
+    )
+    
     def __repr__(self):
         return f'<Mantencion {self.id}: {self.fecha}>'
     
@@ -486,6 +595,7 @@ class Participa(db.Model):
     __tablename__ = 'participa'
     
     rut_persona = db.Column(db.String(12), db.ForeignKey('personas_mayores.rut', ondelete='CASCADE', onupdate='CASCADE'), primary_key=True)
+    persona = db.relationship('PersonasMayores', back_populates='participaciones', lazy='raise')
     tipo = db.Column(db.String(20), nullable=False, primary_key=True)  # 'actividad', 'taller', 'servicio'
     id_actividad_taller_servicio = db.Column(db.Integer, nullable=False, primary_key=True)
     fecha_participacion = db.Column(db.Date, default=date.today)
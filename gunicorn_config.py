@@ -0,0 +1,63 @@
+"""
+Gunicorn Configuration
+
+Configuración de producción para ``gunicorn -c gunicorn_config.py run:app``.
+
+Por defecto usa workers gevent: cada worker atiende muchas peticiones
+concurrentes y, con psycogreen (aplicado en create_app), las esperas a
+PostgreSQL ceden el control a otras peticiones en lugar de bloquear el
+proceso. Con GUNICORN_WORKER_CLASS=sync se vuelve al modelo de un
+request por worker.
+"""
+
+import os
+
+# Con preload_app el master importa run:app antes de que el worker gevent
+# parchee la biblioteca estándar en init_process; sin parchar aquí,
+# create_app no vería socket parchado y no aplicaría psycogreen, y cada
+# consulta bloquearía el worker completo.
+if os.environ.get('GUNICORN_WORKER_CLASS', 'gevent') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+import multiprocessing
+
+# Server socket - solo red interna
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+backlog = 2048
+
+# Workers. Con gevent no hace falta un worker por request concurrente;
+# la concurrencia la da worker_connections (greenlets por worker).
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() + 1 if worker_class == 'gevent'
+    else multiprocessing.cpu_count() * 2 + 1
+))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = 30
+
+# Logging
+errorlog = os.environ.get('GUNICORN_ERRORLOG', '/var/log/gunicorn/error.log')
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '/var/log/gunicorn/access.log')
+loglevel = 'info'
+
+# Process
+proc_name = 'appdpm_backend'
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Descartar en cada worker las conexiones heredadas del master.
+    
+    Con preload_app el master crea la app (y run.py ejecuta create_all),
+    dejando conexiones en el pool; un socket compartido entre procesos
+    mezcla las respuestas de PostgreSQL. close=False las abandona sin
+    cerrarlas, para no cortar las del master ni las de otros workers.
+    """
+    if not server.cfg.preload_app:
+        return
+    from app.extensions import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
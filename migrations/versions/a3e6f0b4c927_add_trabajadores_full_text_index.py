@@ -0,0 +1,38 @@
+"""Add trabajadores full-text search index
+
+Revision ID: a3e6f0b4c927
+Revises: f5c1d8e2a706
+Create Date: 2026-10-15 23:41:07.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e6f0b4c927'
+down_revision = 'f5c1d8e2a706'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índice GIN sobre la misma expresión tsvector que usa
+    # _TRABAJADOR_SEARCH_DOCUMENT en el servicio, para que un filtro de una
+    # palabra sobre nombre y apellidos use un solo índice en lugar de dos
+    # ILIKE combinados con OR. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_trabajadores_search_fts ON trabajadores_apoyo "
+        "USING GIN (to_tsvector('simple', "
+        "coalesce(nombre, '') || ' ' || coalesce(apellidos, '')))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_trabajadores_search_fts")
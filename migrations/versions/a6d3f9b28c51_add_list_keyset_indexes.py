@@ -0,0 +1,48 @@
+"""Add keyset pagination indexes for centros, actividades, talleres and personas_a_cargo
+
+Revision ID: a6d3f9b28c51
+Revises: e4b7c2a9f153
+Create Date: 2026-10-15 10:12:37.204815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f9b28c51'
+down_revision = 'e4b7c2a9f153'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Claves de orden de los listados que pasan a paginar por keyset.
+    # Cada una termina en la clave primaria para que el orden sea único.
+    op.create_index(
+        'ix_centros_comunitarios_nombre_id',
+        'centros_comunitarios',
+        ['nombre', 'id']
+    )
+    op.create_index(
+        'ix_actividades_fecha_inicio_id',
+        'actividades',
+        [sa.text('fecha_inicio DESC'), sa.text('id DESC')]
+    )
+    op.create_index(
+        'ix_talleres_nombre_id',
+        'talleres',
+        ['nombre', 'id']
+    )
+    op.create_index(
+        'ix_personas_a_cargo_apellido_nombre_rut',
+        'personas_a_cargo',
+        ['apellido', 'nombre', 'rut']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_personas_a_cargo_apellido_nombre_rut', table_name='personas_a_cargo')
+    op.drop_index('ix_talleres_nombre_id', table_name='talleres')
+    op.drop_index('ix_actividades_fecha_inicio_id', table_name='actividades')
+    op.drop_index('ix_centros_comunitarios_nombre_id', table_name='centros_comunitarios')
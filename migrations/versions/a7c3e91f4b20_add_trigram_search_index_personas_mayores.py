@@ -0,0 +1,37 @@
+"""Add trigram search index on personas_mayores
+
+Revision ID: a7c3e91f4b20
+Revises: 334c1111c2a4
+Create Date: 2026-10-15 10:12:31.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e91f4b20'
+down_revision = '334c1111c2a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índice GIN trigram sobre la misma expresión que usa
+    # PersonasMayoresService.build_search_query, para que ILIKE '%q%'
+    # no recorra la tabla completa. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pm_search_trgm ON personas_mayores "
+        "USING GIN ((rut || ' ' || nombre || ' ' || apellidos) gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_pm_search_trgm")
@@ -0,0 +1,48 @@
+"""Add RUT prefix and personas_a_cargo trigram search indexes
+
+Revision ID: b5d2f8a61c93
+Revises: a7c3e91f4b20
+Create Date: 2026-10-15 11:04:52.730114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d2f8a61c93'
+down_revision = 'a7c3e91f4b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices para las búsquedas de personas. Los B-tree varchar_pattern_ops
+    # atienden los prefijos de RUT (LIKE 'term%'), que el índice de la clave
+    # primaria no puede usar fuera de la collation C. El GIN trigram replica
+    # ix_pm_search_trgm para personas_a_cargo. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pm_rut_pattern ON personas_mayores "
+        "(rut varchar_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pac_rut_pattern ON personas_a_cargo "
+        "(rut varchar_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_pac_search_trgm ON personas_a_cargo "
+        "USING GIN ((rut || ' ' || nombre || ' ' || apellido) gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_pac_search_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_pac_rut_pattern")
+    op.execute("DROP INDEX IF EXISTS ix_pm_rut_pattern")
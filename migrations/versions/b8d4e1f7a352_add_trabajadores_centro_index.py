@@ -0,0 +1,32 @@
+"""Add trabajadores_apoyo covering index for the workers of a center
+
+Revision ID: b8d4e1f7a352
+Revises: a3e6f0b4c927
+Create Date: 2026-10-16 00:12:38.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d4e1f7a352'
+down_revision = 'a3e6f0b4c927'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trabajadores de un centro en el orden del listado (nombre, apellidos).
+    # Las columnas de INCLUDE completan la respuesta, de modo que PostgreSQL
+    # la resuelve con un index-only scan, sin leer la tabla ni ordenar.
+    op.create_index(
+        'ix_trabajadores_centro_nombre',
+        'trabajadores_apoyo',
+        ['id_centro', 'nombre', 'apellidos'],
+        postgresql_include=['rut', 'cargo', 'created_at', 'updated_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_trabajadores_centro_nombre', table_name='trabajadores_apoyo')
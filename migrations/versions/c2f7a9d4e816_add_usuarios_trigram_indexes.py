@@ -0,0 +1,41 @@
+"""Add usuarios trigram filter indexes
+
+Revision ID: c2f7a9d4e816
+Revises: b8d4e1f7a352
+Create Date: 2026-10-16 00:31:52.918274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f7a9d4e816'
+down_revision = 'b8d4e1f7a352'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices GIN trigram para los filtros ILIKE '%q%' del listado de
+    # usuarios (RUT y nombre de usuario). Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_rut_trgm ON usuarios "
+        "USING GIN (rut_usuario gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_user_trgm ON usuarios "
+        "USING GIN (user_usuario gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_usuarios_user_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_usuarios_rut_trgm")
@@ -0,0 +1,30 @@
+"""Add mantenciones (fecha, id) keyset pagination index
+
+Revision ID: c81e4a7d3f02
+Revises: b5d2f8a61c93
+Create Date: 2026-10-15 22:41:08.512946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e4a7d3f02'
+down_revision = 'b5d2f8a61c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Clave de orden del listado de mantenciones (más recientes primero).
+    # Permite paginar por keyset con un index scan en lugar de OFFSET.
+    op.create_index(
+        'ix_mantenciones_fecha_id',
+        'mantenciones',
+        [sa.text('fecha DESC'), sa.text('id DESC')]
+    )
+
+
+def downgrade():
+    op.drop_index('ix_mantenciones_fecha_id', table_name='mantenciones')
@@ -0,0 +1,53 @@
+"""Add servicios and trabajadores_apoyo trigram filter indexes
+
+Revision ID: d4a9b27e6c15
+Revises: c81e4a7d3f02
+Create Date: 2026-10-15 22:47:36.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9b27e6c15'
+down_revision = 'c81e4a7d3f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices GIN trigram para los filtros ILIKE '%q%' de los listados de
+    # servicios (nombre) y trabajadores de apoyo (nombre, apellidos, cargo).
+    # Un índice por columna permite combinar el OR de nombre/apellidos con
+    # un BitmapOr. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_servicios_nombre_trgm ON servicios "
+        "USING GIN (nombre gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_trabajadores_nombre_trgm ON trabajadores_apoyo "
+        "USING GIN (nombre gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_trabajadores_apellidos_trgm ON trabajadores_apoyo "
+        "USING GIN (apellidos gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_trabajadores_cargo_trgm ON trabajadores_apoyo "
+        "USING GIN (cargo gin_trgm_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_trabajadores_cargo_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_trabajadores_apellidos_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_trabajadores_nombre_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_servicios_nombre_trgm")
@@ -0,0 +1,42 @@
+"""Add usuarios prefix filter indexes
+
+Revision ID: d9a3c6b1f427
+Revises: c2f7a9d4e816
+Create Date: 2026-10-16 00:48:15.372061
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a3c6b1f427'
+down_revision = 'c2f7a9d4e816'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices B-tree con operadores de patrón para los filtros por prefijo
+    # del listado de usuarios (match=prefix): LIKE 'q%' sobre el RUT y sobre
+    # lower(user_usuario) se resuelve con un range scan, sin importar la
+    # collation de la base. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_rut_prefix ON usuarios "
+        "(rut_usuario varchar_pattern_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_user_lower ON usuarios "
+        "(lower(user_usuario) text_pattern_ops)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_usuarios_user_lower")
+    op.execute("DROP INDEX IF EXISTS ix_usuarios_rut_prefix")
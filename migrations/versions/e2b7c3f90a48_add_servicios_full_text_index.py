@@ -0,0 +1,37 @@
+"""Add servicios full-text search index
+
+Revision ID: e2b7c3f90a48
+Revises: d4a9b27e6c15
+Create Date: 2026-10-15 22:55:12.830417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c3f90a48'
+down_revision = 'd4a9b27e6c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índice GIN sobre la misma expresión tsvector que usa
+    # _SERVICIO_SEARCH_DOCUMENT en el servicio, para que los filtros de una
+    # palabra no recorran observaciones completas. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_servicios_search_fts ON servicios "
+        "USING GIN (to_tsvector('spanish', "
+        "coalesce(nombre, '') || ' ' || coalesce(observaciones, '')))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_servicios_search_fts")
@@ -0,0 +1,44 @@
+"""Make usuarios usernames unique regardless of case
+
+Revision ID: e4b7c2a9f153
+Revises: d9a3c6b1f427
+Create Date: 2026-10-16 01:32:40.518226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c2a9f153'
+down_revision = 'd9a3c6b1f427'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reemplaza ix_usuarios_user_lower por un índice único sobre la misma
+    # expresión: "Alice" y "alice" pasan a ser el mismo nombre de usuario,
+    # la comprobación de disponibilidad (lower(user_usuario) = ...) es una
+    # búsqueda en el índice y los filtros por prefijo lo siguen usando.
+    # Si ya hay nombres repetidos la migración falla indicando cuál; deben
+    # renombrarse antes de aplicarla. Solo aplica a PostgreSQL.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_usuarios_user_lower ON usuarios "
+        "(lower(user_usuario) text_pattern_ops)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_usuarios_user_lower")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_usuarios_user_lower ON usuarios "
+        "(lower(user_usuario) text_pattern_ops)"
+    )
+    op.execute("DROP INDEX IF EXISTS ux_usuarios_user_lower")
@@ -0,0 +1,30 @@
+"""Add trabajadores_apoyo (nombre, rut) keyset pagination index
+
+Revision ID: f5c1d8e2a706
+Revises: e2b7c3f90a48
+Create Date: 2026-10-15 23:04:51.377920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c1d8e2a706'
+down_revision = 'e2b7c3f90a48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Clave de orden del listado de trabajadores de apoyo. Permite paginar
+    # por keyset con un index scan en lugar de OFFSET.
+    op.create_index(
+        'ix_trabajadores_nombre_rut',
+        'trabajadores_apoyo',
+        ['nombre', 'rut']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_trabajadores_nombre_rut', table_name='trabajadores_apoyo')